@@ -0,0 +1,24 @@
+"""End-to-end in-process benchmark over a generated consumers tree.
+
+Run from the repository root with ``python -m benchmarks.bench_app [output.json]``.
+This is the same suite as ``yaaf bench`` (see ``yaaf.bench``) at its default size.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from yaaf.bench import run_suite, summary
+
+
+def main() -> None:
+    results = run_suite()
+    print(summary(results))
+    if len(sys.argv) > 1:
+        Path(sys.argv[1]).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
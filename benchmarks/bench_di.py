@@ -0,0 +1,87 @@
+"""Per-call dependency injection overhead, before and after injection plans.
+
+Run from the repository root with ``python -m benchmarks.bench_di``.
+"""
+
+from __future__ import annotations
+
+import inspect
+import timeit
+from typing import Any, Callable, Mapping
+
+from yaaf.di import DependencyResolver, ServiceRegistry
+
+
+class BaseService:
+    pass
+
+
+SERVICE_TYPES = [type(f"Service{index}", (BaseService,), {}) for index in range(8)]
+
+
+class Protocolish:
+    """Annotation only satisfied through the registry's subclass fallback."""
+
+
+class Implementation(Protocolish):
+    pass
+
+
+def legacy_call(registry: ServiceRegistry, func: Callable[..., Any], context: Mapping[str, Any]) -> Any:
+    """The pre-plan resolver: inspect the signature and resolve on every call."""
+    signature = inspect.signature(func)
+    kwargs: dict[str, Any] = {}
+    for name, param in signature.parameters.items():
+        if name in context:
+            kwargs[name] = context[name]
+            continue
+        annotation = None
+        if param.annotation is not inspect._empty:
+            annotation = param.annotation
+        resolved = registry.resolve(annotation)
+        if resolved is not None:
+            kwargs[name] = resolved
+            continue
+        if param.default is not inspect._empty:
+            continue
+        raise TypeError(f"Cannot resolve dependency '{name}' for {func}")
+    return func(**kwargs)
+
+
+def make_handler(count: int) -> Callable[..., Any]:
+    """Build a handler taking ``request`` plus ``count - 1`` services, the last via subclass lookup."""
+    params = [inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY)]
+    for index in range(count - 1):
+        annotation = Protocolish if index == count - 2 else SERVICE_TYPES[index]
+        params.append(inspect.Parameter(f"s{index}", inspect.Parameter.KEYWORD_ONLY, annotation=annotation))
+
+    def handler(**kwargs: Any) -> int:
+        return len(kwargs)
+
+    handler.__signature__ = inspect.Signature(params)  # type: ignore[attr-defined]
+    return handler
+
+
+def main() -> None:
+    registry = ServiceRegistry(by_type={}, by_alias={})
+    for service_type in SERVICE_TYPES:
+        registry.register(service_type(), aliases=[])
+    registry.register(Implementation(), aliases=[])
+    resolver = DependencyResolver(registry)
+    context = {"request": object(), "params": {}, "path_params": {}}
+
+    number = 50000
+    print(f"{'params':>7} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for count in (1, 4, 8):
+        handler = make_handler(count)
+        resolver.compile(handler)
+        assert legacy_call(registry, handler, context) == resolver.call(handler, context) == count
+        before = timeit.timeit(lambda: legacy_call(registry, handler, context), number=number)
+        after = timeit.timeit(lambda: resolver.call(handler, context), number=number)
+        before_us = before / number * 1e6
+        after_us = after / number * 1e6
+        print(f"{count:>7} {before_us:>10.2f} {after_us:>10.2f} {before_us / after_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Cost of building and sending a constant response, before and after freezing.
+
+Run from the repository root with ``python -m benchmarks.bench_frozen``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from yaaf.responses import Response, as_response
+
+HEALTH = {"status": "ok"}
+FROZEN_HEALTH = Response.json(HEALTH).freeze()
+PONG = Response.text("pong").freeze()
+
+
+async def _discard(message: dict[str, Any]) -> None:
+    return None
+
+
+async def _time(make: Any, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        await as_response(make()).send(_discard)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def _run() -> None:
+    number = 200000
+    workloads = (
+        ("dict -> json", lambda: HEALTH, lambda: FROZEN_HEALTH),
+        ("str -> text", lambda: "pong", lambda: PONG),
+    )
+    print(f"{'workload':>14} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for name, before_make, after_make in workloads:
+        before = await _time(before_make, number)
+        after = await _time(after_make, number)
+        print(f"{name:>14} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+
+
+def main() -> None:
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
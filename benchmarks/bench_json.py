@@ -0,0 +1,57 @@
+"""JSON response encoding cost across payload sizes and encoder backends.
+
+Run from the repository root with ``python -m benchmarks.bench_json``. orjson
+and msgspec are included when installed.
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+from typing import Any, Callable
+
+from yaaf.encoders import get_json_encoder
+from yaaf.responses import Response
+
+
+def make_payload(target_bytes: int) -> list[dict[str, Any]]:
+    """Build a list of user-like records that encodes to roughly ``target_bytes``."""
+    record = {
+        "id": 12345,
+        "name": "Austin",
+        "email": "austin@example.com",
+        "active": True,
+        "score": 98.5,
+        "tags": ["alpha", "beta", "gamma"],
+    }
+    size = len(json.dumps(record)) + 2
+    return [dict(record, id=index) for index in range(max(1, target_bytes // size))]
+
+
+def legacy_json(content: Any) -> bytes:
+    """The previous Response.json path: build a str, then encode a copy."""
+    return json.dumps(content, ensure_ascii=True).encode()
+
+
+def main() -> None:
+    encoders: dict[str, Callable[[Any], bytes]] = {"legacy": legacy_json}
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            encoders[name] = get_json_encoder(name)
+        except ImportError:
+            continue
+
+    sizes = {"1KB": 1024, "100KB": 100 * 1024, "5MB": 5 * 1024 * 1024}
+    print(f"{'payload':>8} {'encoder':<8} {'us/response':>12} {'MB/s':>8}")
+    for label, target in sizes.items():
+        payload = make_payload(target)
+        encoded_size = len(legacy_json(payload))
+        number = max(3, 2_000_000 // encoded_size)
+        for name, encoder in encoders.items():
+            elapsed = timeit.timeit(lambda: Response.json(payload, encoder=encoder), number=number)
+            per_call = elapsed / number
+            print(f"{label:>8} {name:<8} {per_call * 1e6:>12.1f} {encoded_size / per_call / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
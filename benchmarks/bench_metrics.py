@@ -0,0 +1,52 @@
+"""Per-request cost of the built-in metrics, off and on.
+
+Run from the repository root with ``python -m benchmarks.bench_metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from yaaf.app import App
+
+
+async def _receive() -> dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _discard(message: dict[str, Any]) -> None:
+    return None
+
+
+async def _time(app: App, number: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/ping", "headers": []}
+    await app(scope, _receive, _discard)
+    started = time.perf_counter()
+    for _ in range(number):
+        await app(scope, _receive, _discard)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def _run(consumers: str) -> None:
+    number = 50000
+    off = await _time(App(consumers_dir=consumers), number)
+    on = await _time(App(consumers_dir=consumers, metrics=True), number)
+    print(f"{'metrics':>8} {'us/request':>11}")
+    print(f"{'off':>8} {off:>11.2f}")
+    print(f"{'on':>8} {on:>11.2f}  (+{on - off:.2f} us)")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        route = Path(tmp) / "consumers" / "api" / "ping"
+        route.mkdir(parents=True)
+        (route / "_server.py").write_text("async def get():\n    return 'pong'\n")
+        asyncio.run(_run(str(Path(tmp) / "consumers")))
+
+
+if __name__ == "__main__":
+    main()
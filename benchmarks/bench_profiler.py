@@ -0,0 +1,42 @@
+"""Overhead of the sampling profiler at different rates.
+
+Run from the repository root with ``python -m benchmarks.bench_profiler``.
+A CPU-bound loop runs for a fixed time with the profiler off and at each
+rate. The table shows the loop's lost throughput and the time the sampler
+thread itself reported.
+"""
+
+from __future__ import annotations
+
+import time
+
+from yaaf.profiler import SamplingProfiler
+
+
+def _work(seconds: float) -> int:
+    iterations = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+        iterations += 1
+    return iterations
+
+
+def main() -> None:
+    seconds = 2.0
+    baseline = _work(seconds)
+    print(f"{'hz':>6} {'samples':>8} {'us/sample':>10} {'sampler %':>10} {'throughput lost %':>18}")
+    for hz in (10, 100, 1000):
+        profiler = SamplingProfiler(hz=hz)
+        profiler.set_routes([("/api/work", _work)])
+        profiler.start()
+        iterations = _work(seconds)
+        profiler.stop()
+        stats = profiler.stats()
+        per_sample = stats["sample_time"] / max(stats["samples"], 1) * 1e6
+        lost = max(baseline - iterations, 0) / baseline * 100
+        print(f"{hz:>6} {stats['samples']:>8} {per_sample:>10.1f} {stats['overhead'] * 100:>10.3f} {lost:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
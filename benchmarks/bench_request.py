@@ -0,0 +1,70 @@
+"""Per-request overhead of the Request object, before and after lazy parsing.
+
+Run from the repository root with ``python -m benchmarks.bench_request``.
+"""
+
+from __future__ import annotations
+
+import timeit
+from typing import Any
+
+from yaaf.app import Request
+
+
+class LegacyRequest:
+    """The previous Request: a plain class whose headers are rebuilt on every access."""
+
+    def __init__(self, scope: dict[str, Any], receive: Any, path_params: dict[str, str]) -> None:
+        self.scope = scope
+        self.path_params = path_params
+        self._receive = receive
+        self._max_body_size = None
+        self._body = None
+        self._streamed = False
+        self.services = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        raw = self.scope.get("headers", [])
+        return {k.decode(): v.decode() for k, v in raw}
+
+
+async def _receive() -> dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _scope(header_count: int) -> dict[str, Any]:
+    headers = [(b"host", b"example.com"), (b"accept-encoding", b"gzip, br"), (b"if-none-match", b'"abc"')]
+    headers += [(f"x-extra-{index}".encode(), b"value") for index in range(header_count - len(headers))]
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/items",
+        "query_string": b"page=2&tag=a",
+        "headers": headers,
+    }
+
+
+def main() -> None:
+    number = 100000
+    print(f"{'headers':>8} {'workload':>22} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for header_count in (4, 16):
+        scope = _scope(header_count)
+
+        def untouched(cls: type) -> None:
+            cls(scope, _receive, {})
+
+        def three_lookups(cls: type) -> None:
+            request = cls(scope, _receive, {})
+            request.headers.get("accept-encoding")
+            request.headers.get("if-none-match")
+            request.headers.get("authorization")
+
+        for name, workload in (("construct only", untouched), ("construct + 3 lookups", three_lookups)):
+            before = timeit.timeit(lambda: workload(LegacyRequest), number=number) / number * 1e6
+            after = timeit.timeit(lambda: workload(Request), number=number) / number * 1e6
+            print(f"{header_count:>8} {name:>22} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare the segment-trie router against a linear regex scan.
+
+Run from the repository root with ``python -m benchmarks.bench_router``.
+"""
+
+from __future__ import annotations
+
+import re
+import timeit
+
+from yaaf.di import ServiceRegistry
+from yaaf.loader import RouteTarget, build_pattern
+from yaaf.router import Router
+
+SIZES = (10, 100, 1000)
+REGISTRY = ServiceRegistry(by_type={}, by_alias={})
+
+
+def _route(parts: list[str]) -> RouteTarget:
+    pattern, params, static_count, segment_count = build_pattern(parts, prefix="api")
+    return RouteTarget(
+        pattern=re.compile(pattern),
+        route_parts=parts,
+        param_names=params,
+        handlers={"GET": lambda: None},
+        services=REGISTRY,
+        service=None,
+        static_count=static_count,
+        segment_count=segment_count,
+    )
+
+
+def build_routes(count: int) -> list[RouteTarget]:
+    """Build ``count`` routes, a third of them with a dynamic segment."""
+    routes = []
+    for index in range(count):
+        if index % 3 == 2:
+            routes.append(_route([f"r{index}", "[id]"]))
+        else:
+            routes.append(_route([f"r{index}", "items"]))
+    routes.sort(key=lambda route: (route.static_count, route.segment_count), reverse=True)
+    return routes
+
+
+def linear_match(routes: list[RouteTarget], method: str, path: str) -> RouteTarget | None:
+    """The pre-trie lookup: scan every route and run its regex."""
+    for route in routes:
+        if method not in route.handlers:
+            continue
+        if route.pattern.match(path) is not None:
+            return route
+    return None
+
+
+def main() -> None:
+    number = 20000
+    print(f"{'routes':>7} {'case':<8} {'regex us':>10} {'trie us':>10} {'speedup':>8}")
+    for size in SIZES:
+        routes = build_routes(size)
+        router = Router(routes)
+        last_dynamic = max(index for index in range(size) if index % 3 == 2)
+        cases = {
+            "static": "/api/r0/items",
+            "dynamic": f"/api/r{last_dynamic}/42",
+            "miss": "/api/missing/route",
+        }
+        for case, path in cases.items():
+            regex = timeit.timeit(lambda: linear_match(routes, "GET", path), number=number)
+            trie = timeit.timeit(lambda: router.match("GET", path), number=number)
+            regex_us = regex / number * 1e6
+            trie_us = trie / number * 1e6
+            print(f"{size:>7} {case:<8} {regex_us:>10.2f} {trie_us:>10.2f} {regex_us / trie_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+import time
 from pathlib import Path
 
 import pytest
@@ -106,3 +108,250 @@ async def test_app_not_found(tmp_path: Path) -> None:
     scope = {"type": "http", "method": "GET", "path": "/api/missing", "headers": []}
     await app(scope, DummyReceive(), send)
     assert send.messages[0]["status"] == 404
+
+
+class ChunkedReceive:
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = list(chunks)
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        chunk = self.chunks.pop(0) if self.chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(self.chunks)}
+
+
+def _body_app(tmp_path: Path, server_code: str, **kwargs: object) -> App:
+    base = tmp_path / "consumers" / "api" / "upload"
+    base.mkdir(parents=True)
+    _write_server(base, server_code)
+    return App(consumers_dir=str(tmp_path / "consumers"), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_request_body_and_stream(tmp_path: Path) -> None:
+    app = _body_app(
+        tmp_path,
+        "from yaaf import Request, streaming\n\n"
+        "async def post(request: Request):\n"
+        "    body = await request.body()\n"
+        "    return {'text': request.text(), 'again': request.content.decode(), 'same': body is request.content}\n\n"
+        "@streaming\n"
+        "async def put(request: Request):\n"
+        "    sizes = [len(chunk) async for chunk in request.stream()]\n"
+        "    return {'sizes': sizes}\n\n"
+        "async def get():\n"
+        "    return 'ignored'\n",
+    )
+
+    send = DummySend()
+    scope = {"type": "http", "method": "POST", "path": "/api/upload", "headers": []}
+    await app(scope, ChunkedReceive([b"ab", b"cd", b"e"]), send)
+    assert json.loads(send.messages[1]["body"]) == {"text": "abcde", "again": "abcde", "same": True}
+
+    send = DummySend()
+    scope = {"type": "http", "method": "PUT", "path": "/api/upload", "headers": []}
+    await app(scope, ChunkedReceive([b"ab", b"cde"]), send)
+    assert json.loads(send.messages[1]["body"]) == {"sizes": [2, 3]}
+
+    receive = ChunkedReceive([b"unread"])
+    send = DummySend()
+    scope = {"type": "http", "method": "GET", "path": "/api/upload", "headers": []}
+    await app(scope, receive, send)
+    assert send.messages[0]["status"] == 200
+    assert receive.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_async_handlers_can_call_request_text(tmp_path: Path) -> None:
+    app = _body_app(tmp_path, "async def post(request):\n    return request.text()\n")
+    send = DummySend()
+    scope = {"type": "http", "method": "POST", "path": "/api/upload", "headers": []}
+    await app(scope, ChunkedReceive([b"ab", b"c"]), send)
+    assert send.messages[0]["status"] == 200
+    assert send.messages[1]["body"] == b"abc"
+
+
+@pytest.mark.asyncio
+async def test_request_body_too_large(tmp_path: Path) -> None:
+    app = _body_app(
+        tmp_path,
+        "from yaaf import Request\n\n"
+        "async def post(request: Request):\n"
+        "    return await request.body()\n",
+        max_body_size=4,
+    )
+
+    send = DummySend()
+    headers = [(b"content-length", b"10")]
+    scope = {"type": "http", "method": "POST", "path": "/api/upload", "headers": headers}
+    receive = ChunkedReceive([b"0123456789"])
+    await app(scope, receive, send)
+    assert send.messages[0]["status"] == 413
+    assert receive.calls == 0
+
+    send = DummySend()
+    scope = {"type": "http", "method": "POST", "path": "/api/upload", "headers": []}
+    await app(scope, ChunkedReceive([b"012", b"345"]), send)
+    assert send.messages[0]["status"] == 413
+
+    send = DummySend()
+    await app(scope, ChunkedReceive([b"0123"]), send)
+    assert send.messages[0]["status"] == 200
+    assert send.messages[1]["body"] == b"0123"
+
+
+class LifespanReceive:
+    def __init__(self) -> None:
+        self.messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+
+    async def __call__(self) -> dict:
+        return self.messages.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_lifespan_startup_discovers_and_warms_up(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api"
+    health = base / "health"
+    users = base / "users" / "[id]"
+    health.mkdir(parents=True)
+    users.mkdir(parents=True)
+    _write_service(health, "class Service:\n    calls = 0\n\nservice = Service()\n")
+    _write_server(
+        health,
+        "warmup = True\n\n"
+        "def get(service: 'Service'):\n"
+        "    service.calls += 1\n"
+        "    return 'ok'\n",
+    )
+    _write_server(users, "warmup = ['/api/users/1']\n\nasync def get(params):\n    return 'user ' + params['id']\n")
+
+    app = App(consumers_dir=str(tmp_path / "consumers"), warmup=["/api/missing"])
+    send = DummySend()
+    await app({"type": "lifespan"}, LifespanReceive(), send)
+
+    assert [message["type"] for message in send.messages] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+    assert app._routes is not None
+    assert app._registry.resolve("Service").calls == 1
+
+
+@pytest.mark.asyncio
+async def test_lifespan_startup_failure(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api" / "broken"
+    base.mkdir(parents=True)
+    _write_server(base, "raise RuntimeError('boom')\n")
+
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    send = DummySend()
+    await app({"type": "lifespan"}, LifespanReceive(), send)
+    assert send.messages[0]["type"] == "lifespan.startup.failed"
+    assert "boom" in send.messages[0]["message"]
+
+
+@pytest.mark.asyncio
+async def test_lifespan_starts_async_services_concurrently_and_closes_in_reverse(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api"
+    for name in ("db", "cache", "users"):
+        (base / name).mkdir(parents=True)
+    slow_service = (
+        "import asyncio, time\n\n"
+        "class Service:\n"
+        "    async def __aenter__(self):\n"
+        "        await asyncio.sleep(0.2)\n"
+        "        self.opened = time.monotonic()\n"
+        "        return self\n\n"
+        "    async def __aexit__(self, *exc_info):\n"
+        "        self.closed = time.monotonic()\n\n"
+        "async def get_service() -> Service:\n"
+        "    return Service()\n"
+    )
+    for name in ("db", "cache"):
+        _write_service(base / name, slow_service)
+        _write_server(base / name, "def get():\n    return 'ok'\n")
+    _write_service(
+        base / "users",
+        "import time\n\n"
+        "class Service:\n"
+        "    def __init__(self, db: 'DbService', cache: 'CacheService'):\n"
+        "        self.db = db\n"
+        "        self.cache = cache\n\n"
+        "    async def aclose(self):\n"
+        "        self.closed = time.monotonic()\n",
+    )
+    _write_server(base / "users", "def get(service: 'UsersService'):\n    return str(service.db.opened > 0)\n")
+
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    started = time.monotonic()
+    await app.startup()
+    assert time.monotonic() - started < 0.35
+
+    send = DummySend()
+    await app({"type": "http", "method": "GET", "path": "/api/users", "headers": []}, DummyReceive(), send)
+    assert send.messages[1]["body"] == b"True"
+
+    users = app._registry.resolve("UsersService")
+    await app.shutdown()
+    assert users.closed <= users.db.closed
+    assert users.closed <= users.cache.closed
+
+
+@pytest.mark.asyncio
+async def test_lifespan_closes_started_services_when_startup_fails(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api"
+    for name in ("good", "bad"):
+        (base / name).mkdir(parents=True)
+    _write_service(
+        base / "good",
+        "class Service:\n"
+        "    closed = False\n\n"
+        "    async def aclose(self):\n"
+        "        Service.closed = True\n\n"
+        "service = Service()\n",
+    )
+    _write_service(base / "bad", "async def get_service():\n    raise RuntimeError('cannot connect')\n")
+    for name in ("good", "bad"):
+        _write_server(base / name, "def get():\n    return 'ok'\n")
+
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    send = DummySend()
+    await app({"type": "lifespan"}, LifespanReceive(), send)
+    assert send.messages[0]["type"] == "lifespan.startup.failed"
+    assert "cannot connect" in send.messages[0]["message"]
+    assert app._registry.resolve("GoodService").closed is True
+
+
+@pytest.mark.asyncio
+async def test_request_scoped_service_is_disposed_after_response(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api" / "sessions"
+    base.mkdir(parents=True)
+    _write_service(
+        base,
+        "lifetime = 'request'\n\n"
+        "class Service:\n"
+        "    opened = 0\n"
+        "    closed = 0\n\n"
+        "    def __init__(self, request):\n"
+        "        Service.opened += 1\n"
+        "        self.path = request.path\n\n"
+        "    async def aclose(self):\n"
+        "        Service.closed += 1\n",
+    )
+    _write_server(
+        base,
+        "def get(service: 'SessionsService', again: 'SessionsService'):\n"
+        "    return f'{service is again} {service.path} {type(service).closed}'\n",
+    )
+
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    for _ in range(2):
+        send = DummySend()
+        await app({"type": "http", "method": "GET", "path": "/api/sessions", "headers": []}, DummyReceive(), send)
+        assert send.messages[1]["body"].startswith(b"True /api/sessions")
+
+    provider = app._registry.resolve("SessionsService")
+    service_cls = provider.service_type
+    assert service_cls.opened == 2
+    assert service_cls.closed == 2
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from yaaf import bench
+from yaaf.bench import BenchConfig, compare, generate_tree, run_suite, summary
+from yaaf.cli import main
+from yaaf.loader import discover
+
+SMALL = BenchConfig(static_routes=3, dynamic_routes=2, service_depth=3, requests=40, concurrency=4)
+
+
+def test_generated_tree_has_routes_and_a_service_chain(tmp_path: Path) -> None:
+    consumers = generate_tree(tmp_path, SMALL)
+    discovery = discover(str(consumers))
+    assert len(discovery.routes) == 3 + 2 + 3 + 1
+    deepest = discovery.registry.resolve("chain2")
+    assert deepest.depth == 3
+
+
+def test_environment_reports_the_installed_distribution_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bench, "version", lambda name: {"yaafcli": "1.2.3"}[name])
+    assert bench._environment()["yaaf"] == "1.2.3"
+
+
+def test_run_suite_reports_every_scenario() -> None:
+    results = run_suite(SMALL)
+    assert results["config"]["requests"] == 40
+    assert results["discovery"]["routes"] == 9
+    assert results["discovery"]["memory_per_route_bytes"] > 0
+    assert set(results["scenarios"]) == {"static", "dynamic_di", "sync_thread", "not_found", "post_json"}
+    for name, scenario in results["scenarios"].items():
+        assert scenario["requests"] == 40
+        assert scenario["requests_per_second"] > 0
+        assert scenario["p50_us"] <= scenario["p99_us"] <= scenario["max_us"] + 1
+        expected = "404" if name == "not_found" else "200"
+        assert scenario["statuses"] == {expected: 40}
+    json.dumps(results)
+    assert "static" in summary(results)
+    assert "+0.0%" in compare(results, results)
+
+
+def test_cli_bench_writes_and_compares_json(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    output = tmp_path / "run.json"
+    argv = [
+        "yaaf", "bench",
+        "--static-routes", "2",
+        "--dynamic-routes", "2",
+        "--service-depth", "2",
+        "--requests", "20",
+        "--concurrency", "2",
+        "--output", str(output),
+    ]
+    with patch.object(sys, "argv", argv):
+        main()
+    results = json.loads(output.read_text())
+    assert results["schema"] == 1
+
+    with patch.object(sys, "argv", [*argv[:-2], "--compare", str(output)]):
+        main()
+    assert "req/s before" in capsys.readouterr().out
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from yaaf.app import App
+from yaaf.cache import CachePolicy, ResponseCache
+from yaaf.responses import Response
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def test_cache_policy_from_value_and_key() -> None:
+    assert CachePolicy.from_value(None) is None
+    assert CachePolicy.from_value(5) == CachePolicy(ttl=5.0)
+    policy = CachePolicy.from_value({"ttl": 1, "vary": ["Accept-Language"]})
+    assert policy.vary == ("accept-language",)
+
+    scope = {
+        "method": "GET",
+        "path": "/api/x",
+        "query_string": b"a=1",
+        "headers": [(b"Accept-Language", b"en"), (b"x-other", b"1")],
+    }
+    assert policy.key(scope) == ("GET", "/api/x", b"a=1", (b"en",))
+    with pytest.raises(TypeError):
+        CachePolicy.from_value("soon")
+
+
+async def test_cache_ttl_and_counters() -> None:
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    calls = 0
+
+    async def compute() -> Response:
+        nonlocal calls
+        calls += 1
+        return Response.text(f"call {calls}")
+
+    assert (await cache.get_or_compute("k", 10, compute)).body == b"call 1"
+    assert (await cache.get_or_compute("k", 10, compute)).body == b"call 1"
+    clock.now = 11
+    assert (await cache.get_or_compute("k", 10, compute)).body == b"call 2"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+async def test_cache_lru_eviction_by_entries_and_bytes() -> None:
+    cache = ResponseCache(max_entries=2, max_bytes=10_000)
+    for key in ("a", "b"):
+        cache.put(key, Response.text(key), ttl=60)
+    cache.get("a")
+    cache.put("c", Response.text("c"), ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.evictions == 1
+
+    small = ResponseCache(max_bytes=300)
+    small.put("big", Response.text("x" * 150), ttl=60)
+    small.put("other", Response.text("y" * 150), ttl=60)
+    assert small.get("big") is None
+    assert small.get("other") is not None
+    small.put("huge", Response.text("z" * 500), ttl=60)
+    assert small.get("huge") is None
+
+    cache.put("error", Response.text("no", status=500), ttl=60)
+    assert cache.get("error") is None
+
+
+async def test_cache_single_flight() -> None:
+    cache = ResponseCache()
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute() -> Response:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return Response.text("shared")
+
+    tasks = [asyncio.create_task(cache.get_or_compute("k", 5, compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+    assert calls == 1
+    assert {response.body for response in responses} == {b"shared"}
+    assert cache.stats()["coalesced"] == 4
+
+
+async def test_cache_single_flight_survives_leader_cancellation() -> None:
+    cache = ResponseCache()
+    release = asyncio.Event()
+
+    async def compute() -> Response:
+        await release.wait()
+        return Response.text("shared")
+
+    leader = asyncio.create_task(cache.get_or_compute("k", 5, compute))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_compute("k", 5, compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await follower).body == b"shared"
+    assert leader.cancelled()
+    assert cache.get("k").body == b"shared"
+
+
+async def test_app_caches_declared_get_routes(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api" / "report"
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(
+        "cache = {'ttl': 60, 'vary': ['accept-language']}\n"
+        "calls = []\n\n"
+        "async def get():\n"
+        "    calls.append(1)\n"
+        "    return {'count': len(calls)}\n\n"
+        "async def post():\n"
+        "    calls.append(1)\n"
+        "    return {'count': len(calls)}\n"
+    )
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+
+    async def call(method: str, query: bytes = b"", lang: bytes = b"en") -> bytes:
+        send = DummySend()
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": "/api/report",
+            "query_string": query,
+            "headers": [(b"accept-language", lang)],
+        }
+        await app(scope, _receive, send)
+        return send.messages[1]["body"]
+
+    first = await call("GET")
+    assert await call("GET") == first
+    assert await call("GET", query=b"page=2") != first
+    assert await call("GET", lang=b"fr") != first
+    assert await call("POST") != await call("POST")
+    assert app.response_cache.stats()["hits"] == 1
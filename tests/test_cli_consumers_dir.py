@@ -193,3 +193,90 @@ def test_loader_module_loading_with_custom_consumers_dir(tmp_path: Path) -> None
     
     server_module = _load_module(api_dir / "_server.py", "server", str(custom_consumers))
     assert hasattr(server_module, "get")
+
+
+def test_cli_serve_with_workers_uses_prefork_supervisor(tmp_path: Path) -> None:
+    """Test that --workers hands the in-process app to the pre-fork server."""
+    custom_consumers = tmp_path / "my_consumers"
+    custom_consumers.mkdir()
+
+    argv = ['yaaf', '--consumers-dir', str(custom_consumers), '--workers', '3', '--preload']
+    with patch('yaaf.cli.uvicorn.run') as mock_run:
+        with patch('yaaf.cli.serve_workers') as mock_workers:
+            with patch.object(sys, 'argv', argv):
+                main()
+
+    assert not mock_run.called
+    assert mock_workers.called
+    app_instance = mock_workers.call_args[0][0]
+    assert app_instance._consumers_dir == str(custom_consumers)
+    assert mock_workers.call_args[1]['workers'] == 3
+    assert mock_workers.call_args[1]['preload'] is True
+
+
+def test_cli_rejects_reload_with_workers(tmp_path: Path) -> None:
+    """Test that --reload and --workers cannot be combined."""
+    with patch.object(sys, 'argv', ['yaaf', '--reload', '--workers', '2']):
+        with pytest.raises(SystemExit):
+            main()
+
+
+def test_supervisor_restarts_dead_workers() -> None:
+    """Test that the supervisor replaces workers that exit."""
+    from yaaf.workers import Supervisor
+
+    class CountingSupervisor(Supervisor):
+        def _spawn(self):
+            if self.restarts >= 2:
+                self.stop()
+            return super()._spawn()
+
+    supervisor = CountingSupervisor(lambda: None, workers=2, poll_interval=0.01)
+    supervisor.run()
+    assert supervisor.restarts >= 2
+
+
+def test_cli_build_writes_manifest(tmp_path: Path) -> None:
+    """Test that the build command writes the discovery manifest and service types."""
+    custom_consumers = tmp_path / "my_consumers"
+    api_dir = custom_consumers / "api" / "hello"
+    api_dir.mkdir(parents=True)
+    (api_dir / "_service.py").write_text("class Service: pass\nservice = Service()")
+    (api_dir / "_server.py").write_text("async def get(): return 'Hello'")
+
+    with patch.object(sys, 'argv', ['yaaf', 'build', '--consumers-dir', str(custom_consumers)]):
+        main()
+
+    manifest = tmp_path / ".yaaf" / "manifest.json"
+    assert manifest.exists()
+    assert '"hello"' in manifest.read_text()
+    assert "HelloService" in (custom_consumers / "api" / "__init__.py").read_text()
+
+
+def test_cli_reload_uses_in_process_watcher(tmp_path: Path) -> None:
+    """Test that --reload with the default app enables the in-process watcher."""
+    custom_consumers = tmp_path / "my_consumers"
+    custom_consumers.mkdir()
+
+    with patch('yaaf.cli.uvicorn.run') as mock_run:
+        with patch.object(sys, 'argv', ['yaaf', '--consumers-dir', str(custom_consumers), '--reload']):
+            main()
+
+    app_instance = mock_run.call_args[0][0]
+    assert app_instance._watch is True
+    assert mock_run.call_args[1]['reload'] is False
+
+
+def test_cli_profile_flag_enables_the_sampling_profiler(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that --profile sets YAAF_PROFILE so the app samples at the given rate."""
+    custom_consumers = tmp_path / "my_consumers"
+    custom_consumers.mkdir()
+    monkeypatch.delenv("YAAF_PROFILE", raising=False)
+
+    with patch('yaaf.cli.uvicorn.run') as mock_run:
+        with patch.object(sys, 'argv', ['yaaf', '--consumers-dir', str(custom_consumers), '--profile', '25']):
+            main()
+
+    app_instance = mock_run.call_args[0][0]
+    assert app_instance.profiler.hz == 25.0
+    monkeypatch.delenv("YAAF_PROFILE", raising=False)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import zlib
+from dataclasses import replace
+
+import pytest
+
+from yaaf.compression import CompressionMiddleware, parse_accept_encoding
+from yaaf.responses import Response, StreamingResponse
+
+
+class FakeRequest:
+    def __init__(self, accept_encoding: str = "gzip", method: str = "GET") -> None:
+        self.method = method
+        self.headers = {"accept-encoding": accept_encoding} if accept_encoding else {}
+
+
+def _endpoint(response: Response):
+    async def call_next(request: FakeRequest) -> Response:
+        return response
+
+    return call_next
+
+
+async def _collect(response: StreamingResponse) -> list[bytes]:
+    messages: list[dict] = []
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    await response.send(send)
+    return [message["body"] for message in messages[1:]]
+
+
+def test_parse_accept_encoding_reads_q_values() -> None:
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+
+def test_negotiation_follows_client_q_values_then_server_order() -> None:
+    middleware = CompressionMiddleware(encodings=["gzip"])
+    gzip_codec = middleware.codecs[0]
+    middleware.codecs = [replace(gzip_codec, name=name) for name in ("br", "zstd")] + [gzip_codec]
+
+    def negotiate(header: str) -> str | None:
+        codec = middleware._negotiate(header)
+        return codec.name if codec is not None else None
+
+    assert negotiate("br;q=0.1, gzip;q=1.0") == "gzip"
+    assert negotiate("gzip, zstd, br") == "br"
+    assert negotiate("gzip;q=0.8, *;q=0.5") == "gzip"
+    assert negotiate("gzip;q=0.4, *;q=0.5") == "br"
+    assert negotiate("br;q=0, zstd;q=0, gzip;q=0") is None
+
+
+async def test_large_json_is_gzipped_and_cached() -> None:
+    middleware = CompressionMiddleware(encodings=["gzip"], cache_entries=16)
+    original = Response.json({"items": list(range(500))})
+
+    response = await middleware(FakeRequest("gzip, deflate"), _endpoint(original))
+    headers = dict(response.headers)
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"accept-encoding"
+    assert headers[b"content-length"] == str(len(response.body)).encode()
+    assert json.loads(gzip.decompress(response.body)) == {"items": list(range(500))}
+
+    again = await middleware(FakeRequest("gzip"), _endpoint(original))
+    assert again.body is response.body
+    assert middleware.stats()["hits"] == 1
+    assert CompressionMiddleware(encodings=["gzip"]).stats()["entries"] == 0
+
+
+@pytest.mark.parametrize(
+    ("accept", "response"),
+    [
+        ("", Response.text("x" * 1000)),
+        ("gzip;q=0", Response.text("x" * 1000)),
+        ("gzip", Response.text("short")),
+        ("gzip", Response._with_type(b"x" * 1000, "image/png", 200, None)),
+        ("gzip", Response._with_type(b"x" * 1000, "text/plain", 200, [("content-encoding", "br")])),
+    ],
+)
+async def test_responses_left_uncompressed(accept: str, response: Response) -> None:
+    middleware = CompressionMiddleware(encodings=["gzip"])
+    result = await middleware(FakeRequest(accept), _endpoint(response))
+    assert result.body == response.body
+    assert b"gzip" not in dict(result.headers).get(b"content-encoding", b"")
+
+
+async def test_large_bodies_are_compressed_off_loop_within_budget() -> None:
+    middleware = CompressionMiddleware(encodings=["gzip"], offload_size=1000, max_concurrency=1)
+    body = b"y" * 5000
+    original = Response._with_type(body, "text/plain", 200, None)
+
+    response = await middleware(FakeRequest(), _endpoint(original))
+    assert gzip.decompress(response.body) == body
+
+    await middleware._budget.acquire()
+    waiting = asyncio.create_task(middleware(FakeRequest(), _endpoint(original)))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+    middleware._budget.release()
+    assert gzip.decompress((await waiting).body) == body
+    assert middleware.stats()["waited"] == 1
+
+
+async def test_stream_does_not_hold_the_budget_between_chunks() -> None:
+    middleware = CompressionMiddleware(encodings=["gzip"], offload_size=10, max_concurrency=1)
+
+    async def chunks():
+        yield b"z" * 100
+        yield b"z" * 100
+
+    response = await middleware(FakeRequest(), _endpoint(StreamingResponse(chunks(), media_type="text/plain")))
+    stream = response._iterate()
+    await stream.__anext__()
+    assert not middleware._budget.locked()
+    await stream.aclose()
+
+
+async def test_streamed_responses_are_compressed_per_chunk() -> None:
+    middleware = CompressionMiddleware(encodings=["gzip"])
+
+    async def chunks():
+        yield "first line\n"
+        yield b"second line\n"
+
+    original = StreamingResponse(chunks(), media_type="text/plain")
+    response = await middleware(FakeRequest(), _endpoint(original))
+    assert dict(response.headers)[b"content-encoding"] == b"gzip"
+
+    parts = await _collect(response)
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(parts[0]) == b"first line\n"
+    assert decoder.decompress(b"".join(parts[1:])) == b"second line\n"
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from yaaf.app import App
+from yaaf.compression import CompressionMiddleware
+from yaaf.conditional import compute_etag, etag_matches
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _get(app: App, path: str, headers: list[tuple[bytes, bytes]] | None = None) -> tuple[int, bytes, dict]:
+    send = DummySend()
+    await app({"type": "http", "method": "GET", "path": path, "headers": headers or []}, _receive, send)
+    return send.messages[0]["status"], send.messages[1]["body"], dict(send.messages[0]["headers"])
+
+
+def _route(tmp_path: Path, name: str, server: str) -> str:
+    base = tmp_path / "consumers" / "api" / name
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(server)
+    return str(tmp_path / "consumers")
+
+
+def test_etag_matches_lists_wildcards_weak_tags_and_codings() -> None:
+    tag = b'"abc"'
+    assert etag_matches('"x", "abc"', tag)
+    assert etag_matches("*", tag)
+    assert etag_matches('W/"abc"', tag)
+    assert etag_matches('"abc~gzip"', tag)
+    assert not etag_matches('"abcd"', tag)
+    assert not etag_matches('"abc~deflate"', tag)
+
+
+def test_handler_tags_that_end_like_a_coding_are_compared_as_they_are() -> None:
+    assert not etag_matches('"v1"', b'"v1-br"')
+    assert not etag_matches('"v1"', b'"v1~br"')
+    assert etag_matches('"v1-br"', b'"v1-br"')
+    assert etag_matches('"v1-br~gzip"', b'"v1-br"')
+
+
+async def test_body_etag_and_304(tmp_path: Path) -> None:
+    consumers = _route(tmp_path, "items", "def get():\n    return {'items': [1, 2, 3]}\n")
+    app = App(consumers_dir=consumers, etag=True)
+
+    status, body, headers = await _get(app, "/api/items")
+    assert status == 200
+    assert headers[b"etag"] == compute_etag(body)
+
+    status, body, headers = await _get(app, "/api/items", [(b"if-none-match", headers[b"etag"])])
+    assert (status, body) == (304, b"")
+    assert b"content-length" not in headers
+
+    status, _body, _headers = await _get(app, "/api/items", [(b"if-none-match", b'"stale"')])
+    assert status == 200
+
+
+async def test_version_token_skips_the_handler(tmp_path: Path) -> None:
+    consumers = _route(
+        tmp_path,
+        "report",
+        "calls = 0\n\n"
+        "def etag(params):\n"
+        "    return 'v7'\n\n"
+        "def get():\n"
+        "    global calls\n"
+        "    calls += 1\n"
+        "    return {'report': calls}\n",
+    )
+    app = App(consumers_dir=consumers)
+
+    status, _body, headers = await _get(app, "/api/report")
+    assert (status, headers[b"etag"]) == (200, b'"v7"')
+
+    status, body, headers = await _get(app, "/api/report", [(b"if-none-match", b'"v7"')])
+    assert (status, body, headers[b"etag"]) == (304, b"", b'"v7"')
+    assert app._routes[0].server_module.calls == 1
+
+
+async def test_small_bodies_keep_their_tag_on_304(tmp_path: Path) -> None:
+    consumers = _route(tmp_path, "report", "def etag():\n    return 'v7'\n\ndef get():\n    return 'ok'\n")
+    app = App(consumers_dir=consumers, middleware=[CompressionMiddleware(encodings=["gzip"])])
+    gzip = (b"accept-encoding", b"gzip")
+    _status, _body, headers = await _get(app, "/api/report", [gzip])
+    assert headers[b"etag"] == b'"v7"'
+
+    status, _body, headers = await _get(app, "/api/report", [gzip, (b"if-none-match", b'"v7"')])
+    assert (status, headers[b"etag"]) == (304, b'"v7"')
+    assert b"vary" not in headers
+
+
+async def test_compressed_etag_revalidates(tmp_path: Path) -> None:
+    consumers = _route(tmp_path, "big", "def get():\n    return {'data': 'x' * 2000}\n")
+    app = App(consumers_dir=consumers, etag=True, middleware=[CompressionMiddleware(encodings=["gzip"])])
+
+    status, _body, headers = await _get(app, "/api/big", [(b"accept-encoding", b"gzip")])
+    assert headers[b"etag"].endswith(b'~gzip"')
+
+    assert headers[b"vary"] == b"accept-encoding"
+
+    request_headers = [(b"accept-encoding", b"gzip"), (b"if-none-match", headers[b"etag"])]
+    status, body, revalidated = await _get(app, "/api/big", request_headers)
+    assert (status, body) == (304, b"")
+    assert revalidated[b"etag"] == headers[b"etag"]
+    assert revalidated[b"vary"] == b"accept-encoding"
+    assert b"content-encoding" not in revalidated
+
+    plain_tag = headers[b"etag"].replace(b"~gzip", b"")
+    status, _body, revalidated = await _get(app, "/api/big", [(b"if-none-match", plain_tag)])
+    assert (status, revalidated[b"etag"]) == (304, plain_tag)
+
+
+async def test_frozen_response_is_tagged_once_and_revalidates(tmp_path: Path) -> None:
+    consumers = _route(
+        tmp_path,
+        "health",
+        "from yaaf import Response, inline\n\n"
+        "HEALTHY = Response.json({'status': 'ok'}).freeze()\n\n"
+        "@inline\n"
+        "def get():\n"
+        "    return HEALTHY\n",
+    )
+    app = App(consumers_dir=consumers, etag=True)
+
+    first, second = DummySend(), DummySend()
+    for send in (first, second):
+        await app({"type": "http", "method": "GET", "path": "/api/health", "headers": []}, _receive, send)
+    assert first.messages[0] is second.messages[0]
+    headers = dict(first.messages[0]["headers"])
+    assert headers[b"etag"] == compute_etag(first.messages[1]["body"])
+
+    status, body, _headers = await _get(app, "/api/health", [(b"if-none-match", headers[b"etag"])])
+    assert (status, body) == (304, b"")
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from yaaf.app import Request
+from yaaf.datastructures import Headers, QueryParams, parse_cookies
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def test_headers_are_case_insensitive_and_keep_repeats() -> None:
+    headers = Headers([(b"accept", b"text/html"), (b"X-Trace", b"a"), (b"accept", b"application/json")])
+    assert headers["Accept"] == "text/html, application/json"
+    assert headers.getlist("ACCEPT") == ["text/html", "application/json"]
+    assert headers.get("x-trace") == "a"
+    assert headers.get("missing") is None
+    assert "X-TRACE" in headers
+    assert sorted(headers) == ["accept", "x-trace"]
+
+
+def test_query_params_keep_blank_and_repeated_values() -> None:
+    query = QueryParams.from_bytes(b"tag=a&tag=b&empty=&q=hello%20world")
+    assert query["tag"] == "a"
+    assert query.getlist("tag") == ["a", "b"]
+    assert query["empty"] == ""
+    assert query["q"] == "hello world"
+    assert len(QueryParams.from_bytes(b"")) == 0
+
+
+def test_parse_cookies() -> None:
+    assert parse_cookies(['session=abc; theme="dark"', "session=ignored; flag"]) == {
+        "session": "abc",
+        "theme": "dark",
+    }
+
+
+def test_request_parses_lazily_and_once() -> None:
+    scope = {
+        "type": "http",
+        "method": "get",
+        "path": "/api/items",
+        "query_string": b"page=2",
+        "headers": [(b"cookie", b"session=abc"), (b"accept", b"*/*")],
+    }
+    request = Request(scope, _receive, {})
+    assert request._headers is None and request._query is None and request._cookies is None
+
+    assert request.method == "GET"
+    assert request.headers is request.headers
+    assert request.query["page"] == "2"
+    assert request.cookies == {"session": "abc"}
+    assert not hasattr(request, "__dict__")
@@ -42,3 +42,68 @@ def test_dependency_resolver_errors_on_missing_dependency() -> None:
 
     with pytest.raises(TypeError):
         resolver.call(handler, {})
+
+
+def test_compiled_plan_is_reused_and_prefers_context() -> None:
+    registry = ServiceRegistry(by_type={}, by_alias={})
+    alpha = registry.register(AlphaService(), aliases=[])
+    resolver = DependencyResolver(registry)
+
+    def handler(alpha: AlphaService, extra: str = "default") -> tuple[AlphaService, str]:
+        return alpha, extra
+
+    plan = resolver.compile(handler)
+    assert plan.params == (("alpha", alpha, False), ("extra", None, True))
+    assert resolver.call(handler, {}) == (alpha, "default")
+
+    override = AlphaService()
+    assert resolver.call(handler, {"alpha": override, "extra": "ctx"}) == (override, "ctx")
+
+
+async def test_scoped_providers_share_per_request_and_clean_up() -> None:
+    from yaaf.di import REQUEST, TRANSIENT, RequestScope, ScopedProvider
+
+    registry = ServiceRegistry(by_type={}, by_alias={})
+    resolver = DependencyResolver(registry)
+    events: list[str] = []
+
+    class Session:
+        pass
+
+    async def session_factory():
+        events.append("open")
+        yield Session()
+        events.append("close")
+
+    class Tracer:
+        def __init__(self, session: Session) -> None:
+            self.session = session
+
+    session = registry.register(
+        ScopedProvider(plan=resolver.plan(session_factory), lifetime=REQUEST, service_type=Session),
+        aliases=[],
+    )
+    registry.register(ScopedProvider(plan=resolver.plan(Tracer), lifetime=TRANSIENT, service_type=Tracer), aliases=[])
+
+    def handler(first: Tracer, second: Tracer, session: Session) -> tuple[Tracer, Tracer, Session]:
+        return first, second, session
+
+    plan = resolver.compile(handler)
+    assert plan.scoped
+    with pytest.raises(RuntimeError):
+        plan({})
+
+    scope = RequestScope()
+    first, second, shared = handler(**await plan.abind({}, scope))
+    assert first is not second
+    assert first.session is second.session is shared
+    assert session.created == 1
+    assert events == ["open"]
+
+    await scope.aclose()
+    assert events == ["open", "close"]
+
+    other = RequestScope()
+    _first, _second, fresh = handler(**await plan.abind({}, other))
+    assert fresh is not shared
+    await other.aclose()
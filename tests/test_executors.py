@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+
+from yaaf.app import App
+from yaaf.executors import INLINE, PROCESS, THREAD, handler_executor, inline
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _get(app: App, path: str) -> bytes:
+    send = DummySend()
+    await app({"type": "http", "method": "GET", "path": path, "headers": []}, _receive, send)
+    return send.messages[1]["body"]
+
+
+def _route(tmp_path: Path, name: str, server: str) -> None:
+    base = tmp_path / "consumers" / "api" / name
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(server)
+
+
+def test_handler_executor_detection() -> None:
+    def sync_handler():
+        return "x"
+
+    async def async_handler():
+        return "x"
+
+    def streaming_handler():
+        yield "x"
+
+    assert handler_executor(sync_handler) == THREAD
+    assert handler_executor(sync_handler, PROCESS) == PROCESS
+    assert handler_executor(async_handler) == INLINE
+    assert handler_executor(streaming_handler) == INLINE
+    assert handler_executor(inline(sync_handler)) == INLINE
+
+
+async def test_sync_handlers_read_the_request_body(tmp_path: Path) -> None:
+    _route(
+        tmp_path,
+        "echo",
+        "from yaaf import inline\n\n"
+        "def post(request):\n"
+        "    return {'text': request.text(), 'bytes': len(request.content)}\n\n"
+        "@inline\n"
+        "def put(request):\n"
+        "    return request.text()\n",
+    )
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"hello", "more_body": False}
+
+    for method, expected in (("POST", b'{"text":"hello","bytes":5}'), ("PUT", b"hello")):
+        send = DummySend()
+        await app({"type": "http", "method": method, "path": "/api/echo", "headers": []}, receive, send)
+        assert send.messages[1]["body"].replace(b" ", b"") == expected
+
+
+async def test_sync_handlers_run_in_thread_pool_unless_inline(tmp_path: Path) -> None:
+    _route(
+        tmp_path,
+        "blocking",
+        "import threading, time\n\n"
+        "def get():\n"
+        "    time.sleep(0.2)\n"
+        "    return str(threading.get_ident())\n",
+    )
+    _route(
+        tmp_path,
+        "cheap",
+        "import threading\n"
+        "from yaaf import inline\n\n"
+        "@inline\n"
+        "def get():\n"
+        "    return str(threading.get_ident())\n",
+    )
+    app = App(consumers_dir=str(tmp_path / "consumers"), thread_pool_size=4)
+
+    started = time.monotonic()
+    results = await asyncio.gather(_get(app, "/api/blocking"), _get(app, "/api/blocking"))
+    assert time.monotonic() - started < 0.35
+    assert all(int(result) != threading.get_ident() for result in results)
+    assert int(await _get(app, "/api/cheap")) == threading.get_ident()
+
+    stats = app.thread_pool.stats()
+    assert stats["max_workers"] == 4
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
+    await app.shutdown()
+
+
+async def test_process_executor_route(tmp_path: Path) -> None:
+    _route(
+        tmp_path,
+        "cpu",
+        "import os\n\n"
+        "executor = 'process'\n\n"
+        "def get(params):\n"
+        "    return str(os.getpid())\n",
+    )
+    app = App(consumers_dir=str(tmp_path / "consumers"), process_pool_size=1)
+    assert int(await _get(app, "/api/cpu")) != os.getpid()
+    assert app.process_pool.stats()["completed"] == 1
+    await app.shutdown()
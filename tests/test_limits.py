@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from yaaf.app import App
+from yaaf.limits import AIMDLimit, ConcurrencyLimiter, GradientLimit
+from yaaf.responses import Response
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+    @property
+    def status(self) -> int:
+        return self.messages[0]["status"]
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _call(app: App, path: str) -> DummySend:
+    send = DummySend()
+    await app({"type": "http", "method": "GET", "path": path, "headers": []}, _receive, send)
+    return send
+
+
+def _write(tmp_path: Path, route: str, source: str) -> None:
+    base = tmp_path / "consumers" / "api" / route
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(source)
+
+
+async def test_limiter_queues_then_sheds_with_retry_after() -> None:
+    limiter = ConcurrencyLimiter(limit=1, queue=1, retry_after=7)
+    gate = asyncio.Event()
+
+    async def handler(_request: object) -> Response:
+        await gate.wait()
+        return Response.text("ok")
+
+    first = asyncio.create_task(limiter(None, handler))
+    second = asyncio.create_task(limiter(None, handler))
+    await asyncio.sleep(0)
+    shed = await limiter(None, handler)
+    assert shed.status == 503
+    assert (b"retry-after", b"7") in shed.headers
+    assert limiter.stats() == {
+        "limit": 1,
+        "in_flight": 1,
+        "queued": 1,
+        "admitted": 1,
+        "shed": 1,
+        "queue_timeouts": 0,
+    }
+
+    gate.set()
+    assert [response.status for response in await asyncio.gather(first, second)] == [200, 200]
+    assert limiter.in_flight == 0
+    assert limiter.admitted == 2
+
+
+async def test_queued_request_is_shed_after_queue_timeout() -> None:
+    limiter = ConcurrencyLimiter(limit=1, queue_timeout=0.01)
+    assert await limiter.acquire()
+    assert not await limiter.acquire()
+    assert limiter.queue_timeouts == 1
+    assert limiter.stats()["queued"] == 0
+    limiter.release()
+    assert await limiter.acquire()
+
+
+async def test_cancelled_waiter_does_not_leak_a_slot() -> None:
+    limiter = ConcurrencyLimiter(limit=1)
+    assert await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.in_flight == 0
+    assert await limiter.acquire()
+
+
+def test_aimd_limit_grows_when_busy_and_backs_off_on_drops() -> None:
+    limit = AIMDLimit(initial=10, max_limit=11, latency_threshold=1.0)
+    limit.update(0.1, in_flight=2, dropped=False)
+    assert limit.limit == 10
+    limit.update(0.1, in_flight=5, dropped=False)
+    limit.update(0.1, in_flight=5, dropped=False)
+    assert limit.limit == 11
+    limit.update(0.1, in_flight=5, dropped=True)
+    assert limit.limit == 9
+    limit.update(2.0, in_flight=5, dropped=False)
+    assert limit.limit == 8
+
+
+def test_gradient_limit_shrinks_when_latency_rises() -> None:
+    limit = GradientLimit(initial=50, smoothing=0.5)
+    for _ in range(20):
+        limit.update(0.01, in_flight=50, dropped=False)
+    grown = limit.limit
+    assert grown > 50
+    for _ in range(20):
+        limit.update(0.1, in_flight=50, dropped=False)
+    assert limit.limit < grown
+
+
+async def test_adaptive_limiter_counts_server_errors_as_drops() -> None:
+    limiter = ConcurrencyLimiter.from_value(AIMDLimit(initial=10))
+
+    async def failing(_request: object) -> Response:
+        return Response.text("boom", status=500)
+
+    await limiter(None, failing)
+    assert limiter.limit == 9
+
+
+def test_from_value_rejects_unknown_declarations() -> None:
+    assert ConcurrencyLimiter.from_value(None) is None
+    assert ConcurrencyLimiter.from_value({"limit": 3, "queue": 0}).max_queue == 0
+    with pytest.raises(TypeError):
+        ConcurrencyLimiter.from_value("lots")
+    with pytest.raises(ValueError):
+        ConcurrencyLimiter(limit=0)
+
+
+async def test_route_concurrency_declared_in_server_module(tmp_path: Path) -> None:
+    _write(
+        tmp_path,
+        "slow",
+        "import asyncio\n\n"
+        "concurrency = {'limit': 1, 'queue': 0}\n\n"
+        "async def get():\n"
+        "    await asyncio.sleep(0.05)\n"
+        "    return {'ok': True}\n",
+    )
+    app = App(consumers_dir=str(tmp_path / "consumers"), metrics=True)
+    first, second = await asyncio.gather(_call(app, "/api/slow"), _call(app, "/api/slow"))
+    assert sorted([first.status, second.status]) == [200, 503]
+    assert app.limit_stats()["/api/slow"]["shed"] == 1
+
+    body = (await _call(app, "/metrics")).messages[1]["body"].decode()
+    assert 'yaaf_requests_shed_total{route="/api/slow"} 1' in body
+    assert 'yaaf_concurrency_limit{route="/api/slow"} 1' in body
+
+
+async def test_app_wide_limit_applies_to_every_route(tmp_path: Path) -> None:
+    _write(tmp_path, "a", "import asyncio\n\nasync def get():\n    await asyncio.sleep(0.05)\n    return 'a'\n")
+    _write(tmp_path, "b", "async def get():\n    return 'b'\n")
+    app = App(consumers_dir=str(tmp_path / "consumers"), concurrency={"limit": 1, "queue": 0})
+    slow, fast = await asyncio.gather(_call(app, "/api/a"), _call(app, "/api/b"))
+    assert (slow.status, fast.status) == (200, 503)
+    assert app.limit_stats()["<app>"]["shed"] == 1
+
+
+async def test_handler_timeout_cancels_and_returns_504(tmp_path: Path) -> None:
+    _write(
+        tmp_path,
+        "slow",
+        "import asyncio\n\n"
+        "timeout = 0.01\n"
+        "cancelled = []\n\n"
+        "async def get():\n"
+        "    try:\n"
+        "        await asyncio.sleep(10)\n"
+        "    except asyncio.CancelledError:\n"
+        "        cancelled.append(True)\n"
+        "        raise\n",
+    )
+    _write(tmp_path, "fast", "async def get():\n    return 'fast'\n")
+    app = App(consumers_dir=str(tmp_path / "consumers"), timeout=5.0, metrics=True)
+
+    send = await _call(app, "/api/slow")
+    assert send.status == 504
+    slow = next(route for route in app._routes if route.route_parts == ["slow"])
+    assert slow.server_module.cancelled == [True]
+    assert (await _call(app, "/api/fast")).status == 200
+    assert app.limit_stats() == {"/api/slow": {"timed_out": 1}}
+    body = (await _call(app, "/metrics")).messages[1]["body"].decode()
+    assert 'yaaf_requests_timed_out_total{route="/api/slow"} 1' in body
+
+
+async def test_timeout_error_raised_by_handler_is_not_a_timeout(tmp_path: Path) -> None:
+    _write(tmp_path, "raises", "timeout = 5\n\nasync def get():\n    raise TimeoutError('downstream')\n")
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    with pytest.raises(TimeoutError, match="downstream"):
+        await _call(app, "/api/raises")
+    assert app.timeouts == {}
+
+
+def test_invalid_timeout_declaration_is_rejected(tmp_path: Path) -> None:
+    _write(tmp_path, "bad", "timeout = 'soon'\n\nasync def get():\n    return 'x'\n")
+    with pytest.raises(ValueError, match="timeout"):
+        App(consumers_dir=str(tmp_path / "consumers"))._ensure_routes()
@@ -37,3 +37,86 @@ def test_discover_routes_dynamic_shadow_warning(tmp_path: Path, capsys: pytest.C
     discover_routes(str(tmp_path / "consumers"))
     captured = capsys.readouterr()
     assert "dynamic route /api/[name] matches static route /api/hello" in captured.out
+
+
+def _service_tree(tmp_path: Path, services: dict[str, str]) -> str:
+    base = tmp_path / "consumers" / "api"
+    for name, source in services.items():
+        (base / name).mkdir(parents=True)
+        (base / name / "_service.py").write_text(source)
+        (base / name / "_server.py").write_text("async def get():...\n")
+    return str(tmp_path / "consumers")
+
+
+def test_discover_routes_builds_services_in_dependency_order(tmp_path: Path) -> None:
+    consumers = _service_tree(
+        tmp_path,
+        {
+            "a": "class Service:\n    def __init__(self, b: 'BService'):\n        self.b = b\n",
+            "b": "class Service:\n    def __init__(self, c: 'CService'):\n        self.c = c\n",
+            "c": "class Service:\n    pass\n",
+        },
+    )
+    _routes, registry = discover_routes(consumers)
+    a = registry.by_alias["AService"]
+    assert a.b is registry.by_alias["BService"]
+    assert a.b.c is registry.by_alias["CService"]
+
+
+def test_discover_routes_reports_service_cycle(tmp_path: Path) -> None:
+    consumers = _service_tree(
+        tmp_path,
+        {
+            "a": "class Service:\n    def __init__(self, b: 'BService'):\n        pass\n",
+            "b": "class Service:\n    def __init__(self, a: 'AService'):\n        pass\n",
+        },
+    )
+    with pytest.raises(RuntimeError, match="cycle") as excinfo:
+        discover_routes(consumers)
+    assert str(Path("api") / "a") in str(excinfo.value)
+    assert str(Path("api") / "b") in str(excinfo.value)
+
+
+def test_discover_routes_orders_unannotated_factories_before_dependents(tmp_path: Path) -> None:
+    consumers = _service_tree(
+        tmp_path,
+        {
+            "a": "class Service:\n    def __init__(self, dep: 'Widget'):\n        self.dep = dep\n",
+            "b": "class Widget:\n    pass\n\ndef get_service():\n    return Widget()\n",
+            "c": "class Gadget:\n    pass\n\nservice = lambda: Gadget()\n",
+        },
+    )
+    _routes, registry = discover_routes(consumers)
+    assert type(registry.by_alias["AService"].dep).__name__ == "Widget"
+
+
+def test_discover_routes_defaulted_unmatched_parameters_add_no_dependencies(tmp_path: Path) -> None:
+    source = "def get_service(extra: 'Missing' = None):\n    return object()\n"
+    consumers = _service_tree(tmp_path, {"a": source, "b": source})
+    _routes, registry = discover_routes(consumers)
+    assert "AService" in registry.by_alias and "BService" in registry.by_alias
+
+
+def test_discover_routes_propagates_constructor_errors(tmp_path: Path) -> None:
+    consumers = _service_tree(
+        tmp_path,
+        {"a": "class Service:\n    def __init__(self):\n        raise TypeError('broken service')\n"},
+    )
+    with pytest.raises(TypeError, match="broken service"):
+        discover_routes(consumers)
+
+
+def test_discover_routes_builds_independent_services_in_parallel(tmp_path: Path) -> None:
+    source = (
+        "import threading, time\n"
+        "class Service:\n"
+        "    def __init__(self):\n"
+        "        time.sleep(0.2)\n"
+        "        self.thread = threading.get_ident()\n"
+    )
+    consumers = _service_tree(tmp_path, {"a": source, "b": source})
+    _routes, registry = discover_routes(consumers, max_workers=2)
+    assert registry.by_alias["AService"].thread != registry.by_alias["BService"].thread
+
+    _routes, registry = discover_routes(consumers, max_workers=1)
+    assert registry.by_alias["AService"].thread == registry.by_alias["BService"].thread
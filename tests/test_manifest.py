@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from yaaf import manifest as manifest_module
+from yaaf.loader import discover_routes, scan_routes
+from yaaf.manifest import load_manifest
+
+
+def _make_route(base: Path, *parts: str, service: bool = True) -> Path:
+    path = base.joinpath("api", *parts)
+    path.mkdir(parents=True)
+    (path / "_server.py").write_text("async def get():\n    return 'ok'\n")
+    if service:
+        (path / "_service.py").write_text("class Service:...\nservice = Service()\n")
+    return path
+
+
+def _count_listings(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    listed: list[str] = []
+    original = manifest_module._list_directory
+
+    def counting(directory: Path, mtime_ns: int):
+        listed.append(str(directory))
+        return original(directory, mtime_ns)
+
+    monkeypatch.setattr(manifest_module, "_list_directory", counting)
+    return listed
+
+
+def test_manifest_written_and_reused(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    consumers = tmp_path / "consumers"
+    _make_route(consumers, "hello")
+    _make_route(consumers, "users", "[id]", service=False)
+    manifest_path = tmp_path / ".yaaf" / "manifest.json"
+
+    first = scan_routes(str(consumers), str(manifest_path))
+    data = json.loads(manifest_path.read_text())
+    assert data["root"] == str(consumers.resolve())
+    assert [route["route_parts"] for route in data["routes"]] == [["hello"], ["users", "[id]"]]
+    assert data["routes"][1]["param_names"] == ["id"]
+    assert set(data["routes"][0]["files"]) == {"_server.py", "_service.py"}
+
+    listed = _count_listings(monkeypatch)
+    before = manifest_path.stat().st_mtime_ns
+    second = scan_routes(str(consumers), str(manifest_path))
+    assert listed == []
+    assert not second.changed
+    assert [route.route_parts for route in second.routes] == [route.route_parts for route in first.routes]
+    assert manifest_path.stat().st_mtime_ns == before
+
+
+def test_manifest_rescans_changed_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    consumers = tmp_path / "consumers"
+    _make_route(consumers, "hello")
+    manifest_path = tmp_path / "manifest.json"
+    scan_routes(str(consumers), str(manifest_path))
+
+    _make_route(consumers, "[name]")
+    api = consumers / "api"
+    os.utime(api, ns=(api.stat().st_atime_ns, api.stat().st_mtime_ns + 1_000_000))
+    listed = _count_listings(monkeypatch)
+    routes, _registry = discover_routes(str(consumers), str(manifest_path))
+
+    assert str(consumers) not in listed
+    assert str(api) in listed
+    assert str(api / "hello") not in listed
+    assert sorted(route.route_parts for route in routes) == [["[name]"], ["hello"]]
+    reloaded = load_manifest(manifest_path, str(consumers))
+    assert reloaded is not None
+    assert reloaded.warnings == ["Warning: dynamic route /api/[name] matches static route /api/hello"]
+
+
+def test_load_manifest_rejects_other_roots(tmp_path: Path) -> None:
+    consumers = tmp_path / "consumers"
+    _make_route(consumers, "hello")
+    manifest_path = tmp_path / "manifest.json"
+    scan_routes(str(consumers), str(manifest_path))
+
+    assert load_manifest(manifest_path, str(tmp_path / "elsewhere")) is None
+    manifest_path.write_text("not json")
+    assert load_manifest(manifest_path, str(consumers)) is None
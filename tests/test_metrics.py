@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from yaaf.app import App
+from yaaf.metrics import BODY, HANDLER, PHASES, ROUTE, SEND, Histogram, Metrics, RequestTimer, route_label
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"hello", "more_body": False}
+
+
+async def _call(app: App, method: str, path: str) -> DummySend:
+    send = DummySend()
+    await app({"type": "http", "method": method, "path": path, "headers": []}, _receive, send)
+    return send
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_histogram_quantiles_are_close_and_memory_is_fixed() -> None:
+    histogram = Histogram()
+    buckets = len(histogram._counts)
+    for micros in range(1, 100_001):
+        histogram.record(micros / 1_000_000)
+    assert len(histogram._counts) == buckets
+    assert histogram.count == 100_000
+    assert histogram.quantile(0.5) == pytest.approx(0.05, rel=0.04)
+    assert histogram.quantile(0.99) == pytest.approx(0.099, rel=0.04)
+    assert histogram.quantile(1.0) == pytest.approx(0.1)
+
+    histogram.record(10_000.0)
+    assert histogram.max == 10_000.0
+    assert len(histogram._counts) == buckets
+
+
+def test_route_label_of_root_and_nested_routes() -> None:
+    assert route_label([]) == "/api"
+    assert route_label(["users", "[id]"]) == "/api/users/[id]"
+
+
+def test_request_timer_takes_added_time_out_of_the_next_phase() -> None:
+    clock = FakeClock()
+    timer = RequestTimer(clock, 0.0)
+    clock.now = 1.0
+    timer.mark(ROUTE)
+    clock.now = 5.0
+    timer.add(BODY, 3.0)
+    timer.mark(HANDLER)
+    assert dict(zip(PHASES, timer.times)) == {
+        "route": 1.0,
+        "middleware": 0.0,
+        "body": 3.0,
+        "inject": 0.0,
+        "handler": 1.0,
+        "serialize": 0.0,
+        "send": 0.0,
+    }
+
+
+def _consumers(tmp_path: Path) -> str:
+    base = tmp_path / "consumers" / "api" / "items" / "[item_id]"
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(
+        "import asyncio\n\n"
+        "async def get(params):\n"
+        "    await asyncio.sleep(float(params['item_id']))\n"
+        "    return {'id': params['item_id']}\n\n"
+        "async def post(request):\n"
+        "    return await request.body()\n"
+    )
+    return str(tmp_path / "consumers")
+
+
+async def test_metrics_are_off_by_default(tmp_path: Path) -> None:
+    app = App(consumers_dir=_consumers(tmp_path))
+    assert app.metrics is None
+    send = await _call(app, "GET", "/metrics")
+    assert send.messages[0]["status"] == 404
+
+
+async def test_metrics_count_time_and_expose_requests(tmp_path: Path) -> None:
+    app = App(consumers_dir=_consumers(tmp_path), metrics=True)
+
+    slow = asyncio.ensure_future(_call(app, "GET", "/api/items/0.05"))
+    await asyncio.sleep(0.01)
+    assert app.metrics.routes[("/api/items/[item_id]", "GET")].in_flight == 1
+    await slow
+    await _call(app, "GET", "/api/items/0")
+    await _call(app, "POST", "/api/items/0")
+    await _call(app, "GET", "/missing")
+
+    stats = app.metrics.routes[("/api/items/[item_id]", "GET")]
+    assert stats.in_flight == 0
+    assert stats.statuses == {200: 2}
+    assert stats.latency.max >= 0.05
+    assert stats.phase_seconds[HANDLER] >= 0.05
+    assert stats.phase_seconds[SEND] > 0
+    post = app.metrics.routes[("/api/items/[item_id]", "POST")]
+    assert post.phase_seconds[BODY] > 0
+    assert app.metrics.routes[("<unmatched>", "GET")].statuses == {404: 1}
+    await _call(app, "BREW", "/missing")
+    await _call(app, "X-RANDOM-1", "/missing")
+    assert app.metrics.routes[("<unmatched>", "other")].statuses == {404: 2}
+    assert not any(method.startswith(("BREW", "X-")) for _route, method in app.metrics.routes)
+
+    send = await _call(app, "GET", "/metrics")
+    assert dict(send.messages[0]["headers"])[b"content-type"].startswith(b"text/plain; version=0.0.4")
+    text = send.messages[1]["body"].decode()
+    assert 'yaaf_requests_total{route="/api/items/[item_id]",method="GET",status="200"} 2' in text
+    assert 'yaaf_requests_in_flight{route="/api/items/[item_id]",method="GET"} 0' in text
+    assert 'yaaf_request_duration_seconds_count{route="/api/items/[item_id]",method="GET"} 2' in text
+    assert 'yaaf_request_phase_seconds_total{route="/api/items/[item_id]",method="POST",phase="body"}' in text
+    assert 'yaaf_discovery_import_seconds{module="api/items/[item_id]/_server.py"}' in text
+
+
+def test_metrics_render_discovery_and_escape_labels() -> None:
+    metrics = Metrics()
+    metrics.record_discovery(
+        "/srv/consumers",
+        {Path("/srv/consumers/api/a/_service.py"): 0.5},
+        {Path("/srv/consumers/api/a"): 0.25},
+    )
+    metrics.route('/api/"quoted"', "GET").observe(200, 0.001, {})
+    text = metrics.render()
+    assert 'yaaf_discovery_import_seconds{module="api/a/_service.py"} 0.5' in text
+    assert 'yaaf_service_construction_seconds{service="api/a"} 0.25' in text
+    assert 'route="/api/\\"quoted\\""' in text
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from yaaf.app import App
+from yaaf.middleware import compose
+from yaaf.responses import Response
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _get(app: App, path: str, headers: list[tuple[bytes, bytes]] | None = None) -> tuple[int, bytes, dict]:
+    send = DummySend()
+    await app({"type": "http", "method": "GET", "path": path, "headers": headers or []}, _receive, send)
+    return send.messages[0]["status"], send.messages[1]["body"], dict(send.messages[0]["headers"])
+
+
+def _tagging(tag: str) -> str:
+    return (
+        "async def middleware(request, call_next):\n"
+        "    response = await call_next(request)\n"
+        f"    return response.with_headers([('x-trace', '{tag}')])\n"
+    )
+
+
+def _build_tree(tmp_path: Path) -> Path:
+    consumers = tmp_path / "consumers"
+    for name in ("admin/users", "public"):
+        (consumers / "api" / name).mkdir(parents=True)
+        (consumers / "api" / name / "_server.py").write_text(f"def get():\n    return '{name}'\n")
+    (consumers / "_middleware.py").write_text(_tagging("root"))
+    (consumers / "api" / "admin" / "_middleware.py").write_text(
+        "from yaaf.responses import Response\n\n"
+        "async def require_token(request, call_next):\n"
+        "    if request.headers.get('authorization') != 'secret':\n"
+        "        return Response.text('Unauthorized', status=401)\n"
+        "    return await call_next(request)\n\n"
+        "middleware = [require_token]\n"
+    )
+    return consumers
+
+
+async def test_compose_runs_middleware_outermost_first() -> None:
+    calls: list[str] = []
+
+    def layer(name: str):
+        async def middleware(request, call_next):
+            calls.append(f"{name} in")
+            response = await call_next(request)
+            calls.append(f"{name} out")
+            return response
+
+        return middleware
+
+    async def endpoint(request) -> Response:
+        calls.append("endpoint")
+        return Response.text(request)
+
+    response = await compose([layer("a"), layer("b")], endpoint)("req")
+    assert response.body == b"req"
+    assert calls == ["a in", "b in", "endpoint", "b out", "a out"]
+
+
+async def test_filesystem_middleware_applies_to_its_subtree(tmp_path: Path) -> None:
+    app = App(consumers_dir=str(_build_tree(tmp_path)))
+
+    status, body, headers = await _get(app, "/api/public")
+    assert (status, body, headers[b"x-trace"]) == (200, b"public", b"root")
+
+    status, body, headers = await _get(app, "/api/admin/users")
+    assert (status, headers[b"x-trace"]) == (401, b"root")
+
+    status, body, _headers = await _get(app, "/api/admin/users", [(b"authorization", b"secret")])
+    assert (status, body) == (200, b"admin/users")
+
+
+async def test_app_middleware_wraps_filesystem_middleware(tmp_path: Path) -> None:
+    app = App(consumers_dir=str(_build_tree(tmp_path)))
+    order: list[str] = []
+
+    @app.add_middleware
+    async def record(request, call_next):
+        order.append(request.path)
+        response = await call_next(request)
+        order.append(dict(response.headers)[b"x-trace"].decode())
+        return response
+
+    await _get(app, "/api/public")
+    assert order == ["/api/public", "root"]
+
+
+async def test_reload_picks_up_middleware_changes(tmp_path: Path) -> None:
+    consumers = _build_tree(tmp_path)
+    app = App(consumers_dir=str(consumers))
+    assert (await _get(app, "/api/public"))[2][b"x-trace"] == b"root"
+
+    target = consumers / "_middleware.py"
+    stat = target.stat()
+    target.write_text(_tagging("edited"))
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert await app.reload() is True
+    assert (await _get(app, "/api/public"))[2][b"x-trace"] == b"edited"
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from yaaf.app import App
+from yaaf.pool import Pool, PoolClosed, PoolTimeout
+
+
+class FakeConnection:
+    opened = 0
+
+    def __init__(self) -> None:
+        FakeConnection.opened += 1
+        self.id = FakeConnection.opened
+        self.healthy = True
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_pool_opens_min_size_and_reuses_resources() -> None:
+    pool = Pool(FakeConnection, min_size=2, max_size=3, max_idle=None)
+    async with pool:
+        assert pool.stats()["idle"] == 2
+        async with pool.acquire() as first:
+            assert pool.stats()["in_use"] == 1
+            assert pool.stats()["utilisation"] == pytest.approx(1 / 3)
+        async with pool.acquire() as second:
+            assert second is first
+        assert pool.stats()["created"] == 2
+    assert first.closed
+    with pytest.raises(PoolClosed):
+        await pool.get()
+
+
+async def test_pool_waiters_get_released_resources_and_time_out() -> None:
+    pool = Pool(FakeConnection, max_size=1, acquire_timeout=0.05, max_idle=None)
+    await pool.open()
+    held = await pool.get()
+
+    with pytest.raises(PoolTimeout):
+        await pool.get()
+    assert pool.stats()["timeouts"] == 1
+
+    waiter = asyncio.create_task(pool.get())
+    await asyncio.sleep(0)
+    await pool.put(held)
+    assert await waiter is held
+    assert pool.stats()["max_wait"] > 0
+    await pool.put(held)
+    await pool.close()
+
+
+async def test_cancelled_waiter_passes_a_freed_slot_on() -> None:
+    pool = Pool(FakeConnection, max_size=1, acquire_timeout=1.0, max_idle=None)
+    await pool.open()
+    held = await pool.get()
+    first = asyncio.create_task(pool.get())
+    second = asyncio.create_task(pool.get())
+    await asyncio.sleep(0)
+
+    await pool.put(held, discard=True)
+    first.cancel()
+    replacement = await asyncio.wait_for(second, 0.5)
+    assert replacement is not held
+    assert first.cancelled()
+    await pool.put(replacement)
+    await pool.close()
+
+
+async def test_failed_open_closes_what_it_created() -> None:
+    made: list[FakeConnection] = []
+    calls = 0
+
+    def create() -> FakeConnection:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise ConnectionError("refused")
+        made.append(FakeConnection())
+        return made[-1]
+
+    pool = Pool(create, min_size=3, max_size=3, max_idle=None)
+    with pytest.raises(ConnectionError):
+        await pool.open()
+    assert len(made) == 2 and all(connection.closed for connection in made)
+    assert pool.stats()["size"] == 0 and pool.stats()["idle"] == 0
+
+    await pool.open()
+    assert pool.stats()["size"] == 3
+    await pool.close()
+
+
+async def test_pool_replaces_unhealthy_resources_on_checkout() -> None:
+    pool = Pool(FakeConnection, check=lambda connection: connection.healthy, max_idle=None)
+    await pool.open()
+    async with pool.acquire() as first:
+        first.healthy = False
+    async with pool.acquire() as second:
+        assert second is not first
+    assert first.closed
+    assert pool.stats()["size"] == 1
+    await pool.close()
+
+
+async def test_pool_evicts_idle_resources_above_min_size() -> None:
+    clock = FakeClock()
+    pool = Pool(FakeConnection, min_size=1, max_size=3, max_idle=10.0, clock=clock)
+    await pool.open()
+    first, second = await pool.get(), await pool.get()
+    await pool.put(first)
+    await pool.put(second)
+    assert pool.stats()["size"] == 2
+
+    clock.now = 5.0
+    assert await pool.evict_idle() == 0
+    clock.now = 20.0
+    assert await pool.evict_idle() == 1
+    assert pool.stats()["size"] == 1
+    await pool.close()
+
+
+async def test_pool_close_waits_for_checked_out_resources() -> None:
+    pool = Pool(FakeConnection, max_idle=None)
+    await pool.open()
+    held = await pool.get()
+    closing = asyncio.create_task(pool.close(timeout=1.0))
+    await asyncio.sleep(0.01)
+    assert not closing.done()
+    await pool.put(held)
+    await closing
+    assert held.closed
+
+
+async def test_pool_service_is_opened_and_drained_by_the_app(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api" / "db"
+    base.mkdir(parents=True)
+    (base / "_service.py").write_text(
+        "from yaaf.pool import Pool\n\n"
+        "class Connection:\n"
+        "    closed = False\n\n"
+        "    def close(self):\n"
+        "        self.closed = True\n\n"
+        "service = Pool(Connection, min_size=2, max_size=4)\n"
+    )
+    (base / "_server.py").write_text(
+        "async def get(pool: 'DbService'):\n"
+        "    async with pool.acquire():\n"
+        "        return pool.stats()\n"
+    )
+
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    await app.startup()
+    pool = app._registry.resolve("DbService")
+    assert pool.stats()["idle"] == 2
+
+    messages: list[dict] = []
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    await app({"type": "http", "method": "GET", "path": "/api/db", "headers": []}, receive, send)
+    assert json.loads(messages[1]["body"])["in_use"] == 1
+
+    connections = [connection for connection, _last_used in pool._idle]
+    await app.shutdown()
+    assert pool.stats()["size"] == 0
+    assert all(connection.closed for connection in connections)
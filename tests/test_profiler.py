@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from yaaf.app import App
+from yaaf.profiler import OTHER, SamplingProfiler
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _burn(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _helper(stop: threading.Event) -> None:
+    _burn(stop)
+
+
+def test_samples_are_filed_under_the_route_whose_handler_is_on_the_stack() -> None:
+    profiler = SamplingProfiler(hz=1000)
+    profiler.set_routes([("/api/burn", _helper)])
+    stop = threading.Event()
+    worker = threading.Thread(target=_helper, args=(stop,))
+    other = threading.Thread(target=_burn, args=(stop,))
+    worker.start()
+    other.start()
+    try:
+        for _ in range(5):
+            profiler._sample(sys._current_frames())
+    finally:
+        stop.set()
+        worker.join()
+        other.join()
+
+    assert profiler.routes() == ["/api/burn", OTHER]
+    burn = profiler.collapsed("/api/burn").splitlines()
+    assert burn and all(line.startswith("/api/burn;") for line in burn)
+    assert any("_helper (test_profiler.py:" in line and ";_burn (test_profiler.py:" in line for line in burn)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in burn) == 5
+    assert profiler.stats()["samples"] == 5
+
+    profiler.reset()
+    assert profiler.collapsed() == ""
+
+
+def test_distinct_stacks_are_bounded() -> None:
+    profiler = SamplingProfiler(max_stacks=1)
+    profiler.set_routes([("/api/burn", _helper)])
+    stop = threading.Event()
+    threads = [threading.Thread(target=target, args=(stop,)) for target in (_helper, _burn)]
+    for thread in threads:
+        thread.start()
+    try:
+        profiler._sample(sys._current_frames())
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert len(profiler._counts) == 1
+    assert "<truncated>" in profiler.collapsed()
+
+
+def test_from_value_reads_flags_and_rates() -> None:
+    assert SamplingProfiler.from_value(None) is None
+    assert SamplingProfiler.from_value("off") is None
+    assert SamplingProfiler.from_value("on").hz == 100.0
+    assert SamplingProfiler.from_value("19").hz == 19.0
+    assert SamplingProfiler.from_value(True).hz == 100.0
+    with pytest.raises(ValueError):
+        SamplingProfiler.from_value("-1")
+
+
+async def test_app_profiles_routes_from_the_environment(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    base = tmp_path / "consumers" / "api" / "burn"
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(
+        "import time\n"
+        "from yaaf import inline\n\n"
+        "@inline\n"
+        "def get():\n"
+        "    deadline = time.perf_counter() + 0.2\n"
+        "    while time.perf_counter() < deadline:\n"
+        "        sum(range(1000))\n"
+        "    return 'done'\n"
+    )
+    monkeypatch.setenv("YAAF_PROFILE", "500")
+    monkeypatch.setenv("YAAF_PROFILE_TOKEN", "s3cret")
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    assert app.profiler is not None and app.profiler.hz == 500.0
+
+    await app.startup()
+    try:
+        await app({"type": "http", "method": "GET", "path": "/api/burn", "headers": []}, _receive, DummySend())
+        time.sleep(0.01)
+
+        anonymous = DummySend()
+        scope = {"type": "http", "method": "GET", "path": "/_yaaf/profile", "headers": [], "client": ("127.0.0.1", 1)}
+        await app(scope, _receive, anonymous)
+        assert anonymous.messages[0]["status"] == 404
+
+        authorized = DummySend()
+        scope = dict(scope, headers=[(b"authorization", b"Bearer s3cret")], query_string=b"route=/api/burn")
+        await app(scope, _receive, authorized)
+        lines = authorized.messages[1]["body"].decode().splitlines()
+        assert lines and all(line.startswith("/api/burn;") for line in lines)
+        assert any("get (_server.py:" in line for line in lines)
+
+        await app(dict(scope, query_string=b"reset=1"), _receive, DummySend())
+        assert app.profiler.collapsed("/api/burn")
+        await app(dict(scope, method="POST"), _receive, DummySend())
+        assert not app.profiler.collapsed("/api/burn")
+    finally:
+        await app.shutdown()
+    assert app.profiler._thread is None
+
+
+async def test_profile_endpoint_is_off_without_a_token(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("YAAF_PROFILE_TOKEN", raising=False)
+    app = App(consumers_dir=str(tmp_path), profile=True)
+    send = DummySend()
+    scope = {"type": "http", "method": "GET", "path": "/_yaaf/profile", "headers": [], "client": ("127.0.0.1", 1)}
+    await app(scope, _receive, send)
+    assert send.messages[0]["status"] == 404
+
+    app = App(consumers_dir=str(tmp_path), profile=True, profile_token="s3cret")
+    send = DummySend()
+    await app(dict(scope, method="DELETE", headers=[(b"authorization", b"Bearer s3cret")]), _receive, send)
+    assert send.messages[0]["status"] == 405
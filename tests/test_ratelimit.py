@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from yaaf.app import App
+from yaaf.ratelimit import (
+    Decision,
+    MemoryBackend,
+    RateAlgorithm,
+    RateLimiter,
+    SlidingWindow,
+    TokenBucket,
+    parse_rate,
+)
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+    @property
+    def status(self) -> int:
+        return self.messages[0]["status"]
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _call(app: App, path: str, client: str = "10.0.0.1", headers: list | None = None) -> DummySend:
+    send = DummySend()
+    scope = {"type": "http", "method": "GET", "path": path, "headers": headers or [], "client": (client, 1234)}
+    await app(scope, _receive, send)
+    return send
+
+
+class SharedStoreBackend:
+    """Stands in for a store shared by workers: state round-trips through bytes under a lock."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.lock = asyncio.Lock()
+
+    async def hit(self, key: str, algorithm: RateAlgorithm, now: float, cost: int = 1) -> Decision:
+        async with self.lock:
+            raw = self.store.get(key)
+            state, decision = algorithm.apply(tuple(json.loads(raw)) if raw else None, now, cost)
+            self.store[key] = json.dumps(state).encode()
+            return decision
+
+
+def _consumers(tmp_path: Path, declaration: str) -> str:
+    base = tmp_path / "consumers" / "api" / "items" / "[item_id]"
+    base.mkdir(parents=True)
+    (base / "_server.py").write_text(f"rate_limit = {declaration}\n\nasync def get(params):\n    return params\n")
+    return str(tmp_path / "consumers")
+
+
+def test_parse_rate() -> None:
+    assert parse_rate("10/s") == TokenBucket(rate=10.0, burst=10)
+    assert parse_rate("120 / minutes") == TokenBucket(rate=2.0, burst=120)
+    assert parse_rate("3600/hour").rate == 1.0
+    assert parse_rate("5/secs").rate == 5.0
+    for text in ("10 per second", "10/ms", "10/hs", "10/minutess"):
+        with pytest.raises(ValueError):
+            parse_rate(text)
+
+
+def test_token_bucket_refills_over_time() -> None:
+    bucket = TokenBucket(rate=2.0, burst=2)
+    state, first = bucket.apply(None, 100.0)
+    state, second = bucket.apply(state, 100.0)
+    state, third = bucket.apply(state, 100.0)
+    assert [first.allowed, second.allowed, third.allowed] == [True, True, False]
+    assert third.retry_after == pytest.approx(0.5)
+    state, later = bucket.apply(state, 100.5)
+    assert later.allowed
+
+
+def test_sliding_window_weights_the_previous_window() -> None:
+    window = SlidingWindow(limit=10, window=60.0)
+    state = None
+    for _ in range(10):
+        state, decision = window.apply(state, 50.0)
+        assert decision.allowed
+    state, decision = window.apply(state, 59.0)
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(1.0)
+
+    # 15s into the next window, 75% of the previous window's 10 requests still count.
+    state, decision = window.apply(state, 75.0)
+    assert decision.allowed and decision.remaining == 1
+    state, decision = window.apply(state, 75.0)
+    assert decision.allowed
+    state, decision = window.apply(state, 75.0)
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(3.0)
+
+    state, decision = window.apply(state, 200.0)
+    assert decision.allowed and decision.remaining == 9
+
+
+async def test_memory_backend_evicts_least_recently_seen_keys() -> None:
+    backend = MemoryBackend(max_keys=2)
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert (await backend.hit("a", bucket, 0.0)).allowed
+    assert (await backend.hit("b", bucket, 0.0)).allowed
+    assert not (await backend.hit("a", bucket, 0.0)).allowed
+    assert (await backend.hit("c", bucket, 0.0)).allowed
+    assert len(backend) == 2
+    assert backend.evictions == 1
+    assert not (await backend.hit("a", bucket, 0.0)).allowed
+    assert (await backend.hit("b", bucket, 0.0)).allowed
+
+
+async def test_route_rate_limit_is_keyed_per_client(tmp_path: Path) -> None:
+    app = App(consumers_dir=_consumers(tmp_path, "'2/minute'"), metrics=True)
+    assert [(await _call(app, "/api/items/1")).status for _ in range(3)] == [200, 200, 429]
+    limited = await _call(app, "/api/items/1")
+    assert (b"retry-after", b"30") in limited.messages[0]["headers"]
+    assert (await _call(app, "/api/items/1", client="10.0.0.2")).status == 200
+
+    assert app.limit_stats() == {"/api/items/[item_id]": {"allowed": 3, "rate_limited": 2}}
+    body = (await _call(app, "/metrics")).messages[1]["body"].decode()
+    assert 'yaaf_requests_rate_limited_total{route="/api/items/[item_id]"} 2' in body
+
+
+async def test_rate_limit_keyed_on_header_and_path_param(tmp_path: Path) -> None:
+    app = App(consumers_dir=_consumers(tmp_path, "{'limit': '1/minute', 'key': 'param:item_id'}"))
+    assert (await _call(app, "/api/items/1")).status == 200
+    assert (await _call(app, "/api/items/1", client="10.0.0.2")).status == 429
+    assert (await _call(app, "/api/items/2")).status == 200
+
+    limiter = RateLimiter("1/minute", key="header:x-api-key")
+
+    async def ok(_request: object) -> str:
+        return "ok"
+
+    class FakeRequest:
+        def __init__(self, api_key: str) -> None:
+            self.scope = {"client": ("10.0.0.1", 1)}
+            self.headers = {"x-api-key": api_key}
+
+    assert await limiter(FakeRequest("a"), ok) == "ok"
+    assert (await limiter(FakeRequest("a"), ok)).status == 429
+    assert await limiter(FakeRequest("b"), ok) == "ok"
+
+
+async def test_app_wide_limit_is_checked_before_middleware(tmp_path: Path) -> None:
+    seen: list[str] = []
+
+    async def record(request, call_next):
+        seen.append(request.path)
+        return await call_next(request)
+
+    app = App(consumers_dir=_consumers(tmp_path, "None"), rate_limit="1/minute", middleware=[record])
+    assert (await _call(app, "/api/items/1")).status == 200
+    assert (await _call(app, "/api/items/2")).status == 429
+    assert seen == ["/api/items/1"]
+
+
+async def test_workers_share_limits_through_a_backend(tmp_path: Path) -> None:
+    backend = SharedStoreBackend()
+    consumers = _consumers(tmp_path, "{'limit': SlidingWindow(limit=3, window=60), 'clock': lambda: 30.0}")
+    server = tmp_path / "consumers" / "api" / "items" / "[item_id]" / "_server.py"
+    server.write_text("from yaaf.ratelimit import SlidingWindow\n\n" + server.read_text())
+    workers = [App(consumers_dir=consumers, rate_limit_backend=backend) for _ in range(2)]
+
+    statuses = [(await _call(workers[index % 2], "/api/items/1")).status for index in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    assert list(backend.store) == ["/api/items/[item_id]|10.0.0.1"]
+
+
+async def test_limiter_instances_take_the_route_scope(tmp_path: Path) -> None:
+    backend = SharedStoreBackend()
+    base = tmp_path / "consumers" / "api"
+    for name in ("a", "b"):
+        (base / name).mkdir(parents=True)
+        (base / name / "_server.py").write_text(
+            "from yaaf.ratelimit import RateLimiter\n\n"
+            "rate_limit = RateLimiter('1/minute')\n\n"
+            "async def get():\n    return 'ok'\n"
+        )
+    app = App(consumers_dir=str(tmp_path / "consumers"), rate_limit_backend=backend)
+    assert [(await _call(app, f"/api/{name}")).status for name in ("a", "b")] == [200, 200]
+    assert sorted(backend.store) == ["/api/a|10.0.0.1", "/api/b|10.0.0.1"]
+    assert RateLimiter.from_value(RateLimiter("1/s", scope="mine"), scope="/api/x").scope == "mine"
+
+
+def test_invalid_declarations_are_rejected() -> None:
+    with pytest.raises(TypeError):
+        RateLimiter.from_value(10)
+    for rate in ("0/s", "0.0/minute"):
+        with pytest.raises(ValueError, match="positive"):
+            parse_rate(rate)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0.0, burst=1)
+    with pytest.raises(ValueError):
+        SlidingWindow(limit=0, window=60)
+    with pytest.raises(ValueError):
+        SlidingWindow(limit=5, window=0)
+    with pytest.raises(ValueError):
+        RateLimiter("10/s", key="cookie:session")
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+from yaaf.app import App
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _get(app: App, path: str) -> bytes:
+    send = DummySend()
+    await app({"type": "http", "method": "GET", "path": path, "headers": []}, _receive, send)
+    return send.messages[1]["body"]
+
+
+def _touch(path: Path, content: str) -> None:
+    stat = path.stat() if path.exists() else None
+    path.write_text(content)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def _build_tree(tmp_path: Path) -> Path:
+    base = tmp_path / "consumers" / "api"
+    for name in ("users", "hello", "other"):
+        (base / name).mkdir(parents=True)
+    _touch(base / "users" / "_service.py", "class Service:\n    name = 'Austin'\n\nservice = Service()\n")
+    _touch(base / "users" / "_server.py", "def get(service: 'UsersService'):\n    return service.name\n")
+    _touch(
+        base / "hello" / "_service.py",
+        "class Service:\n"
+        "    def __init__(self, users: 'UsersService') -> None:\n"
+        "        self.users = users\n\n"
+        "service = Service\n",
+    )
+    _touch(base / "hello" / "_server.py", "def get(service: 'HelloService'):\n    return 'hello ' + service.users.name\n")
+    _touch(base / "other" / "_service.py", "class Service:...\n\nservice = Service()\n")
+    _touch(base / "other" / "_server.py", "def get():\n    return 'other v1'\n")
+    return base
+
+
+async def test_reload_rebuilds_only_changed_and_dependent_services(tmp_path: Path) -> None:
+    base = _build_tree(tmp_path)
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    assert await _get(app, "/api/hello") == b"hello Austin"
+
+    services = {path.name: entry.instance for path, entry in app._discovery.services.items()}
+    servers = {path.name: module for path, module in app._discovery.server_modules.items()}
+    assert await app.reload() is False
+
+    _touch(base / "users" / "_service.py", "class Service:\n    name = 'Robin'\n\nservice = Service()\n")
+    assert await app.reload() is True
+
+    after = {path.name: entry.instance for path, entry in app._discovery.services.items()}
+    assert after["users"] is not services["users"]
+    assert after["hello"] is not services["hello"]
+    assert after["other"] is services["other"]
+    assert all(app._discovery.server_modules[path] is servers[path.name] for path in app._discovery.server_modules)
+    assert await _get(app, "/api/hello") == b"hello Robin"
+    assert await _get(app, "/api/users") == b"Robin"
+
+
+async def test_reload_server_module_and_new_route(tmp_path: Path) -> None:
+    base = _build_tree(tmp_path)
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    assert await _get(app, "/api/other") == b"other v1"
+    hello_route = next(route for route in app._routes if route.route_parts == ["hello"])
+
+    _touch(base / "other" / "_server.py", "def get():\n    return 'other v2'\n")
+    (base / "added").mkdir()
+    _touch(base / "added" / "_server.py", "def get():\n    return 'added'\n")
+    api_stat = base.stat()
+    os.utime(base, ns=(api_stat.st_atime_ns, api_stat.st_mtime_ns + 1_000_000))
+    assert await app.reload() is True
+
+    assert await _get(app, "/api/other") == b"other v2"
+    assert await _get(app, "/api/added") == b"added"
+    new_hello = next(route for route in app._routes if route.route_parts == ["hello"])
+    assert new_hello.server_module is hello_route.server_module
+    assert app._resolver.cached_plan(new_hello.handlers["GET"]) is not None
+
+
+async def test_reload_keeps_in_flight_requests_on_old_routes(tmp_path: Path) -> None:
+    base = tmp_path / "consumers" / "api" / "slow"
+    base.mkdir(parents=True)
+    _touch(
+        base / "_server.py",
+        "import asyncio\n"
+        "gate = asyncio.Event()\n\n"
+        "async def get():\n"
+        "    await gate.wait()\n"
+        "    return 'v1'\n",
+    )
+    app = App(consumers_dir=str(tmp_path / "consumers"))
+    app._ensure_routes()
+    old_module = app._routes[0].server_module
+
+    in_flight = asyncio.create_task(_get(app, "/api/slow"))
+    await asyncio.sleep(0)
+    _touch(base / "_server.py", "async def get():\n    return 'v2'\n")
+    assert await app.reload() is True
+
+    assert await _get(app, "/api/slow") == b"v2"
+    old_module.gate.set()
+    assert await in_flight == b"v1"
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from yaaf.responses import Response, as_response
+from pathlib import Path
+
+import pytest
+
+from yaaf.encoders import get_json_encoder, stdlib_json
+from yaaf.responses import FileResponse, FrozenResponse, Response, StreamingResponse, as_response
 
 
 def test_as_response_string() -> None:
@@ -32,3 +37,126 @@ def test_response_with_status() -> None:
     updated = base.with_status(201)
     assert updated.status == 201
     assert updated.body == base.body
+
+
+class DummySend:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def __call__(self, message: dict) -> None:
+        self.messages.append(message)
+
+
+async def test_as_response_streams_generators() -> None:
+    def sync_chunks():
+        yield "a"
+        yield b"b"
+
+    async def async_chunks():
+        yield b"c"
+        yield b"d"
+
+    for value, expected in ((sync_chunks(), [b"a", b"b"]), (async_chunks(), [b"c", b"d"])):
+        response = as_response(value)
+        assert isinstance(response, StreamingResponse)
+        send = DummySend()
+        await response.send(send)
+        assert send.messages[0]["type"] == "http.response.start"
+        assert [message["body"] for message in send.messages[1:-1]] == expected
+        assert all(message["more_body"] for message in send.messages[1:-1])
+        assert send.messages[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_streaming_response_with_status() -> None:
+    response = as_response(((chunk for chunk in [b"x"]), 202))
+    assert isinstance(response, StreamingResponse)
+    assert response.status == 202
+
+
+async def test_file_response_chunks_and_zerocopy(tmp_path: Path) -> None:
+    path = tmp_path / "export.json"
+    path.write_bytes(b"0123456789")
+
+    response = FileResponse(path, chunk_size=4)
+    assert (b"content-type", b"application/json") in response.headers
+    assert (b"content-length", b"10") in response.headers
+    send = DummySend()
+    await response.send(send, {"type": "http"})
+    assert [message["body"] for message in send.messages[1:-1]] == [b"0123", b"4567", b"89"]
+
+    send = DummySend()
+    scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+    await FileResponse(path).send(send, scope)
+    assert send.messages[1]["type"] == "http.response.zerocopysend"
+    assert send.messages[1]["file"].name == str(path)
+
+
+def test_json_encoder_hook() -> None:
+    calls: list[object] = []
+
+    def encoder(content: object) -> bytes:
+        calls.append(content)
+        return b"[custom]"
+
+    response = as_response(({"a": 1}, 201), json_encoder=encoder)
+    assert response.body == b"[custom]"
+    assert response.status == 201
+    assert (b"content-length", b"8") in response.headers
+    assert calls == [{"a": 1}]
+
+
+def test_get_json_encoder() -> None:
+    assert get_json_encoder("json") is stdlib_json
+    assert stdlib_json({"é": [1, None]}) == b'{"\\u00e9": [1, null]}'
+    with pytest.raises(ValueError):
+        get_json_encoder("missing")
+
+
+async def test_frozen_response_reuses_prebuilt_messages() -> None:
+    frozen = Response.json({"status": "ok"}).freeze()
+    assert isinstance(frozen, FrozenResponse)
+    assert frozen.freeze() is frozen
+    assert as_response(frozen) is frozen
+
+    first, second = DummySend(), DummySend()
+    await frozen.send(first)
+    await frozen.send(second)
+    assert first.messages[0] is second.messages[0]
+    assert first.messages[1] is second.messages[1]
+    assert first.messages[0]["headers"] == (
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(frozen.body)).encode()),
+    )
+    assert first.messages[1] == {"type": "http.response.body", "body": frozen.body}
+
+
+def test_frozen_response_is_immutable_and_copies_are_ordinary() -> None:
+    frozen = Response.text("pong").freeze()
+    with pytest.raises(AttributeError):
+        frozen.status = 500
+    with pytest.raises(AttributeError):
+        frozen.headers.append((b"x", b"y"))  # type: ignore[union-attr]
+
+    extended = frozen.with_headers([("x-extra", "1")])
+    assert type(extended) is Response
+    assert extended.headers[-1] == (b"x-extra", b"1")
+    assert type(frozen.with_status(201)) is Response
+    assert len(frozen.headers) == 2
+
+    with pytest.raises(TypeError):
+        StreamingResponse([b"x"]).freeze()
+
+
+def test_frozen_response_tags_once() -> None:
+    calls: list[bytes] = []
+
+    def etag(body: bytes) -> bytes:
+        calls.append(body)
+        return b'"v1"'
+
+    frozen = Response.text("pong").freeze()
+    tagged = frozen.tagged(etag)
+    assert frozen.tagged(etag) is tagged
+    assert tagged.headers[-1] == (b"etag", b'"v1"')
+    assert tagged.tagged(etag) is tagged
+    assert calls == [b"pong"]
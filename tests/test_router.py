@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+
+from yaaf.di import ServiceRegistry
+from yaaf.loader import RouteTarget, build_pattern
+from yaaf.router import Router
+
+
+def _route(path: str, methods: tuple[str, ...] = ("GET",)) -> RouteTarget:
+    parts = [part for part in path.split("/") if part]
+    pattern, params, static_count, segment_count = build_pattern(parts, prefix="api")
+    return RouteTarget(
+        pattern=re.compile(pattern),
+        route_parts=parts,
+        param_names=params,
+        handlers={method: (lambda: None) for method in methods},
+        services=ServiceRegistry(by_type={}, by_alias={}),
+        service=None,
+        static_count=static_count,
+        segment_count=segment_count,
+    )
+
+
+def _sorted(routes: list[RouteTarget]) -> list[RouteTarget]:
+    return sorted(routes, key=lambda route: (route.static_count, route.segment_count), reverse=True)
+
+
+def _linear(routes: list[RouteTarget], method: str, path: str) -> RouteTarget | None:
+    for route in routes:
+        if method in route.handlers and route.pattern.match(path):
+            return route
+    return None
+
+
+def test_router_static_and_params() -> None:
+    routes = _sorted([_route("hello"), _route("[name]"), _route("users/[id]/posts")])
+    router = Router(routes)
+
+    route, params = router.match("GET", "/api/hello")
+    assert route.route_parts == ["hello"]
+    assert params == {}
+
+    route, params = router.match("GET", "/api/austin")
+    assert route.route_parts == ["[name]"]
+    assert params == {"name": "austin"}
+
+    route, params = router.match("GET", "/api/users/7/posts")
+    assert params == {"id": "7"}
+
+    assert router.match("GET", "/api/missing/deeper") is None
+    assert router.match("GET", "/api/hello/") is None
+    assert router.match("GET", "/other/hello") is None
+
+
+def test_router_falls_through_on_method() -> None:
+    routes = _sorted([_route("hello", ("GET",)), _route("[name]", ("GET", "POST"))])
+    router = Router(routes)
+
+    route, params = router.match("POST", "/api/hello")
+    assert route.route_parts == ["[name]"]
+    assert params == {"name": "hello"}
+
+
+def test_router_matches_linear_scan_precedence() -> None:
+    routes = _sorted(
+        [
+            _route("a/[x]/[y]"),
+            _route("[p]/b/c"),
+            _route("[p]/[q]/c"),
+            _route("a/b/[z]"),
+            _route("[p]/[q]/[r]"),
+            _route("a/[x]/c"),
+            _route(""),
+        ]
+    )
+    router = Router(routes)
+    paths = ["/api/a/b/c", "/api/a/x/c", "/api/z/b/c", "/api/a/b/q", "/api/q/q/q", "/api", "/api/a/b"]
+    for path in paths:
+        expected = _linear(routes, "GET", path)
+        found = router.match("GET", path)
+        assert (found[0] if found else None) is expected, path
@@ -5,17 +5,19 @@ from __future__ import annotations
 import importlib
 from typing import Any
 
-__all__ = ["App", "Request", "Response", "app"]
+__all__ = ["App", "FileResponse", "FrozenResponse", "Request", "Response", "StreamingResponse", "app", "inline", "streaming"]
 
 
 def __getattr__(name: str) -> Any:
     if name in {"App", "Request", "app"}:
         app_module = importlib.import_module(f"{__name__}.app")
         return getattr(app_module, name)
-    if name == "Response":
-        from .responses import Response
-
-        return Response
+    if name in {"Response", "StreamingResponse", "FileResponse", "FrozenResponse"}:
+        responses_module = importlib.import_module(f"{__name__}.responses")
+        return getattr(responses_module, name)
+    if name in {"inline", "streaming"}:
+        executors_module = importlib.import_module(f"{__name__}.executors")
+        return getattr(executors_module, name)
     raise AttributeError(f"module {__name__} has no attribute {name}")
 
 
@@ -2,22 +2,93 @@
 
 from __future__ import annotations
 
+import asyncio
+import hmac
 import inspect
-from dataclasses import dataclass
-from typing import Any
+import os
+from typing import Any, AsyncIterator, Iterable
 
-from .di import DependencyResolver
-from .loader import discover_routes
-from .responses import Response, as_response
-from .types import ASGIScope, ASGIReceive, ASGISend, Params
+from .cache import ResponseCache
+from .conditional import compute_etag, etag_matches, not_modified, response_etag, token_etag
+from .datastructures import Headers, QueryParams, parse_cookies
+from .di import DependencyResolver, RequestScope
+from .encoders import JSONEncoder, get_json_encoder
+from .executors import INLINE, PROCESS, THREAD, OffloadPool, process_call
+from .limits import ConcurrencyLimiter
+from .loader import Discovery, RouteTarget, discover, refresh_discovery, start_services, stop_services
+from .metrics import (
+    BODY,
+    HANDLER,
+    INJECT,
+    MIDDLEWARE,
+    ROUTE,
+    SEND,
+    SERIALIZE,
+    Metrics,
+    RequestTimer,
+    method_label,
+    route_label,
+)
+from .middleware import compose
+from .profiler import ENV_VAR as PROFILE_ENV_VAR, TOKEN_ENV_VAR as PROFILE_TOKEN_ENV_VAR, SamplingProfiler
+from .ratelimit import RateLimitBackend, RateLimiter
+from .responses import FrozenResponse, Response, StreamingResponse, as_response
+from .router import Router
+from .types import ASGIScope, ASGIReceive, ASGISend, CallNext, Middleware, Params
+
+_NOT_FOUND = Response.text("Not Found", status=404).freeze()
+_PAYLOAD_TOO_LARGE = Response.text("Payload Too Large", status=413).freeze()
+_UNSUPPORTED_SCOPE = Response.text("Unsupported scope type", status=500).freeze()
+_GATEWAY_TIMEOUT = Response.text("Gateway Timeout", status=504).freeze()
+
+
+class RequestBodyTooLarge(Exception):
+    """Raised when a request body exceeds the app's maximum body size."""
 
 
-@dataclass
 class Request:
-    """Represents an HTTP request within the ASGI app."""
-    scope: ASGIScope
-    body: bytes
-    path_params: Params
+    """Represents an HTTP request within the ASGI app.
+
+    The body is read before a handler taking ``request`` runs, unless the
+    handler is marked ``@streaming`` and reads ``request.stream()`` itself.
+    Handlers that do not take ``request`` leave it unread. Once it has been
+    read, ``request.content`` and ``request.text()`` return it without awaiting.
+    Headers, query parameters and cookies are parsed on first access and cached.
+    """
+
+    __slots__ = (
+        "scope",
+        "path_params",
+        "services",
+        "_receive",
+        "_max_body_size",
+        "_body",
+        "_streamed",
+        "_headers",
+        "_query",
+        "_cookies",
+        "_timer",
+    )
+
+    def __init__(
+        self,
+        scope: ASGIScope,
+        receive: ASGIReceive,
+        path_params: Params,
+        max_body_size: int | None = None,
+    ) -> None:
+        """Create a request bound to an ASGI receive callable."""
+        self.scope = scope
+        self.path_params = path_params
+        self._receive = receive
+        self._max_body_size = max_body_size
+        self._body: bytes | None = None
+        self._streamed = False
+        self.services: RequestScope | None = None
+        self._headers: Headers | None = None
+        self._query: QueryParams | None = None
+        self._cookies: dict[str, str] | None = None
+        self._timer: RequestTimer | None = None
 
     @property
     def method(self) -> str:
@@ -30,80 +101,656 @@ class Request:
         return self.scope.get("path", "")
 
     @property
-    def headers(self) -> dict[str, str]:
-        """Return decoded request headers."""
-        raw = self.scope.get("headers", [])
-        return {k.decode(): v.decode() for k, v in raw}
+    def headers(self) -> Headers:
+        """Return case-insensitive request headers, keeping repeated values."""
+        if self._headers is None:
+            self._headers = Headers(self.scope.get("headers", []))
+        return self._headers
+
+    @property
+    def query(self) -> QueryParams:
+        """Return parsed query-string parameters."""
+        if self._query is None:
+            self._query = QueryParams.from_bytes(self.scope.get("query_string", b""))
+        return self._query
+
+    @property
+    def cookies(self) -> dict[str, str]:
+        """Return cookies sent in ``cookie`` headers."""
+        if self._cookies is None:
+            self._cookies = parse_cookies(self.headers.getlist("cookie"))
+        return self._cookies
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Yield body chunks as they arrive from the client."""
+        if self._body is not None:
+            if self._body:
+                yield self._body
+            return
+        if self._streamed:
+            raise RuntimeError("Request body has already been streamed")
+        self._streamed = True
+
+        received = 0
+        limit = self._max_body_size
+        timer = self._timer
+        while True:
+            if timer is None:
+                message = await self._receive()
+            else:
+                waiting = timer.clock()
+                message = await self._receive()
+                timer.add(BODY, timer.clock() - waiting)
+            if message.get("type") != "http.request":
+                break
+            chunk = message.get("body", b"")
+            if chunk:
+                received += len(chunk)
+                if limit is not None and received > limit:
+                    raise RequestBodyTooLarge(f"Request body exceeds {limit} bytes")
+                yield chunk
+            if not message.get("more_body", False):
+                break
+
+    async def body(self) -> bytes:
+        """Read and cache the full request body."""
+        if self._body is None:
+            self._body = b"".join([chunk async for chunk in self.stream()])
+        return self._body
+
+    @property
+    def content(self) -> bytes:
+        """Return the body read before the handler ran or by ``await request.body()``."""
+        if self._body is None:
+            raise RuntimeError("Request body has not been read yet; use 'await request.body()' first")
+        return self._body
 
     def text(self) -> str:
-        """Return the request body as text."""
-        return self.body.decode()
+        """Return the body read before the handler ran or by ``await request.body()``, decoded as text."""
+        return self.content.decode()
 
 
 class App:
     """Filesystem-routed ASGI interface."""
 
-    def __init__(self, consumers_dir: str = "consumers") -> None:
-        """Initialize the app by discovering filesystem routes."""
+    def __init__(
+        self,
+        consumers_dir: str = "consumers",
+        max_body_size: int | None = None,
+        json_encoder: JSONEncoder | str | None = None,
+        warmup: Iterable[str] = (),
+        response_cache: ResponseCache | None = None,
+        manifest_path: str | None = None,
+        watch: bool = False,
+        watch_interval: float = 1.0,
+        discovery_workers: int | None = None,
+        middleware: Iterable[Middleware] = (),
+        etag: bool = False,
+        thread_pool_size: int | None = None,
+        process_pool_size: int | None = None,
+        metrics: bool | Metrics = False,
+        metrics_path: str | None = "/metrics",
+        profile: bool | float | str | SamplingProfiler | None = None,
+        profile_path: str | None = "/_yaaf/profile",
+        profile_token: str | None = None,
+        concurrency: int | dict[str, Any] | ConcurrencyLimiter | None = None,
+        timeout: float | None = None,
+        rate_limit: str | dict[str, Any] | RateLimiter | None = None,
+        rate_limit_backend: RateLimitBackend | None = None,
+    ) -> None:
+        """Initialize the app by discovering filesystem routes.
+
+        ``max_body_size`` caps request bodies in bytes; larger requests get a 413.
+        ``json_encoder`` is a callable returning bytes or the name of an encoder
+        backend (see ``yaaf.encoders``); by default the fastest installed one is used.
+        ``warmup`` lists paths to GET during lifespan startup, in addition to the
+        paths declared by ``warmup`` attributes in ``_server.py`` modules.
+        ``response_cache`` stores responses for GET routes that declare a ``cache``
+        policy in ``_server.py``; a default-sized cache is created when omitted.
+        ``manifest_path`` caches the consumers tree scan on disk between boots.
+        ``watch`` polls the consumers tree every ``watch_interval`` seconds after
+        lifespan startup and reloads changed route directories in-process.
+        ``discovery_workers`` bounds the threads that import modules and build
+        services at boot; 1 loads everything serially.
+        ``middleware`` wraps every route, outside any ``_middleware.py`` middleware.
+        ``etag`` adds ETags to GET responses and answers matching ``if-none-match``
+        requests with 304; ``_server.py`` can override it per route with an
+        ``etag`` attribute that is a bool or a version-token function.
+        Sync handlers run in a thread pool of ``thread_pool_size`` threads, or in
+        a process pool of ``process_pool_size`` processes for routes whose
+        ``_server.py`` sets ``executor = "process"`` (see ``yaaf.executors``).
+        ``metrics`` records per-route latency, phase timings and status counts
+        (see ``yaaf.metrics``), served in Prometheus format at ``metrics_path``.
+        ``profile`` turns on the sampling profiler (see ``yaaf.profiler``): True,
+        or a rate in Hz; when omitted, the ``YAAF_PROFILE`` environment variable
+        decides. Per-route collapsed stacks are served at ``profile_path`` only
+        when ``profile_token`` (or ``YAAF_PROFILE_TOKEN``) is set, to requests
+        sending ``authorization: Bearer <token>``.
+        ``concurrency`` caps requests handled at once across every route, with a
+        bounded queue and 503 shedding beyond it (see ``yaaf.limits``); routes can
+        add their own limit with a ``concurrency`` attribute in ``_server.py``.
+        ``timeout`` cancels handlers still running after that many seconds and
+        answers 504; ``_server.py`` can override it with a ``timeout`` attribute.
+        ``rate_limit`` answers 429 to clients over a rate across every route (see
+        ``yaaf.ratelimit``); routes add their own with a ``rate_limit`` attribute.
+        ``rate_limit_backend`` stores rate-limit state for limiters that do not
+        name their own backend, for example a store shared by every worker.
+        """
         self._consumers_dir = consumers_dir
+        self._manifest_path = manifest_path
+        self._max_body_size = max_body_size
+        self._warmup = list(warmup)
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        if json_encoder is None or isinstance(json_encoder, str):
+            json_encoder = get_json_encoder(json_encoder)
+        self._json_encoder = json_encoder
+        self._watch = watch
+        self._watch_interval = watch_interval
+        self._discovery_workers = discovery_workers
+        self._middleware = list(middleware)
+        self._etag = etag
+        self.thread_pool = OffloadPool(THREAD, thread_pool_size)
+        self.process_pool = OffloadPool(PROCESS, process_pool_size)
+        self.metrics = Metrics.from_value(metrics)
+        self._metrics_path = metrics_path
+        self.profiler = SamplingProfiler.from_value(os.environ.get(PROFILE_ENV_VAR) if profile is None else profile)
+        self._profile_path = profile_path
+        self._profile_token = profile_token or os.environ.get(PROFILE_TOKEN_ENV_VAR) or None
+        self.limiter = ConcurrencyLimiter.from_value(concurrency)
+        self._timeout = timeout
+        self.timeouts: dict[str, int] = {}
+        self.rate_limit_backend = rate_limit_backend
+        self.rate_limiter = self._bind_backend(RateLimiter.from_value(rate_limit, scope="<app>"))
+        self._watch_task: asyncio.Task[None] | None = None
+        self._discovery: Discovery | None = None
+        self._started = False
+        self._start_lock = asyncio.Lock()
         self._routes = None
+        self._router = None
         self._registry = None
         self._resolver = None
 
     def _ensure_routes(self) -> None:
         if self._routes is None or self._registry is None or self._resolver is None:
-            self._routes, self._registry = discover_routes(self._consumers_dir)
-            self._resolver = DependencyResolver(self._registry)
+            discovery = discover(self._consumers_dir, self._manifest_path, self._discovery_workers)
+            self._install(discovery, _compile_plans(discovery))
+
+    async def _ensure_started(self) -> None:
+        """Discover routes if needed and start services, once."""
+        self._ensure_routes()
+        async with self._start_lock:
+            if self._started:
+                return
+            if await start_services(self._discovery):
+                self._install(self._discovery, _compile_plans(self._discovery))
+            self._started = True
+            if self.profiler is not None:
+                self.profiler.start()
+                self.profiler.install_signal_handler()
+
+    def _install(self, discovery: Discovery, resolver: DependencyResolver) -> None:
+        """Swap in a new routing table; requests already dispatched keep their route."""
+        for route in discovery.routes:
+            self._bind_backend(route.rate_limiter)
+            route.pipeline = self._compose(route)
+        self._discovery = discovery
+        self._routes = discovery.routes
+        self._registry = discovery.registry
+        self._router = Router(discovery.routes)
+        self._resolver = resolver
+        if self.profiler is not None:
+            self.profiler.set_routes(
+                (route_label(route.route_parts), func)
+                for route in discovery.routes
+                for func in _route_callables(route)
+            )
+        if self.metrics is not None:
+            self.metrics.record_discovery(discovery.consumers_dir, discovery.import_times, discovery.build_times)
+
+    def add_middleware(self, middleware: Middleware) -> Middleware:
+        """Add app-wide middleware inside any added earlier; usable as a decorator."""
+        self._middleware.append(middleware)
+        for route in self._routes or []:
+            route.pipeline = self._compose(route)
+        return middleware
+
+    def _compose(self, route: RouteTarget) -> CallNext:
+        """Pre-compose the middleware chain for a route, ending at its endpoint.
+
+        Rate limiters go outermost, then concurrency limiters, so rejected
+        requests skip all middleware and never hold a concurrency slot.
+        """
+        limiters = [
+            limiter
+            for limiter in (self.rate_limiter, route.rate_limiter, self.limiter, route.limiter)
+            if limiter is not None
+        ]
+        return compose(
+            [*limiters, *self._middleware, *route.middleware],
+            lambda request: self._endpoint(route, request),
+        )
+
+    def _bind_backend(self, limiter: RateLimiter | None) -> RateLimiter | None:
+        if limiter is not None and limiter.backend is None:
+            limiter.backend = self.rate_limit_backend
+        return limiter
+
+    def limit_stats(self) -> dict[str, dict[str, int]]:
+        """Return limiter counters and handler timeouts by route; app-wide limiters are under ``<app>``."""
+        stats: dict[str, dict[str, int]] = {}
+        for label, limiters in [
+            ("<app>", (self.limiter, self.rate_limiter)),
+            *((route_label(route.route_parts), (route.limiter, route.rate_limiter)) for route in self._routes or []),
+        ]:
+            for limiter in limiters:
+                if limiter is not None:
+                    stats.setdefault(label, {}).update(limiter.stats())
+        for label, count in self.timeouts.items():
+            stats.setdefault(label, {})["timed_out"] = count
+        return stats
+
+    async def reload(self) -> bool:
+        """Reload changed route directories in-process; return whether anything changed.
+
+        Modules are imported in a worker thread so in-flight requests keep being
+        served, then the new routing table is swapped in at once. Handler plans
+        are reused unless their module changed or they inject a rebuilt service.
+        """
+        if self._discovery is None or self._resolver is None:
+            self._ensure_routes()
+            return False
+        discovery = await asyncio.to_thread(refresh_discovery, self._discovery)
+        if discovery is None:
+            return False
+        await start_services(discovery)
+
+        previous = self._discovery
+        old = self._resolver
+        stale = {id(instance) for instance in discovery.stale}
+        services_changed = set(discovery.services) != set(self._discovery.services)
+        resolver = DependencyResolver(discovery.registry)
+        for route in discovery.routes:
+            for handler in _route_callables(route):
+                plan = old.cached_plan(handler)
+                if (
+                    plan is None
+                    or services_changed
+                    or any(id(service) in stale for _name, service, _default in plan.params)
+                ):
+                    resolver.compile(handler)
+                else:
+                    resolver.adopt(plan)
+        self._install(discovery, resolver)
+        self._started = True
+        self.response_cache.clear()
+        retired = [path for path, entry in previous.services.items() if discovery.services.get(path) is not entry]
+        await stop_services(previous, retired)
+        return True
+
+    async def _watch_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._watch_interval)
+            try:
+                if await self.reload():
+                    print(f"Reloaded routes from {self._consumers_dir}")
+            except Exception as exc:
+                print(f"Warning: reload failed, keeping previous routes: {exc!r}")
+
+    async def startup(self) -> None:
+        """Discover routes, start services, compile handler plans, then run warm-up requests."""
+        await self._ensure_started()
+        for path in self._warmup_paths():
+            send = _WarmupSend()
+            await self._handle_http(_warmup_scope(path), _empty_receive, send)
+            if send.status is None or send.status >= 400:
+                print(f"Warning: warm-up request GET {path} returned {send.status}")
+        if self._watch and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_loop())
+
+    async def shutdown(self) -> None:
+        """Release app resources at lifespan shutdown."""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+        if self._started and self._discovery is not None:
+            self._started = False
+            await stop_services(self._discovery)
+        await asyncio.to_thread(self.thread_pool.shutdown)
+        await asyncio.to_thread(self.process_pool.shutdown)
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def _warmup_paths(self) -> list[str]:
+        paths = list(self._warmup)
+        for route in self._routes or []:
+            declared = getattr(route.server_module, "warmup", None)
+            if declared is True and not route.param_names and "GET" in route.handlers:
+                paths.append("/".join(["/api", *route.route_parts]))
+            elif isinstance(declared, (list, tuple)):
+                paths.extend(declared)
+        return paths
+
+    async def _lifespan(self, receive: ASGIReceive, send: ASGISend) -> None:
+        while True:
+            message = await receive()
+            message_type = message.get("type")
+            if message_type == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as exc:
+                    await send({"type": "lifespan.startup.failed", "message": repr(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message_type == "lifespan.shutdown":
+                try:
+                    await self.shutdown()
+                except Exception as exc:
+                    await send({"type": "lifespan.shutdown.failed", "message": repr(exc)})
+                    return
+                await send({"type": "lifespan.shutdown.complete"})
+                return
 
     async def __call__(self, scope: ASGIScope, receive: ASGIReceive, send: ASGISend) -> None:
         """ASGI entrypoint."""
-        self._ensure_routes()
-        if scope.get("type") != "http":
-            response = Response.text("Unsupported scope type", status=500)
-            await response.send(send)
+        scope_type = scope.get("type")
+        if scope_type == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if not self._started:
+            await self._ensure_started()
+        if scope_type != "http":
+            await _UNSUPPORTED_SCOPE.send(send)
+            return
+        if self.profiler is not None and self._profile_token and scope.get("path") == self._profile_path:
+            await self._profile_endpoint(self.profiler, self._profile_token, scope, send)
             return
+        if self.metrics is None:
+            await self._handle_http(scope, receive, send)
+        else:
+            await self._handle_http_metered(self.metrics, scope, receive, send)
 
+    async def _handle_http(self, scope: ASGIScope, receive: ASGIReceive, send: ASGISend) -> None:
+        """Route and dispatch a single HTTP request."""
         method = scope.get("method", "").upper()
         path = scope.get("path", "")
-        match = None
-        for route in self._routes or []:
-            if method not in route.handlers:
-                continue
-            result = route.pattern.match(path)
-            if result is None:
-                continue
-            match = (route, result.groups())
-            break
+        match = self._router.match(method, path) if self._router is not None else None
+        if match is None:
+            await _NOT_FOUND.send(send)
+            return
+        route, path_params = match
+
+        if self._max_body_size is not None and _content_length(scope) > self._max_body_size:
+            await _PAYLOAD_TOO_LARGE.send(send)
+            return
+
+        request = Request(scope=scope, receive=receive, path_params=path_params, max_body_size=self._max_body_size)
+        try:
+            response = await route.pipeline(request)
+            await response.send(send, scope)
+        finally:
+            if request.services is not None:
+                await request.services.aclose()
+
+    async def _profile_endpoint(
+        self,
+        profiler: SamplingProfiler,
+        token: str,
+        scope: ASGIScope,
+        send: ASGISend,
+    ) -> None:
+        """Serve collapsed stacks to requests bearing ``token``; ``?route=`` filters.
+
+        GET reads the samples; POST reads them and then clears them. Requests
+        without the token get the same 404 as an unknown path.
+        """
+        authorization = Headers(scope.get("headers", [])).get("authorization", "")
+        scheme, _, supplied = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.strip().encode(), token.encode()):
+            await _NOT_FOUND.send(send)
+            return
+        method = scope.get("method", "").upper()
+        if method not in ("GET", "POST"):
+            await Response.text("Method Not Allowed", status=405, headers=[("allow", "GET, POST")]).send(send)
+            return
+        query = QueryParams.from_bytes(scope.get("query_string", b""))
+        body = profiler.collapsed(query.get("route"))
+        if method == "POST":
+            profiler.reset()
+        await Response.text(body).send(send)
 
+    async def _handle_http_metered(
+        self,
+        metrics: Metrics,
+        scope: ASGIScope,
+        receive: ASGIReceive,
+        send: ASGISend,
+    ) -> None:
+        """``_handle_http`` with latency, phase, status and in-flight accounting."""
+        path = scope.get("path", "")
+        if path == self._metrics_path:
+            await metrics.response(self.limit_stats()).send(send)
+            return
+        clock = metrics.clock
+        started = clock()
+        method = scope.get("method", "").upper()
+        match = self._router.match(method, path) if self._router is not None else None
         if match is None:
-            response = Response.text("Not Found", status=404)
-            await response.send(send)
+            await _NOT_FOUND.send(send)
+            metrics.route("<unmatched>", method_label(method)).observe(404, clock() - started)
             return
-        route, groups = match
+        route, path_params = match
+        stats = metrics.for_route(route, method)
+        timer = RequestTimer(clock, started)
+        timer.mark(ROUTE)
 
-        body = b""
-        more_body = True
-        while more_body:
-            message = await receive()
-            if message.get("type") != "http.request":
-                break
-            body += message.get("body", b"")
-            more_body = message.get("more_body", False)
+        if self._max_body_size is not None and _content_length(scope) > self._max_body_size:
+            await _PAYLOAD_TOO_LARGE.send(send)
+            stats.observe(413, clock() - started, timer.times)
+            return
+
+        request = Request(scope=scope, receive=receive, path_params=path_params, max_body_size=self._max_body_size)
+        request._timer = timer
+        status = 500
+        stats.in_flight += 1
+        try:
+            response = await route.pipeline(request)
+            timer.mark(MIDDLEWARE)
+            status = response.status
+            await response.send(send, scope)
+            timer.mark(SEND)
+        finally:
+            stats.in_flight -= 1
+            stats.observe(status, clock() - started, timer.times)
+            if request.services is not None:
+                await request.services.aclose()
+
+    async def _endpoint(self, route: RouteTarget, request: Request) -> Response:
+        """Serve a request from the response cache or by dispatching to the handler.
+
+        For GET and HEAD with ETags enabled, a version token is checked before
+        the handler runs, and a matching ``if-none-match`` gets a 304.
+        """
+        method = request.method
+        etag = self._etag if route.etag is None else route.etag
+        if not etag or method not in ("GET", "HEAD"):
+            return await self._cached_dispatch(route, method, request)
 
-        path_params = dict(zip(route.param_names, groups))
-        request = Request(scope=scope, body=body, path_params=path_params)
-        handler = route.handlers[method]
+        if_none_match = request.headers.get("if-none-match")
+        if callable(etag):
+            token = await self._invoke(etag, request)
+            if token is not None:
+                tag = token_etag(token)
+                if if_none_match is not None and etag_matches(if_none_match, tag):
+                    return not_modified(tag)
+                response = await self._cached_dispatch(route, method, request)
+                return response.with_headers([("etag", tag.decode())]) if response.status == 200 else response
+
+        response = await self._cached_dispatch(route, method, request, tagged=True)
+        tag = response_etag(response)
+        if tag is not None and if_none_match is not None and etag_matches(if_none_match, tag):
+            return not_modified(tag, response)
+        return response
+
+    async def _cached_dispatch(
+        self,
+        route: RouteTarget,
+        method: str,
+        request: Request,
+        tagged: bool = False,
+    ) -> Response:
+        """Dispatch through the response cache when the route has a cache policy."""
+        if route.cache is not None and method == "GET":
+            return await self.response_cache.get_or_compute(
+                route.cache.key(request.scope),
+                route.cache.ttl,
+                lambda: self._dispatch(route, method, request, tagged),
+            )
+        return await self._dispatch(route, method, request, tagged)
+
+    async def _dispatch(self, route: RouteTarget, method: str, request: Request, tagged: bool = False) -> Response:
+        """Call the route handler for ``method`` and normalize its result.
+
+        ``tagged`` adds a body-hash ETag to buffered 200 responses that lack one.
+        The body is read first for handlers taking ``request`` unless they are
+        marked ``@streaming``, so ``request.text()`` works without awaiting.
+        A handler that outlives the route's timeout is cancelled and answered
+        with 504; sync handlers already running in a pool cannot be interrupted.
+        """
+        timer = request._timer
+        if timer is not None:
+            timer.mark(MIDDLEWARE)
+        timeout = self._timeout if route.timeout is None else route.timeout
+        deadline = None if timeout is None else asyncio.timeout(timeout)
+        try:
+            if method in route.body_methods and request._body is None and not request._streamed:
+                await request.body()
+            call = self._invoke(route.handlers[method], request, route.executors.get(method, INLINE), timer)
+            if deadline is None:
+                result = await call
+            else:
+                async with deadline:
+                    result = await call
+        except RequestBodyTooLarge:
+            result = _PAYLOAD_TOO_LARGE
+        except TimeoutError:
+            if deadline is None or not deadline.expired():
+                raise
+            label = route_label(route.route_parts)
+            self.timeouts[label] = self.timeouts.get(label, 0) + 1
+            result = _GATEWAY_TIMEOUT
+        response = as_response(result, self._json_encoder)
+        if timer is not None:
+            timer.mark(SERIALIZE)
+        if tagged and response.status == 200 and not isinstance(response, StreamingResponse):
+            if isinstance(response, FrozenResponse):
+                response = response.tagged(compute_etag)
+            elif response_etag(response) is None:
+                response = response.with_headers([("etag", compute_etag(response.body).decode())])
+        return response
+
+    async def _invoke(
+        self,
+        func: Any,
+        request: Request,
+        executor: str = INLINE,
+        timer: RequestTimer | None = None,
+    ) -> Any:
+        """Call a handler-like function with injected arguments and await its result.
+
+        ``executor`` runs the call on the event loop, in the thread pool or in
+        the process pool. ``timer`` splits the call into injection and handler time.
+        """
         context = {
             "request": request,
-            "params": path_params,
-            "path_params": path_params,
+            "params": request.path_params,
+            "path_params": request.path_params,
         }
-        result = self._resolver.call(handler, context)
+        plan = self._resolver.plan_for(func)
+        if plan.scoped:
+            if request.services is None:
+                request.services = RequestScope()
+            kwargs = await plan.abind(context, request.services)
+        elif executor == INLINE and timer is None:
+            result = plan(context)
+            return await result if inspect.isawaitable(result) else result
+        else:
+            kwargs = plan.bind(context)
+        if timer is not None:
+            timer.mark(INJECT)
+
+        if executor == THREAD:
+            result = await self.thread_pool.run(func, **kwargs)
+        elif executor == PROCESS:
+            result = await self.process_pool.run(process_call(func), **kwargs)
+        else:
+            result = func(**kwargs)
         if inspect.isawaitable(result):
             result = await result
+        if timer is not None:
+            timer.mark(HANDLER)
+        return result
+
+
+def _compile_plans(discovery: Discovery) -> DependencyResolver:
+    resolver = DependencyResolver(discovery.registry)
+    for route in discovery.routes:
+        for handler in _route_callables(route):
+            resolver.compile(handler)
+    return resolver
+
+
+def _route_callables(route: RouteTarget) -> list[Any]:
+    """Return the handlers and version-token function the app calls for a route."""
+    callables = list(route.handlers.values())
+    if callable(route.etag):
+        callables.append(route.etag)
+    return callables
+
+
+class _WarmupSend:
+    """Capture the status of an in-process warm-up request."""
+
+    def __init__(self) -> None:
+        self.status: int | None = None
+
+    async def __call__(self, message: dict[str, Any]) -> None:
+        if message.get("type") == "http.response.start":
+            self.status = message.get("status")
+
+
+async def _empty_receive() -> dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _warmup_scope(path: str) -> ASGIScope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": None,
+        "server": None,
+    }
+
 
-        response = as_response(result)
-        await response.send(send)
+def _content_length(scope: ASGIScope) -> int:
+    """Return the declared content-length of a request, or 0 if absent/invalid."""
+    for key, value in scope.get("headers", []):
+        if key.lower() == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
 
 
 app = App()
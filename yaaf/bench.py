@@ -0,0 +1,292 @@
+"""In-process benchmark suite run by ``yaaf bench``.
+
+The suite writes a synthetic consumers tree into a temporary directory. The
+tree has static routes, dynamic routes, and a chain of services that each
+inject the previous one. The suite measures:
+
+- cold discovery time and traced memory per route
+- in-process ASGI throughput and latency percentiles for a few request mixes
+
+Requests are driven straight through ``App.__call__``, with no sockets, so
+the numbers isolate the framework's own overhead. Results are plain JSON so
+runs can be saved and compared.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from .app import App
+from .loader import discover
+from .metrics import Histogram
+
+SCHEMA = 1
+
+# The name yaaf is installed under; see pyproject.toml.
+DISTRIBUTION = "yaafcli"
+
+
+@dataclass(frozen=True)
+class BenchConfig:
+    """Shape of the generated tree and of the load."""
+    static_routes: int = 100
+    dynamic_routes: int = 100
+    service_depth: int = 5
+    requests: int = 20_000
+    concurrency: int = 16
+
+
+def generate_tree(root: str | Path, config: BenchConfig) -> Path:
+    """Write a synthetic consumers tree under ``root`` and return its path.
+
+    ``api/static/r<i>`` return a small dict. ``api/items<i>/[item_id]`` inject
+    the last service of an ``api/chain<k>`` dependency chain, whose routes
+    have sync handlers that run in the thread pool. ``api/echo`` parses a
+    JSON body.
+    """
+    consumers = Path(root) / "consumers"
+    api = consumers / "api"
+    for index in range(config.static_routes):
+        _write(api / "static" / f"r{index}" / "_server.py", f"async def get():\n    return {{'route': {index}}}\n")
+
+    depth = max(config.service_depth, 1)
+    for level in range(depth):
+        dependency = f"previous: 'chain{level - 1}'" if level else ""
+        depth_expr = "previous.depth + 1" if level else "1"
+        _write(
+            api / f"chain{level}" / "_service.py",
+            f"class Chain{level}:\n"
+            f"    def __init__(self{', ' + dependency if dependency else ''}) -> None:\n"
+            f"        self.depth = {depth_expr}\n\n"
+            f"service = Chain{level}\n",
+        )
+        _write(
+            api / f"chain{level}" / "_server.py",
+            f"def get(service: 'chain{level}'):\n    return {{'depth': service.depth}}\n",
+        )
+
+    for index in range(config.dynamic_routes):
+        _write(
+            api / f"items{index}" / "[item_id]" / "_server.py",
+            f"async def get(params, service: 'chain{depth - 1}'):\n"
+            "    return {'id': params['item_id'], 'depth': service.depth}\n",
+        )
+
+    _write(
+        api / "echo" / "_server.py",
+        "import json\n\n"
+        "async def post(request):\n"
+        "    return json.loads(await request.body())\n",
+    )
+    return consumers
+
+
+def measure_discovery(consumers_dir: str | Path) -> dict[str, Any]:
+    """Time a fresh discovery of ``consumers_dir``, then trace the memory a second one allocates.
+
+    Memory is measured separately because tracing slows the imports down.
+    """
+    gc.collect()
+    started = time.perf_counter()
+    discover(str(consumers_dir))
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    discovery = discover(str(consumers_dir))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    routes = max(len(discovery.routes), 1)
+    return {
+        "routes": len(discovery.routes),
+        "services": len(discovery.services),
+        "seconds": elapsed,
+        "memory_bytes": current,
+        "peak_memory_bytes": peak,
+        "memory_per_route_bytes": current / routes,
+    }
+
+
+def scenarios(config: BenchConfig) -> dict[str, list[tuple[dict[str, Any], bytes]]]:
+    """Return the request mixes to run, as ``(scope, body)`` pairs cycled through in order."""
+    static = [_scope("GET", f"/api/static/r{index}") for index in range(max(config.static_routes, 1))]
+    dynamic = [_scope("GET", f"/api/items{index}/{index * 7}") for index in range(max(config.dynamic_routes, 1))]
+    body = json.dumps({"name": "bench", "values": list(range(20))}).encode()
+    echo = _scope("POST", "/api/echo", [(b"content-type", b"application/json")])
+    sync = [_scope("GET", f"/api/chain{level}") for level in range(max(config.service_depth, 1))]
+    return {
+        "static": [(scope, b"") for scope in static],
+        "dynamic_di": [(scope, b"") for scope in dynamic],
+        "sync_thread": [(scope, b"") for scope in sync],
+        "not_found": [(_scope("GET", "/api/missing/route"), b"")],
+        "post_json": [(echo, body)],
+    }
+
+
+async def run_load(
+    app: Any,
+    requests: list[tuple[dict[str, Any], bytes]],
+    total: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """Send ``total`` requests from ``concurrency`` tasks and report throughput and latency."""
+    latency = Histogram()
+    statuses: dict[int, int] = {}
+    per_task = max(total // max(concurrency, 1), 1)
+
+    async def client(offset: int) -> None:
+        for number in range(per_task):
+            scope, body = requests[(offset + number) % len(requests)]
+            send = _StatusSend()
+            started = time.perf_counter()
+            await app(scope, _BodyReceive(body), send)
+            latency.record(time.perf_counter() - started)
+            statuses[send.status] = statuses.get(send.status, 0) + 1
+
+    for scope, body in requests[: min(len(requests), 50)]:
+        await app(scope, _BodyReceive(body), _StatusSend())
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index * per_task) for index in range(max(concurrency, 1))))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": latency.count,
+        "seconds": elapsed,
+        "requests_per_second": latency.count / elapsed if elapsed else 0.0,
+        "p50_us": latency.quantile(0.5) * 1e6,
+        "p90_us": latency.quantile(0.9) * 1e6,
+        "p99_us": latency.quantile(0.99) * 1e6,
+        "max_us": latency.max * 1e6,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def run_suite(config: BenchConfig = BenchConfig(), workdir: str | Path | None = None) -> dict[str, Any]:
+    """Generate a tree, measure discovery, then run every scenario; return the results."""
+    with tempfile.TemporaryDirectory(dir=workdir) as root:
+        consumers = generate_tree(root, config)
+        discovery = measure_discovery(consumers)
+
+        async def load() -> dict[str, Any]:
+            app = App(consumers_dir=str(consumers))
+            await app.startup()
+            try:
+                return {
+                    name: await run_load(app, requests, config.requests, config.concurrency)
+                    for name, requests in scenarios(config).items()
+                }
+            finally:
+                await app.shutdown()
+
+        results = asyncio.run(load())
+    return {
+        "schema": SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": _environment(),
+        "config": asdict(config),
+        "discovery": discovery,
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> str:
+    """Return a table of throughput and p99 changes from ``baseline`` to ``current``."""
+    lines = [
+        f"{'scenario':<12} {'req/s before':>13} {'req/s after':>12} {'change':>8} "
+        f"{'p99 before':>11} {'p99 after':>10}"
+    ]
+    for name, after in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        change = (after["requests_per_second"] / before["requests_per_second"] - 1) * 100
+        lines.append(
+            f"{name:<12} {before['requests_per_second']:>13.0f} {after['requests_per_second']:>12.0f} "
+            f"{change:>+7.1f}% {before['p99_us']:>9.1f}us {after['p99_us']:>8.1f}us"
+        )
+    discovery_before = baseline.get("discovery", {}).get("seconds")
+    if discovery_before:
+        discovery_after = current["discovery"]["seconds"]
+        lines.append(f"{'discovery':<12} {discovery_before * 1000:>11.1f}ms {discovery_after * 1000:>10.1f}ms")
+    return "\n".join(lines)
+
+
+def summary(results: dict[str, Any]) -> str:
+    """Return a human-readable table of one run."""
+    discovery = results["discovery"]
+    lines = [
+        f"discovery: {discovery['routes']} routes, {discovery['services']} services in "
+        f"{discovery['seconds'] * 1000:.1f}ms, {discovery['memory_per_route_bytes'] / 1024:.1f} KiB/route",
+        f"{'scenario':<12} {'req/s':>9} {'p50 us':>8} {'p90 us':>8} {'p99 us':>8} {'max us':>9}",
+    ]
+    for name, result in results["scenarios"].items():
+        lines.append(
+            f"{name:<12} {result['requests_per_second']:>9.0f} {result['p50_us']:>8.1f} {result['p90_us']:>8.1f} "
+            f"{result['p99_us']:>8.1f} {result['max_us']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+class _StatusSend:
+    __slots__ = ("status",)
+
+    def __init__(self) -> None:
+        self.status = 0
+
+    async def __call__(self, message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+
+
+class _BodyReceive:
+    __slots__ = ("_message",)
+
+    def __init__(self, body: bytes) -> None:
+        self._message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def __call__(self) -> dict[str, Any]:
+        return self._message
+
+
+def _scope(method: str, path: str, headers: list[tuple[bytes, bytes]] | None = None) -> dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers or [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _environment() -> dict[str, Any]:
+    try:
+        yaaf_version: str | None = version(DISTRIBUTION)
+    except PackageNotFoundError:
+        yaaf_version = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "yaaf": yaaf_version,
+    }
@@ -0,0 +1,173 @@
+"""Response caching for idempotent GET handlers."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+from .responses import Response, StreamingResponse
+from .types import ASGIScope
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Per-route caching rules declared by a ``cache`` attribute in ``_server.py``.
+
+    ``vary`` names request headers whose values become part of the cache key.
+    """
+    ttl: float
+    vary: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "vary", tuple(header.lower() for header in self.vary))
+
+    @classmethod
+    def from_value(cls, value: Any) -> "CachePolicy | None":
+        """Build a policy from a TTL number, a mapping, or an existing policy."""
+        if value is None or value is False:
+            return None
+        if isinstance(value, CachePolicy):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return cls(ttl=float(value))
+        if isinstance(value, dict):
+            return cls(ttl=float(value["ttl"]), vary=tuple(value.get("vary", ())))
+        raise TypeError(f"Unsupported cache policy: {value!r}")
+
+    def key(self, scope: ASGIScope) -> tuple[Hashable, ...]:
+        """Return the cache key for a request scope."""
+        varied: tuple[bytes | None, ...] = ()
+        if self.vary:
+            headers = {name.lower(): value for name, value in scope.get("headers", [])}
+            varied = tuple(headers.get(name.encode()) for name in self.vary)
+        return (
+            scope.get("method", "").upper(),
+            scope.get("path", ""),
+            scope.get("query_string", b""),
+            varied,
+        )
+
+
+@dataclass
+class _Entry:
+    response: Response
+    expires: float
+    size: int
+
+
+class ResponseCache:
+    """An in-memory LRU cache of encoded responses with TTLs and single-flight.
+
+    Entries are bounded both by count and by total body plus header bytes.
+    Concurrent misses on the same key wait for the first caller's handler run
+    instead of running the handler again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a cache with entry-count and byte budgets."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._pending: dict[Hashable, asyncio.Task[Response]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and current usage."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def get(self, key: Hashable) -> Response | None:
+        """Return a fresh cached response, dropping it if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self._clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        ttl: float,
+        compute: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Return a cached response or compute, store and return a new one.
+
+        Concurrent misses for one key share a single ``compute`` call, run in
+        its own task. If the caller that started it is cancelled, the call
+        keeps running for the callers still waiting on it.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._fill(key, ttl, compute))
+        task.add_done_callback(_retrieve_exception)
+        self._pending[key] = task
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: Hashable, ttl: float, compute: Callable[[], Awaitable[Response]]) -> Response:
+        try:
+            response = await compute()
+        finally:
+            self._pending.pop(key, None)
+        self.put(key, response, ttl)
+        return response
+
+    def put(self, key: Hashable, response: Response, ttl: float) -> None:
+        """Store a response if it is cacheable and fits the byte budget."""
+        if response.status != 200 or isinstance(response, StreamingResponse) or ttl <= 0:
+            return
+        size = len(response.body) + sum(len(k) + len(v) for k, v in response.headers or [])
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(response=response, expires=self._clock() + ttl, size=size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+def _retrieve_exception(task: asyncio.Task[Response]) -> None:
+    # Every waiter may have been cancelled; mark the error as seen so it is not logged.
+    if not task.cancelled():
+        task.exception()
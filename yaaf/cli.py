@@ -3,10 +3,41 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import sys
+from pathlib import Path
+
 import uvicorn
 
 from .gen_services import generate_services
+from .loader import scan_routes
+from .workers import serve_workers
+
+
+def _default_manifest(consumers_dir: str) -> str:
+    """Place the manifest next to (not inside) the consumers directory."""
+    return str(Path(consumers_dir).parent / ".yaaf" / "manifest.json")
+
+
+def _bench(args: argparse.Namespace) -> None:
+    from .bench import BenchConfig, compare, run_suite, summary
+
+    config = BenchConfig(
+        static_routes=args.static_routes,
+        dynamic_routes=args.dynamic_routes,
+        service_depth=args.service_depth,
+        requests=args.requests,
+        concurrency=args.concurrency,
+    )
+    results = run_suite(config)
+    print(summary(results))
+    if args.compare:
+        print()
+        print(compare(json.loads(Path(args.compare).read_text()), results))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {args.output}")
 
 
 def main() -> None:
@@ -21,14 +52,48 @@ def main() -> None:
     serve_parser.add_argument("--port", default=8000, type=int)
     serve_parser.add_argument("--reload", action="store_true")
     serve_parser.add_argument("--consumers-dir", default="consumers")
+    serve_parser.add_argument("--workers", default=1, type=int, help="Number of worker processes")
+    serve_parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Discover the consumers tree once before forking workers",
+    )
+    serve_parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Discovery manifest path (default: .yaaf/manifest.json beside the consumers dir, '' to disable)",
+    )
+    serve_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="on",
+        default=None,
+        metavar="HZ",
+        help="Run the sampling profiler, optionally at HZ samples per second (sets YAAF_PROFILE)",
+    )
     serve_parser.set_defaults(command="serve")
 
+    build_parser = subparsers.add_parser("build", help="Write the discovery manifest and service types")
+    build_parser.add_argument("--consumers-dir", default="consumers")
+    build_parser.add_argument("--manifest", default=None)
+    build_parser.set_defaults(command="build")
+
     gen_parser = subparsers.add_parser("gen-services", help="Generate consumers/api/__init__.py")
     gen_parser.add_argument("--consumers-dir", default="consumers")
     gen_parser.add_argument("--output", default=None)
     gen_parser.set_defaults(command="gen-services")
 
-    if len(sys.argv) > 1 and sys.argv[1] == "gen-services":
+    bench_parser = subparsers.add_parser("bench", help="Run the in-process benchmark suite")
+    bench_parser.add_argument("--static-routes", default=100, type=int)
+    bench_parser.add_argument("--dynamic-routes", default=100, type=int)
+    bench_parser.add_argument("--service-depth", default=5, type=int, help="Length of the service dependency chain")
+    bench_parser.add_argument("--requests", default=20_000, type=int, help="Requests per scenario")
+    bench_parser.add_argument("--concurrency", default=16, type=int)
+    bench_parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    bench_parser.add_argument("--compare", default=None, help="Compare against a previous JSON result")
+    bench_parser.set_defaults(command="bench")
+
+    if len(sys.argv) > 1 and sys.argv[1] in {"gen-services", "build", "bench"}:
         args = parser.parse_args()
     else:
         args = parser.parse_args(["serve", *sys.argv[1:]])
@@ -37,12 +102,30 @@ def main() -> None:
         generate_services(consumers_dir=args.consumers_dir, output_path=args.output)
         return
 
-    generate_services(consumers_dir=args.consumers_dir)
+    if args.command == "build":
+        manifest_path = args.manifest or _default_manifest(args.consumers_dir)
+        manifest = scan_routes(args.consumers_dir, manifest_path)
+        generate_services(consumers_dir=args.consumers_dir, manifest_path=manifest_path)
+        print(f"Wrote {manifest_path} ({len(manifest.routes)} routes, {len(manifest.directories)} directories)")
+        return
+
+    if args.command == "bench":
+        _bench(args)
+        return
+
+    if args.workers > 1 and args.reload:
+        parser.error("--reload cannot be combined with --workers")
+
+    if args.profile is not None:
+        os.environ["YAAF_PROFILE"] = args.profile
+
+    manifest_path = _default_manifest(args.consumers_dir) if args.manifest is None else args.manifest or None
+    generate_services(consumers_dir=args.consumers_dir, manifest_path=manifest_path)
     
     # If using the default yaaf app, create it with the custom consumers_dir
     if args.app == "yaaf.app:app":
         from .app import App
-        app = App(consumers_dir=args.consumers_dir)
+        app = App(consumers_dir=args.consumers_dir, manifest_path=manifest_path, watch=args.reload)
     else:
         # For custom apps, use the specified app path
         import importlib
@@ -50,7 +133,14 @@ def main() -> None:
         module = importlib.import_module(module_path)
         app = getattr(module, app_name)
     
-    uvicorn.run(app, host=args.host, port=args.port, reload=args.reload)
+    if args.workers > 1:
+        serve_workers(app, host=args.host, port=args.port, workers=args.workers, preload=args.preload)
+        return
+
+    # The default app reloads changed route directories in-process (App(watch=True)),
+    # so uvicorn's whole-process reload is only used for custom apps.
+    reload = args.reload and args.app != "yaaf.app:app"
+    uvicorn.run(app, host=args.host, port=args.port, reload=reload)
 
 
 if __name__ == "__main__":
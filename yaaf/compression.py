@@ -0,0 +1,369 @@
+"""Negotiated response compression middleware.
+
+gzip is always available. brotli (``brotli``) and zstd (``zstandard``) are used
+when those packages are installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import importlib
+import os
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Protocol
+
+from .conditional import coding_etag, etag_listed, response_etag
+from .responses import Response, StreamingResponse
+from .types import CallNext
+
+_COMPRESSIBLE_PREFIXES = ("text/",)
+_COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+
+
+class StreamCompressor(Protocol):
+    """Incremental compressor whose output can be sent after every chunk."""
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress ``chunk`` and flush so the client can decode it right away."""
+        ...
+
+    def finish(self) -> bytes:
+        """Return the end of the compressed stream."""
+        ...
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A content coding: one-shot and streaming compressors plus a default level."""
+    name: str
+    compress: Callable[[bytes, int], bytes]
+    stream: Callable[[int], StreamCompressor]
+    default_level: int
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _gzip() -> Codec:
+    return Codec(
+        name="gzip",
+        compress=lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+        stream=_GzipStream,
+        default_level=6,
+    )
+
+
+def _brotli() -> Codec:
+    brotli = importlib.import_module("brotli")
+
+    class _BrotliStream:
+        def __init__(self, level: int) -> None:
+            self._compressor = brotli.Compressor(quality=level)
+
+        def compress(self, chunk: bytes) -> bytes:
+            return self._compressor.process(chunk) + self._compressor.flush()
+
+        def finish(self) -> bytes:
+            return self._compressor.finish()
+
+    return Codec(
+        name="br",
+        compress=lambda data, level: brotli.compress(data, quality=level),
+        stream=_BrotliStream,
+        default_level=4,
+    )
+
+
+def _zstd() -> Codec:
+    zstandard = importlib.import_module("zstandard")
+
+    class _ZstdStream:
+        def __init__(self, level: int) -> None:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+        def compress(self, chunk: bytes) -> bytes:
+            return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+        def finish(self) -> bytes:
+            return self._compressor.flush()
+
+    return Codec(
+        name="zstd",
+        compress=lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+        stream=_ZstdStream,
+        default_level=3,
+    )
+
+
+_BACKENDS: dict[str, Callable[[], Codec]] = {
+    "br": _brotli,
+    "zstd": _zstd,
+    "gzip": _gzip,
+}
+
+
+def available_codecs(names: Iterable[str] | None = None) -> list[Codec]:
+    """Return installed codecs, in server preference order.
+
+    ``names`` picks and orders codecs. Unknown names raise ValueError, and
+    codecs whose package is missing are skipped.
+    """
+    codecs: list[Codec] = []
+    for name in names if names is not None else _BACKENDS:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown content coding '{name}'")
+        try:
+            codecs.append(_BACKENDS[name]())
+        except ImportError:
+            continue
+    return codecs
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    """Parse an ``accept-encoding`` header into coding -> q-value."""
+    accepted: dict[str, float] = {}
+    for item in value.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, number = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compress responses using the best coding the client accepts.
+
+    Bodies smaller than ``minimum_size`` bytes, responses that are already
+    encoded, and content types that do not compress well are left unchanged.
+    Bodies and stream chunks of at least ``offload_size`` bytes are compressed
+    in a worker thread. At most ``max_concurrency`` of those run at a time, and
+    the rest wait their turn. Streamed responses are compressed chunk by chunk,
+    with a flush after each chunk. With ``cache_entries`` above 0, that many
+    compressed variants of identical bodies are kept, up to ``cache_bytes`` in
+    total. The cache is off by default because it hashes every body it sees.
+    """
+
+    def __init__(
+        self,
+        minimum_size: int = 500,
+        encodings: Iterable[str] | None = None,
+        levels: dict[str, int] | None = None,
+        offload_size: int = 64 * 1024,
+        max_concurrency: int | None = None,
+        cache_entries: int = 0,
+        cache_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        """Configure thresholds, codings and levels (per coding name)."""
+        self.codecs = available_codecs(encodings)
+        self.levels = {codec.name: codec.default_level for codec in self.codecs}
+        self.levels.update(levels or {})
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self._budget = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._cache_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.waited = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return variant-cache counters and how often compression waited for the CPU budget."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "waited": self.waited,
+            "entries": len(self._cache),
+            "bytes": self._cache_size,
+        }
+
+    async def __call__(self, request: Any, call_next: CallNext) -> Response:
+        """Run the rest of the chain and compress its response when worthwhile."""
+        response = await call_next(request)
+        if request.method == "HEAD":
+            return response
+        if response.status == 304:
+            return self._mark_not_modified(request, response)
+        if not _compressible(response):
+            return response
+        codec = self._negotiate(request.headers.get("accept-encoding", ""))
+        if isinstance(response, StreamingResponse):
+            if codec is None:
+                return response.with_headers([("vary", "accept-encoding")])
+            return self._compress_stream(response, codec)
+        if len(response.body) < self.minimum_size:
+            return response
+        if codec is None:
+            return response.with_headers([("vary", "accept-encoding")])
+        body = await self._compress_body(response.body, codec)
+        compressed = Response(body=body, status=response.status, headers=_encoded_headers(response, codec))
+        compressed.headers.append((b"content-length", str(len(body)).encode()))
+        return compressed
+
+    def _mark_not_modified(self, request: Any, response: Response) -> Response:
+        """Give a 304 the coded ETag and ``vary`` of the compressed variant the client holds.
+
+        A 304 has no body to judge compressibility by, so it is marked only
+        when ``if-none-match`` names the coded tag of the negotiated coding.
+        """
+        etag = response_etag(response)
+        if etag is None or not etag.endswith(b'"'):
+            return response
+        codec = self._negotiate(request.headers.get("accept-encoding", ""))
+        if codec is None:
+            return response
+        tag = coding_etag(etag, codec.name)
+        if not etag_listed(request.headers.get("if-none-match", ""), tag):
+            return response
+        headers: list[tuple[bytes, bytes]] = []
+        vary = b""
+        for name, value in response.headers:
+            lowered = name.lower()
+            if lowered == b"vary":
+                vary = value
+            elif lowered != b"etag":
+                headers.append((name, value))
+        headers.append((b"etag", tag))
+        headers.append((b"vary", _vary_with_encoding(vary)))
+        return Response(body=b"", status=304, headers=headers)
+
+    def _negotiate(self, header: str) -> Codec | None:
+        """Pick the codec with the client's highest q-value; server order breaks ties."""
+        if not header:
+            return None
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get("*", 0.0)
+        best: Codec | None = None
+        best_quality = 0.0
+        for codec in self.codecs:
+            quality = accepted.get(codec.name, wildcard)
+            if quality > best_quality:
+                best, best_quality = codec, quality
+        return best
+
+    async def _compress_body(self, body: bytes, codec: Codec) -> bytes:
+        key = (codec.name, body)
+        if self.cache_entries:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        level = self.levels[codec.name]
+        if len(body) < self.offload_size:
+            compressed = codec.compress(body, level)
+        else:
+            compressed = await self._offload(codec.compress, body, level)
+        if self.cache_entries:
+            self._store(key, compressed)
+        return compressed
+
+    def _store(self, key: tuple[str, bytes], compressed: bytes) -> None:
+        size = len(key[1]) + len(compressed)
+        if size > self.cache_bytes:
+            return
+        self._cache[key] = compressed
+        self._cache_size += size
+        while len(self._cache) > self.cache_entries or self._cache_size > self.cache_bytes:
+            (name, body), value = self._cache.popitem(last=False)
+            self._cache_size -= len(body) + len(value)
+
+    def _compress_stream(self, response: StreamingResponse, codec: Codec) -> StreamingResponse:
+        compressor = codec.stream(self.levels[codec.name])
+        compressed = StreamingResponse(self._stream_chunks(response, compressor), status=response.status)
+        compressed.headers = _encoded_headers(response, codec)
+        return compressed
+
+    async def _stream_chunks(self, response: StreamingResponse, compressor: StreamCompressor) -> AsyncIterator[bytes]:
+        async for chunk in response._iterate():
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if not chunk:
+                continue
+            if len(chunk) >= self.offload_size:
+                compressed = await self._offload(compressor.compress, chunk)
+            else:
+                compressed = compressor.compress(chunk)
+            yield compressed
+        yield compressor.finish()
+
+    async def _offload(self, func: Callable[..., bytes], *args: Any) -> bytes:
+        """Run ``func`` in a worker thread once the CPU budget has room."""
+        if self._budget.locked():
+            self.waited += 1
+        async with self._budget:
+            return await asyncio.to_thread(func, *args)
+
+
+def _compressible(response: Response) -> bool:
+    if response.status < 200 or response.status in (204, 304):
+        return False
+    content_type = b""
+    for name, value in response.headers or []:
+        lowered = name.lower()
+        if lowered == b"content-encoding":
+            return False
+        if lowered == b"content-type":
+            content_type = value
+    media_type = content_type.split(b";", 1)[0].strip().decode("latin-1").lower()
+    return (
+        media_type.startswith(_COMPRESSIBLE_PREFIXES)
+        or media_type in _COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def _encoded_headers(response: Response, codec: Codec) -> list[tuple[bytes, bytes]]:
+    """Copy headers without content-length, adding content-encoding and vary.
+
+    A strong ETag is marked with the coding so each encoding has its own tag.
+    """
+    headers: list[tuple[bytes, bytes]] = []
+    vary = b""
+    for name, value in response.headers or []:
+        lowered = name.lower()
+        if lowered == b"content-length":
+            continue
+        if lowered == b"vary":
+            vary = value
+            continue
+        if lowered == b"etag" and value.endswith(b'"'):
+            value = coding_etag(value, codec.name)
+        headers.append((name, value))
+    headers.append((b"content-encoding", codec.name.encode()))
+    headers.append((b"vary", _vary_with_encoding(vary)))
+    return headers
+
+
+def _vary_with_encoding(vary: bytes) -> bytes:
+    if b"accept-encoding" in vary.lower():
+        return vary
+    return b"accept-encoding" if not vary else vary + b", accept-encoding"
@@ -0,0 +1,81 @@
+"""Entity tags and conditional GET helpers."""
+
+from __future__ import annotations
+
+import hashlib
+
+from .responses import Response
+
+# Compression marks the tag of each encoded variant as "<tag>~<coding>".
+CODING_SEPARATOR = b"~"
+_CODINGS = (b"gzip", b"br", b"zstd")
+
+# Headers a 304 keeps from the response it replaces.
+_NOT_MODIFIED_HEADERS = {b"etag", b"cache-control", b"content-location", b"date", b"expires", b"vary"}
+
+
+def compute_etag(body: bytes) -> bytes:
+    """Return a strong entity tag for a response body."""
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+def token_etag(token: object) -> bytes:
+    """Return a strong entity tag for a handler-supplied version token."""
+    text = str(token).replace('"', "")
+    return b'"' + text.encode() + b'"'
+
+
+def coding_etag(etag: bytes, coding: str) -> bytes:
+    """Return the entity tag of the ``coding``-encoded variant of a strong tag."""
+    return etag[:-1] + CODING_SEPARATOR + coding.encode() + b'"'
+
+
+def response_etag(response: Response) -> bytes | None:
+    """Return the ``etag`` header of a response, if it has one."""
+    for name, value in response.headers or []:
+        if name.lower() == b"etag":
+            return value
+    return None
+
+
+def etag_matches(if_none_match: str, etag: bytes) -> bool:
+    """Compare ``if-none-match`` against an entity tag using weak comparison.
+
+    Tags that compression marked with a coding (see ``coding_etag``) still
+    match the tag of the uncompressed body. Only the candidates are unmarked,
+    so a handler's own tag is always compared as it is.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque(etag)
+    for candidate in if_none_match.split(","):
+        opaque = _opaque(candidate.strip().encode())
+        if opaque == target or _without_coding(opaque) == target:
+            return True
+    return False
+
+
+def etag_listed(if_none_match: str, etag: bytes) -> bool:
+    """Return whether ``if-none-match`` names ``etag`` itself, codings included."""
+    target = _opaque(etag)
+    return any(_opaque(candidate.strip().encode()) == target for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: bytes, response: Response | None = None) -> Response:
+    """Return a bodyless 304 that keeps the caching headers of ``response``."""
+    kept = (response.headers or []) if response is not None else []
+    headers = [(name, value) for name, value in kept if name.lower() in _NOT_MODIFIED_HEADERS]
+    if not any(name.lower() == b"etag" for name, _value in headers):
+        headers.append((b"etag", etag))
+    return Response(body=b"", status=304, headers=headers)
+
+
+def _opaque(tag: bytes) -> bytes:
+    if tag.startswith(b"W/"):
+        tag = tag[2:]
+    return tag.strip(b'"')
+
+
+def _without_coding(tag: bytes) -> bytes | None:
+    base, separator, coding = tag.rpartition(CODING_SEPARATOR)
+    return base if separator and coding in _CODINGS else None
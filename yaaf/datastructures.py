@@ -0,0 +1,137 @@
+"""Multi-value mappings for request headers, query parameters and cookies."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+from urllib.parse import parse_qsl
+
+
+class MultiDict(Mapping[str, str]):
+    """An immutable mapping that keeps every value of repeated keys.
+
+    ``multi[key]`` and ``get`` return the first value; ``getlist`` returns all
+    of them. The key index is built on first lookup.
+    """
+
+    __slots__ = ("_items", "_index")
+
+    def __init__(self, items: list[tuple[str, str]]) -> None:
+        """Wrap ``(key, value)`` pairs in their original order."""
+        self._items = items
+        self._index: dict[str, list[str]] | None = None
+
+    def _lookup(self) -> dict[str, list[str]]:
+        if self._index is None:
+            index: dict[str, list[str]] = {}
+            for key, value in self._items:
+                index.setdefault(self._normalize(key), []).append(value)
+            self._index = index
+        return self._index
+
+    @staticmethod
+    def _normalize(key: str) -> str:
+        return key
+
+    def __getitem__(self, key: str) -> str:
+        return self._lookup()[self._normalize(key)][0]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._normalize(key) in self._lookup()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lookup())
+
+    def __len__(self) -> int:
+        return len(self._lookup())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._items!r})"
+
+    def getlist(self, key: str) -> list[str]:
+        """Return every value for ``key``, in order."""
+        return list(self._lookup().get(self._normalize(key), ()))
+
+    def multi_items(self) -> list[tuple[str, str]]:
+        """Return all ``(key, value)`` pairs, including repeats."""
+        return list(self._items)
+
+
+class Headers(MultiDict):
+    """Case-insensitive request headers decoded from raw ASGI header pairs.
+
+    ``headers[name]`` joins repeated headers with ``", "``, as HTTP defines for
+    list-valued fields. Use ``getlist`` for the separate values.
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw: list[tuple[bytes, bytes]]) -> None:
+        """Keep the raw pairs; they are decoded on first lookup."""
+        self._raw = raw
+        self._items: list[tuple[str, str]] = []
+        self._index = None
+
+    def _lookup(self) -> dict[str, list[str]]:
+        if self._index is None:
+            index: dict[str, list[str]] = {}
+            for raw_name, raw_value in self._raw:
+                name = raw_name.decode("latin-1").lower()
+                value = raw_value.decode("latin-1")
+                if name in index:
+                    index[name].append(value)
+                else:
+                    index[name] = [value]
+            self._index = index
+        return self._index
+
+    @staticmethod
+    def _normalize(key: str) -> str:
+        return key.lower()
+
+    def __getitem__(self, key: str) -> str:
+        values = self._lookup()[key.lower()]
+        return values[0] if len(values) == 1 else ", ".join(values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the header value, or ``default`` when it is absent."""
+        values = self._lookup().get(key.lower())
+        if values is None:
+            return default
+        return values[0] if len(values) == 1 else ", ".join(values)
+
+    def multi_items(self) -> list[tuple[str, str]]:
+        """Return all decoded ``(name, value)`` pairs, names lowercased."""
+        return [(name.decode("latin-1").lower(), value.decode("latin-1")) for name, value in self._raw]
+
+    def __repr__(self) -> str:
+        return f"Headers({self.multi_items()!r})"
+
+
+class QueryParams(MultiDict):
+    """Query-string parameters; ``params[key]`` returns the first value."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(cls, query_string: bytes) -> "QueryParams":
+        """Parse a raw ASGI ``query_string``, keeping blank values."""
+        if not query_string:
+            return cls([])
+        return cls(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+
+
+def parse_cookies(headers: list[str]) -> dict[str, str]:
+    """Parse ``cookie`` header values into a name -> value dict (first occurrence wins)."""
+    cookies: dict[str, str] = {}
+    for header in headers:
+        for pair in header.split(";"):
+            name, sep, value = pair.partition("=")
+            name = name.strip()
+            if not sep or not name:
+                continue
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            cookies.setdefault(name, value)
+    return cookies
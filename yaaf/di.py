@@ -5,10 +5,15 @@ from __future__ import annotations
 import inspect
 from dataclasses import dataclass
 from collections.abc import Mapping
-from typing import Any, Callable, TypeVar
+from typing import Any, Awaitable, Callable, TypeVar
 
 T = TypeVar("T")
 
+SINGLETON = "singleton"
+REQUEST = "request"
+TRANSIENT = "transient"
+LIFETIMES = (SINGLETON, REQUEST, TRANSIENT)
+
 @dataclass
 class ServiceRegistry:
     """Global registry for services, keyed by type and name variants."""
@@ -16,11 +21,11 @@ class ServiceRegistry:
     by_alias: dict[str, Any]
 
     def register(self, instance: T, aliases: list[str]) -> T:
-        """Register a service instance by type and alias names."""
-        self.by_type[type(instance)] = instance
-        type_name = type(instance).__name__
-        if type_name:
-            self.by_alias[type_name] = instance
+        """Register a service instance (or a ``ScopedProvider``) by type and alias names."""
+        service_type = instance.service_type if isinstance(instance, ScopedProvider) else type(instance)
+        if service_type is not None:
+            self.by_type[service_type] = instance
+            self.by_alias[service_type.__name__] = instance
         for alias in aliases:
             self.by_alias[alias] = instance
         return instance
@@ -51,28 +56,170 @@ class ServiceRegistry:
         return None
 
 
+class RequestScope:
+    """Request-scoped service instances and the cleanups to run when the request ends."""
+
+    def __init__(self) -> None:
+        """Create an empty scope."""
+        self.instances: dict[ScopedProvider, Any] = {}
+        self._cleanups: list[Callable[[], Awaitable[Any]]] = []
+
+    def push(self, cleanup: Callable[[], Awaitable[Any]]) -> None:
+        """Register a cleanup to await when the scope closes."""
+        self._cleanups.append(cleanup)
+
+    async def aclose(self) -> None:
+        """Run cleanups in reverse creation order, raising the first error afterwards."""
+        errors: list[BaseException] = []
+        while self._cleanups:
+            try:
+                await self._cleanups.pop()()
+            except Exception as exc:
+                errors.append(exc)
+        self.instances.clear()
+        if errors:
+            raise errors[0]
+
+
+@dataclass(frozen=True)
+class InjectionPlan:
+    """Precomputed argument sources for a callable.
+
+    Each parameter is stored as ``(name, service, has_default)`` where ``service``
+    is the instance resolved from the registry when the plan was built, or None.
+    Context values still take precedence, matching ``DependencyResolver.call``.
+    ``scoped`` is set when any service is a ``ScopedProvider``; such plans must
+    be bound with ``abind`` inside a ``RequestScope``.
+    """
+    func: Callable[..., Any]
+    params: tuple[tuple[str, Any, bool], ...]
+    scoped: bool = False
+
+    def bind(self, context: Mapping[str, Any]) -> dict[str, Any]:
+        """Build keyword arguments for the callable from a context mapping."""
+        if self.scoped:
+            raise RuntimeError(f"{self.func} injects request-scoped or transient services outside a request")
+        kwargs: dict[str, Any] = {}
+        for name, service, has_default in self.params:
+            if name in context:
+                kwargs[name] = context[name]
+            elif service is not None:
+                kwargs[name] = service
+            elif not has_default:
+                raise TypeError(f"Cannot resolve dependency '{name}' for {self.func}")
+        return kwargs
+
+    async def abind(self, context: Mapping[str, Any], scope: RequestScope) -> dict[str, Any]:
+        """Like ``bind``, creating request-scoped and transient services in ``scope``."""
+        kwargs: dict[str, Any] = {}
+        for name, service, has_default in self.params:
+            if name in context:
+                kwargs[name] = context[name]
+            elif isinstance(service, ScopedProvider):
+                kwargs[name] = await service.provide(scope, context)
+            elif service is not None:
+                kwargs[name] = service
+            elif not has_default:
+                raise TypeError(f"Cannot resolve dependency '{name}' for {self.func}")
+        return kwargs
+
+    def __call__(self, context: Mapping[str, Any]) -> Any:
+        """Call the planned function with arguments bound from context."""
+        return self.func(**self.bind(context))
+
+
+@dataclass(eq=False)
+class ScopedProvider:
+    """Creates a request-scoped or transient service when it is injected.
+
+    Request-scoped services are created once per ``RequestScope``; transient
+    ones on every injection. Factories may be sync, async, or async generators
+    whose code after ``yield`` runs when the scope closes. Instances that are
+    async context managers are entered on creation and exited with the scope;
+    otherwise ``aclose`` is awaited if present.
+    """
+    plan: InjectionPlan
+    lifetime: str
+    service_type: type | None = None
+    created: int = 0
+
+    async def provide(self, scope: RequestScope, context: Mapping[str, Any]) -> Any:
+        """Return the instance for ``scope``, creating it if needed."""
+        if self.lifetime == REQUEST and self in scope.instances:
+            return scope.instances[self]
+        plan = self.plan
+        result = plan.func(**(await plan.abind(context, scope) if plan.scoped else plan.bind(context)))
+        if inspect.isasyncgen(result):
+            instance = await result.__anext__()
+            scope.push(lambda: _finish_generator(result))
+        else:
+            instance = await result if inspect.isawaitable(result) else result
+            if hasattr(instance, "__aenter__"):
+                await instance.__aenter__()
+                scope.push(lambda: instance.__aexit__(None, None, None))
+            elif callable(getattr(instance, "aclose", None)):
+                scope.push(instance.aclose)
+        self.created += 1
+        if self.lifetime == REQUEST:
+            scope.instances[self] = instance
+        return instance
+
+
+async def _finish_generator(generator: Any) -> None:
+    try:
+        await generator.__anext__()
+    except StopAsyncIteration:
+        return
+    await generator.aclose()
+    raise RuntimeError(f"Service factory {generator} yielded more than once")
+
+
 class DependencyResolver:
     """Resolve function arguments from a registry and contextual values."""
     def __init__(self, registry: ServiceRegistry) -> None:
         """Create a resolver bound to a service registry."""
         self.registry = registry
+        self._plans: dict[Callable[..., Any], InjectionPlan] = {}
 
-    def call(self, func: Callable[..., Any], context: Mapping[str, Any]) -> Any:
-        """Call a function, injecting dependencies from context or registry."""
+    def plan(self, func: Callable[..., Any]) -> InjectionPlan:
+        """Inspect a callable and resolve its services against the registry."""
         signature = inspect.signature(func)
-        kwargs: dict[str, Any] = {}
+        params: list[tuple[str, Any, bool]] = []
         for name, param in signature.parameters.items():
-            if name in context:
-                kwargs[name] = context[name]
-                continue
             annotation = None
             if param.annotation is not inspect._empty:
                 annotation = param.annotation
             resolved = self.registry.resolve(annotation)
-            if resolved is not None:
-                kwargs[name] = resolved
-                continue
-            if param.default is not inspect._empty:
-                continue
-            raise TypeError(f"Cannot resolve dependency '{name}' for {func}")
-        return func(**kwargs)
+            params.append((name, resolved, param.default is not inspect._empty))
+        scoped = any(isinstance(service, ScopedProvider) for _name, service, _default in params)
+        return InjectionPlan(func=func, params=tuple(params), scoped=scoped)
+
+    def compile(self, func: Callable[..., Any]) -> InjectionPlan:
+        """Build and cache the injection plan used by later calls to ``func``.
+
+        Only compile once the registry is complete; cached plans are not
+        refreshed when more services are registered.
+        """
+        plan = self.plan(func)
+        self._plans[func] = plan
+        return plan
+
+    def cached_plan(self, func: Callable[..., Any]) -> InjectionPlan | None:
+        """Return the compiled plan for ``func``, if any."""
+        return self._plans.get(func)
+
+    def adopt(self, plan: InjectionPlan) -> None:
+        """Cache a plan compiled by another resolver whose services are still valid."""
+        self._plans[plan.func] = plan
+
+    def call(self, func: Callable[..., Any], context: Mapping[str, Any]) -> Any:
+        """Call a function, injecting dependencies from context or registry."""
+        plan = self._plans.get(func)
+        if plan is None:
+            plan = self.plan(func)
+        return plan(context)
+
+    def plan_for(self, func: Callable[..., Any]) -> InjectionPlan:
+        """Return the compiled plan for ``func``, or a fresh uncached one."""
+        plan = self._plans.get(func)
+        return plan if plan is not None else self.plan(func)
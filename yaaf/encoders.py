@@ -0,0 +1,60 @@
+"""JSON encoders that produce response bytes directly."""
+
+from __future__ import annotations
+
+import importlib
+import json
+from typing import Any, Callable, TypeAlias
+
+JSONEncoder: TypeAlias = Callable[[Any], bytes]
+
+_stdlib_encoder = json.JSONEncoder(ensure_ascii=True)
+
+
+def stdlib_json(content: Any) -> bytes:
+    """Encode with the standard library encoder."""
+    return _stdlib_encoder.encode(content).encode()
+
+
+def _orjson() -> JSONEncoder:
+    orjson = importlib.import_module("orjson")
+    option = orjson.OPT_NON_STR_KEYS
+
+    def encode(content: Any) -> bytes:
+        return orjson.dumps(content, option=option)
+
+    return encode
+
+
+def _msgspec() -> JSONEncoder:
+    msgspec = importlib.import_module("msgspec")
+    return msgspec.json.Encoder().encode
+
+
+_BACKENDS: dict[str, Callable[[], JSONEncoder]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": lambda: stdlib_json,
+}
+
+
+def get_json_encoder(name: str | None = None) -> JSONEncoder:
+    """Return a JSON encoder by name, or the fastest installed one.
+
+    ``name`` may be ``"orjson"``, ``"msgspec"`` or ``"json"``. Without a name,
+    orjson and msgspec are tried in that order before falling back to the
+    standard library.
+    """
+    if name is not None:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown JSON encoder '{name}'")
+        return _BACKENDS[name]()
+    for candidate in ("orjson", "msgspec"):
+        try:
+            return _BACKENDS[candidate]()
+        except ImportError:
+            continue
+    return stdlib_json
+
+
+default_json_encoder: JSONEncoder = get_json_encoder()
@@ -0,0 +1,170 @@
+"""Running synchronous handlers off the event loop.
+
+Sync handlers run in a thread pool by default so blocking I/O does not stall
+other requests. ``@inline`` keeps a cheap handler on the event loop, and a
+``_server.py`` can set ``executor = "process"`` to run its sync handlers in a
+process pool for CPU-bound work. ``@streaming`` asks that an async handler's
+request body be left unread so it can consume ``request.stream()`` itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib.util
+import inspect
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+EXECUTORS = (INLINE, THREAD, PROCESS)
+
+
+def inline(func: F) -> F:
+    """Mark a sync handler as cheap enough to run on the event loop."""
+    func.__yaaf_executor__ = INLINE  # type: ignore[attr-defined]
+    return func
+
+
+def streaming(func: F) -> F:
+    """Mark an async handler that reads ``request.stream()`` itself, so the body is not read first."""
+    func.__yaaf_streaming__ = True  # type: ignore[attr-defined]
+    return func
+
+
+def reads_body_first(func: Callable[..., Any]) -> bool:
+    """Return whether the body is read before ``func`` runs.
+
+    It is read for every handler taking ``request``, except async handlers
+    marked ``@streaming``. Sync handlers cannot stream, so they ignore the mark.
+    """
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    if "request" not in parameters:
+        return False
+    is_async = inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+    return not (is_async and getattr(func, "__yaaf_streaming__", False))
+
+
+def handler_executor(func: Callable[..., Any], default: str = THREAD) -> str:
+    """Return where a handler runs: async and generator handlers always run inline."""
+    marked = getattr(func, "__yaaf_executor__", None)
+    if marked is not None:
+        return marked
+    if inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func):
+        return INLINE
+    return default
+
+
+class OffloadPool:
+    """A thread or process pool that records queueing and saturation.
+
+    ``stats()`` reports the configured size, calls in flight, how many of those
+    are queued behind busy workers, completed calls, and the total and maximum
+    time calls waited for a worker.
+    """
+
+    def __init__(self, kind: str = THREAD, max_workers: int | None = None) -> None:
+        """Create a pool; the underlying executor starts on first use."""
+        if kind not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown pool kind '{kind}'")
+        self.kind = kind
+        self._requested_workers = max_workers
+        self._executor: Executor | None = None
+        self.max_workers = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return pool size, saturation and wait-time counters."""
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.max_workers, 0),
+            "completed": self.completed,
+            "wait_time": self.wait_time,
+            "max_wait": self.max_wait,
+        }
+
+    async def run(self, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Run ``func`` in the pool and return its result."""
+        executor = self._executor or self._start()
+        submitted = time.monotonic()
+        self.in_flight += 1
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(_timed, func, args, kwargs)
+            )
+        finally:
+            self.in_flight -= 1
+        waited = max(started - submitted, 0.0)
+        self.completed += 1
+        self.wait_time += waited
+        self.max_wait = max(self.max_wait, waited)
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the workers; calls already running finish first."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _start(self) -> Executor:
+        if self.kind == PROCESS:
+            executor: Executor = ProcessPoolExecutor(
+                max_workers=self._requested_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=self._requested_workers, thread_name_prefix="yaaf-handler")
+        self.max_workers = executor._max_workers  # type: ignore[attr-defined]
+        self._executor = executor
+        return executor
+
+
+def _timed(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[float, Any]:
+    started = time.monotonic()
+    return started, func(*args, **kwargs)
+
+
+def process_call(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Return a picklable stand-in that re-imports ``func`` from its file in a worker process.
+
+    Handler modules are loaded by path and are not importable by name, so the
+    worker loads the module from its file once and looks the function up there.
+    Spawned workers inherit ``sys.path``, including the consumers parent, and
+    reload the module when its file changes.
+    """
+    return functools.partial(_call_from_file, inspect.getfile(func), func.__module__, func.__qualname__)
+
+
+_process_modules: dict[str, tuple[int, ModuleType]] = {}
+
+
+def _call_from_file(path: str, module_name: str, qualname: str, *args: Any, **kwargs: Any) -> Any:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _process_modules.get(path)
+    if cached is not None and cached[0] == mtime:
+        module = cached[1]
+    else:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Could not load module from {path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _process_modules[path] = (mtime, module)
+    target: Any = module
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target(*args, **kwargs)
@@ -32,7 +32,13 @@ def _service_alias(route_parts: list[str]) -> str:
     return f"{base}Service"
 
 
-def generate_services(consumers_dir: str = "consumers", output_path: str | None = None) -> Path:
+def generate_services(
+    consumers_dir: str = "consumers",
+    output_path: str | None = None,
+    manifest_path: str | None = None,
+) -> Path:
+    from .loader import scan_routes
+
     base = Path(consumers_dir)
     out_path = Path(output_path) if output_path else base / "api" / "__init__.py"
 
@@ -44,11 +50,13 @@ def generate_services(consumers_dir: str = "consumers", output_path: str | None
 
     aliases: list[tuple[str, str]] = []
     dynamic_aliases: list[str] = []
-    for root in base.rglob("_service.py"):
+    manifest = scan_routes(consumers_dir, manifest_path)
+    for directory in manifest.directories_with("_service.py"):
+        root = base if directory == "." else base / directory
         if "api" not in root.parts:
             continue
         api_index = root.parts.index("api")
-        route_parts = list(root.parts[api_index + 1 : -1])
+        route_parts = list(root.parts[api_index + 1 :])
         if any(part.startswith("[") and part.endswith("]") for part in route_parts):
             dynamic_aliases.append(_service_alias(route_parts))
             continue
@@ -0,0 +1,264 @@
+"""Concurrency limits, load shedding and adaptive limit algorithms.
+
+A ``ConcurrencyLimiter`` admits at most ``limit`` requests at a time. A
+bounded number of extra requests wait in a FIFO queue. The rest are shed
+straight away with ``503 Service Unavailable`` and a ``retry-after`` header.
+The limit is either fixed or adjusted from observed latency by an
+``AIMDLimit`` or ``GradientLimit``.
+
+Limiters run as the outermost middleware of a route's chain. The app-wide
+limiter runs before any per-route one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Protocol
+
+from .responses import FrozenResponse, Response
+from .types import CallNext
+
+
+class LimitAlgorithm(Protocol):
+    """Adjusts a concurrency limit from the outcome of each request."""
+
+    @property
+    def limit(self) -> int:
+        """The current limit."""
+        ...
+
+    def update(self, latency: float, in_flight: int, dropped: bool) -> None:
+        """Record a finished request; ``dropped`` marks timeouts, errors and overload responses."""
+        ...
+
+
+class AIMDLimit:
+    """Additive-increase, multiplicative-decrease limit.
+
+    The limit grows by one after a success while at least half of it is in
+    use. It is multiplied by ``backoff`` after a dropped request, or after a
+    request slower than ``latency_threshold`` seconds when a threshold is set.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        backoff: float = 0.9,
+        latency_threshold: float | None = None,
+    ) -> None:
+        """Start at ``initial`` and stay within ``[min_limit, max_limit]``."""
+        self._limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+
+    @property
+    def limit(self) -> int:
+        """The current limit."""
+        return self._limit
+
+    def update(self, latency: float, in_flight: int, dropped: bool) -> None:
+        """Back off on drops and slow requests, otherwise probe upwards."""
+        if dropped or (self.latency_threshold is not None and latency > self.latency_threshold):
+            self._limit = max(self.min_limit, int(self._limit * self.backoff))
+        elif in_flight * 2 >= self._limit:
+            self._limit = min(self.max_limit, self._limit + 1)
+
+
+class GradientLimit:
+    """Latency-gradient limit in the style of Netflix's concurrency-limits.
+
+    It tracks the lowest latency seen, the "no-load" latency. Each update
+    scales the limit by ``tolerance * min_latency / latency``, clamped to
+    [0.5, 1]. It then adds a headroom of ``sqrt(limit)`` and smooths the
+    result. The lowest latency is re-learned every ``probe_interval`` updates
+    so the limit can follow a downstream that got permanently slower.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        probe_interval: int = 1000,
+    ) -> None:
+        """Start at ``initial`` and stay within ``[min_limit, max_limit]``."""
+        self._estimate = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.probe_interval = probe_interval
+        self.min_latency = math.inf
+        self._updates = 0
+
+    @property
+    def limit(self) -> int:
+        """The current limit."""
+        return int(self._estimate)
+
+    def update(self, latency: float, in_flight: int, dropped: bool) -> None:
+        """Move the limit towards what the latency gradient allows."""
+        self._updates += 1
+        if self._updates % self.probe_interval == 0:
+            self.min_latency = math.inf
+        if latency > 0:
+            self.min_latency = min(self.min_latency, latency)
+        if dropped:
+            gradient = 0.5
+        elif latency <= 0:
+            gradient = 1.0
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.min_latency / latency))
+        target = self._estimate * gradient + math.sqrt(self._estimate)
+        estimate = (1 - self.smoothing) * self._estimate + self.smoothing * target
+        self._estimate = max(float(self.min_limit), min(float(self.max_limit), estimate))
+
+
+class ConcurrencyLimiter:
+    """Admit at most ``limit`` requests at once, queue up to ``queue`` more, shed the rest.
+
+    ``limit`` is a number or a ``LimitAlgorithm``. ``queue`` defaults to the
+    initial limit; 0 sheds as soon as every slot is busy. A queued request
+    that waits longer than ``queue_timeout`` seconds is shed too. Shed
+    requests get a 503 with ``retry-after: <retry_after>``. Responses with a
+    5xx status, and exceptions, count as dropped for adaptive algorithms.
+    """
+
+    def __init__(
+        self,
+        limit: int | LimitAlgorithm = 100,
+        queue: int | None = None,
+        queue_timeout: float | None = None,
+        retry_after: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create an idle limiter."""
+        self.algorithm: LimitAlgorithm | None = None if isinstance(limit, int) else limit
+        self._fixed = limit if isinstance(limit, int) else 0
+        if self.algorithm is None and self._fixed < 1:
+            raise ValueError("Concurrency limit must be at least 1")
+        self.max_queue = self.limit if queue is None else queue
+        self.queue_timeout = queue_timeout
+        self.response = FrozenResponse(
+            b"Service Unavailable",
+            503,
+            [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", b"19"),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        )
+        self._clock = clock
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.queue_timeouts = 0
+
+    @classmethod
+    def from_value(cls, value: Any) -> "ConcurrencyLimiter | None":
+        """Build a limiter from a ``concurrency`` declaration.
+
+        Accepts a number (the limit), a mapping of constructor arguments, a
+        limit algorithm, or an existing limiter.
+        """
+        if value is None or value is False:
+            return None
+        if isinstance(value, ConcurrencyLimiter):
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return cls(limit=value)
+        if isinstance(value, dict):
+            return cls(**value)
+        if hasattr(value, "update") and hasattr(value, "limit"):
+            return cls(limit=value)
+        raise TypeError(f"Unsupported concurrency limit: {value!r}")
+
+    @property
+    def limit(self) -> int:
+        """The current limit."""
+        return self.algorithm.limit if self.algorithm is not None else self._fixed
+
+    def stats(self) -> dict[str, int]:
+        """Return the limit, requests running and queued, and admission counters."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "queue_timeouts": self.queue_timeouts,
+        }
+
+    async def __call__(self, request: Any, call_next: CallNext) -> Response:
+        """Run the rest of the chain inside a slot, or return the 503 response."""
+        if not await self.acquire():
+            return self.response
+        started = self._clock()
+        dropped = True
+        try:
+            response = await call_next(request)
+            dropped = response.status >= 500
+            return response
+        finally:
+            self.release(self._clock() - started, dropped)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room; False means the request is shed."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._abandon(waiter):
+                self.queue_timeouts += 1
+                self.shed += 1
+                return False
+        except BaseException:
+            if not self._abandon(waiter):
+                self.in_flight -= 1
+                self._wake()
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self, latency: float = 0.0, dropped: bool = False) -> None:
+        """Give back a slot and let queued requests in up to the current limit."""
+        self.in_flight -= 1
+        if self.algorithm is not None:
+            self.algorithm.update(latency, self.in_flight, dropped)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> bool:
+        """Stop waiting; returns False when the slot was handed over anyway and is kept."""
+        if waiter.done() and not waiter.cancelled():
+            return False
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        return True
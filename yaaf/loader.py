@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.machinery
 import importlib.util
-import os
+import inspect
 import re
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from types import ModuleType
-from typing import Any
+from typing import Any, Callable, TypeVar
 
-from .di import DependencyResolver, ServiceRegistry
-from .types import Handler
+from .cache import CachePolicy
+from .di import LIFETIMES, SINGLETON, DependencyResolver, ScopedProvider, ServiceRegistry
+from .executors import EXECUTORS, THREAD, handler_executor, reads_body_first
+from .limits import ConcurrencyLimiter
+from .manifest import Manifest, load_manifest, scan_tree, write_manifest
+from .metrics import route_label
+from .middleware import middleware_from_module
+from .ratelimit import RateLimiter
+from .types import CallNext, Handler, Middleware
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 @dataclass
@@ -26,10 +40,30 @@ class RouteTarget:
     service: Any | None
     static_count: int
     segment_count: int
+    server_module: ModuleType | None = None
+    cache: CachePolicy | None = None
+    middleware: tuple[Middleware, ...] = ()
+    etag: bool | Handler | None = None
+    executors: dict[str, str] = field(default_factory=dict)
+    body_methods: frozenset[str] = frozenset()
+    limiter: ConcurrencyLimiter | None = None
+    rate_limiter: RateLimiter | None = None
+    timeout: float | None = None
+    pipeline: CallNext | None = field(default=None, compare=False, repr=False)
+
+
+class _FreshSourceLoader(importlib.machinery.SourceFileLoader):
+    """Compile from source, ignoring ``.pyc`` files whose one-second mtimes can miss quick edits."""
+
+    def get_code(self, fullname: str) -> Any:
+        return self.source_to_code(self.get_data(self.path), self.path)
 
 
-def _load_module(path: Path, name_prefix: str, consumers_dir: str) -> ModuleType:
-    """Load a Python module from an explicit file path."""
+def _load_module(path: Path, name_prefix: str, consumers_dir: str, fresh: bool = False) -> ModuleType:
+    """Load a Python module from an explicit file path.
+
+    ``fresh`` bypasses the bytecode cache, which reloads use to pick up edits.
+    """
     # Convert the file path to a module path relative to the consumers directory
     # This preserves the original module path for type annotation compatibility
     parts = path.parts
@@ -58,7 +92,8 @@ def _load_module(path: Path, name_prefix: str, consumers_dir: str) -> ModuleType
             # Fallback to hashed name if consumers directory not found or path doesn't exist
             module_name = f"yaaf_{name_prefix}_{abs(hash(path))}"
     
-    spec = importlib.util.spec_from_file_location(module_name, path)
+    loader = _FreshSourceLoader(module_name, str(path)) if fresh else None
+    spec = importlib.util.spec_from_file_location(module_name, path, loader=loader)
     if spec is None or spec.loader is None:
         raise ImportError(f"Could not load module from {path}")
     module = importlib.util.module_from_spec(spec)
@@ -66,8 +101,23 @@ def _load_module(path: Path, name_prefix: str, consumers_dir: str) -> ModuleType
     return module
 
 
+def _service_factory(module: ModuleType) -> Any | None:
+    """Return the callable ``_collect_services`` would call for a module, if any."""
+    instance = getattr(module, "service", None)
+    if instance is not None:
+        return instance if callable(instance) else None
+    if callable(getattr(module, "get_service", None)):
+        return module.get_service
+    if callable(getattr(module, "Service", None)):
+        return module.Service
+    return None
+
+
 def _collect_services(module: ModuleType, resolver: DependencyResolver) -> Any | None:
-    """Create a service from a module, if it exposes one."""
+    """Create a service from a module, if it exposes one.
+
+    Async factories return an awaitable that ``start_services`` awaits.
+    """
     if hasattr(module, "service"):
         instance = getattr(module, "service")
         if instance is not None:
@@ -83,107 +133,635 @@ def _collect_services(module: ModuleType, resolver: DependencyResolver) -> Any |
     return None
 
 
-def discover_routes(consumers_dir: str) -> tuple[list[RouteTarget], ServiceRegistry]:
-    """Discover route handlers and services rooted under a consumers directory."""
+def _timed_load(
+    times: dict[Path, float], path: Path, name_prefix: str, consumers_dir: str, fresh: bool = False
+) -> ModuleType:
+    """Load a module with ``_load_module`` and record how long the import took."""
+    started = time.perf_counter()
+    module = _load_module(path, name_prefix, consumers_dir, fresh)
+    times[path] = time.perf_counter() - started
+    return module
+
+
+def _timed_build(times: dict[Path, float] | None, path: Path, module: ModuleType, resolver: DependencyResolver) -> Any:
+    """Build a service with ``_build_service``, recording the time under its directory."""
+    if times is None:
+        return _build_service(module, resolver)
+    started = time.perf_counter()
+    instance = _build_service(module, resolver)
+    times[path] = time.perf_counter() - started
+    return instance
+
+
+def _service_lifetime(module: ModuleType) -> str:
+    """Return the ``lifetime`` a service module declares, defaulting to singleton."""
+    lifetime = getattr(module, "lifetime", SINGLETON)
+    if lifetime not in LIFETIMES:
+        raise ValueError(f"Unknown service lifetime {lifetime!r} in {module.__file__}")
+    return lifetime
+
+
+def _build_service(module: ModuleType, resolver: DependencyResolver) -> Any | None:
+    """Create a singleton service, or a ``ScopedProvider`` for other lifetimes."""
+    lifetime = _service_lifetime(module)
+    if lifetime == SINGLETON:
+        return _collect_services(module, resolver)
+    factory = _service_factory(module)
+    if factory is None:
+        raise RuntimeError(f"{module.__file__} declares lifetime {lifetime!r} but has no service factory")
+    return ScopedProvider(plan=resolver.plan(factory), lifetime=lifetime, service_type=_service_type(module))
+
+
+def scan_routes(consumers_dir: str, manifest_path: str | None = None) -> Manifest:
+    """Scan the consumers tree, reusing and refreshing a manifest file when given.
+
+    The manifest is rewritten only when the tree changed since it was saved.
+    Overlap warnings are recomputed only for changed trees.
+    """
+    previous = load_manifest(manifest_path, consumers_dir) if manifest_path else None
+    manifest = scan_tree(consumers_dir, previous)
+    if manifest.warnings is None:
+        manifest.warnings = _overlap_warnings(manifest)
+    if manifest_path and (previous is None or manifest.changed):
+        write_manifest(manifest, manifest_path)
+    return manifest
+
+
+def _overlap_warnings(manifest: Manifest) -> list[str]:
+    """Describe dynamic routes whose pattern also matches a static route."""
+    ordered = sorted(
+        manifest.routes,
+        key=lambda route: (len(route.route_parts) - len(route.param_names), len(route.route_parts)),
+        reverse=True,
+    )
+    static_routes = [route for route in ordered if not route.param_names]
+    dynamic_routes = [route for route in ordered if route.param_names]
+    warnings: list[str] = []
+    for dyn in dynamic_routes:
+        pattern = re.compile(build_pattern(dyn.route_parts, prefix="api")[0])
+        for stat in static_routes:
+            if len(dyn.route_parts) != len(stat.route_parts):
+                continue
+            candidate = "/api/" + "/".join(stat.route_parts)
+            if pattern.match(candidate):
+                warnings.append(
+                    f"Warning: dynamic route /api/{'/'.join(dyn.route_parts)} matches "
+                    f"static route /api/{'/'.join(stat.route_parts)}"
+                )
+                break
+    return warnings
+
+
+@dataclass
+class ServiceEntry:
+    """A loaded ``_service.py`` module and the service built from it."""
+    module: ModuleType
+    aliases: list[str]
+    instance: Any | None = None
+    dependencies: set[Path] = field(default_factory=set)
+    started: bool = False
+
+
+@dataclass
+class Discovery:
+    """Everything loaded from a consumers directory, kept for incremental reloads."""
+    consumers_dir: str
+    routes: list[RouteTarget]
+    registry: ServiceRegistry
+    services: dict[Path, ServiceEntry] = field(default_factory=dict)
+    server_modules: dict[Path, ModuleType] = field(default_factory=dict)
+    middleware_modules: dict[Path, ModuleType] = field(default_factory=dict)
+    mtimes: dict[Path, dict[str, int]] = field(default_factory=dict)
+    manifest: Manifest | None = None
+    stale: list[Any] = field(default_factory=list)
+    max_workers: int | None = None
+    import_times: dict[Path, float] = field(default_factory=dict)
+    build_times: dict[Path, float] = field(default_factory=dict)
+
+
+def discover_routes(
+    consumers_dir: str,
+    manifest_path: str | None = None,
+    max_workers: int | None = None,
+) -> tuple[list[RouteTarget], ServiceRegistry]:
+    """Discover route handlers and services rooted under a consumers directory.
+
+    With ``manifest_path`` the directory scan is cached on disk (see ``yaaf.manifest``).
+    ``max_workers`` bounds the threads used to import modules and build services.
+    """
+    discovery = discover(consumers_dir, manifest_path, max_workers)
+    return discovery.routes, discovery.registry
+
+
+def discover(
+    consumers_dir: str,
+    manifest_path: str | None = None,
+    max_workers: int | None = None,
+) -> Discovery:
+    """Load every route and service under ``consumers_dir``.
+
+    Modules are imported in a thread pool of ``max_workers`` threads (1 loads
+    serially). Services are then built level by level from their dependency
+    graph, with the services of one level built in parallel.
+    """
     base = Path(consumers_dir)
     if not base.exists():
-        return [], ServiceRegistry(by_type={}, by_alias={})
+        return Discovery(consumers_dir=consumers_dir, routes=[], registry=ServiceRegistry(by_type={}, by_alias={}))
 
     base_parent = str(base.parent)
     if base_parent not in sys.path:
         sys.path.insert(0, base_parent)
 
-    targets: list[tuple[Path, list[str], list[str], str, int, int]] = []
-    service_modules: dict[Path, ModuleType] = {}
-    server_modules: dict[Path, ModuleType] = {}
-    service_aliases: dict[Path, list[str]] = {}
+    manifest = scan_routes(consumers_dir, manifest_path)
+    discovery = Discovery(
+        consumers_dir=consumers_dir,
+        routes=[],
+        registry=ServiceRegistry(by_type={}, by_alias={}),
+        manifest=manifest,
+        max_workers=max_workers,
+    )
+    jobs: list[tuple[Path, str]] = []
+    for record in manifest.routes:
+        root_path = _route_path(base, record.directory)
+        discovery.mtimes[root_path] = _file_mtimes(root_path)
+        if "_service.py" in record.files:
+            jobs.append((root_path, "service"))
+        jobs.append((root_path, "server"))
+    for directory in manifest.directories_with("_middleware.py"):
+        root_path = _route_path(base, directory)
+        discovery.mtimes.setdefault(root_path, _file_mtimes(root_path))
+        jobs.append((root_path, "middleware"))
 
-    for root, _dirs, files in os.walk(base):
-        if "_server.py" not in files:
-            continue
+    modules = _parallel_map(
+        lambda job: _timed_load(discovery.import_times, job[0] / f"_{job[1]}.py", job[1], consumers_dir),
+        jobs,
+        max_workers,
+    )
+    aliases = {_route_path(base, record.directory): _route_aliases(record.route_parts) for record in manifest.routes}
+    for (root_path, kind), module in zip(jobs, modules):
+        if kind == "service":
+            discovery.services[root_path] = ServiceEntry(module=module, aliases=aliases[root_path])
+        elif kind == "middleware":
+            discovery.middleware_modules[root_path] = module
+        else:
+            discovery.server_modules[root_path] = module
+
+    _construct_services(
+        discovery.services, list(discovery.services), discovery.registry, max_workers, discovery.build_times
+    )
+    discovery.routes = _build_routes(discovery, set(discovery.server_modules), {})
+    for warning in manifest.warnings or []:
+        print(warning)
+    return discovery
+
+
+def refresh_discovery(discovery: Discovery) -> Discovery | None:
+    """Reload only the route and service modules that changed on disk.
+
+    Changed ``_service.py`` modules are re-imported, and their services are
+    rebuilt along with every service that depends on them. Changed or new
+    ``_server.py`` modules are re-imported. Routes touched by either change
+    are rebuilt, and all other routes and services are reused. Returns a new
+    ``Discovery``, leaving the old one untouched, or None when nothing changed.
+    Instances that were replaced are listed in ``stale``.
+    """
+    consumers_dir = discovery.consumers_dir
+    base = Path(consumers_dir)
+    manifest = scan_tree(consumers_dir, discovery.manifest)
+    if manifest.warnings is None:
+        manifest.warnings = _overlap_warnings(manifest)
+    records = {_route_path(base, record.directory): record for record in manifest.routes}
+    mtimes = {path: _file_mtimes(path) for path in records}
+    middleware_dirs = [_route_path(base, directory) for directory in manifest.directories_with("_middleware.py")]
+    for path in middleware_dirs:
+        mtimes.setdefault(path, _file_mtimes(path))
+    if mtimes == discovery.mtimes:
+        return None
+
+    def changed(path: Path, name: str) -> bool:
+        return mtimes.get(path, {}).get(name) != discovery.mtimes.get(path, {}).get(name)
 
-        root_path = Path(root)
-        parts = root_path.parts
-        if "api" not in parts:
+    server_changed = {path for path in records if changed(path, "_server.py")}
+    service_changed = {path for path in set(records) | set(discovery.services) if changed(path, "_service.py")}
+
+    dependents: dict[Path, set[Path]] = {}
+    for path, entry in discovery.services.items():
+        for dependency in entry.dependencies:
+            dependents.setdefault(dependency, set()).add(path)
+    rebuild = set(service_changed)
+    queue = list(service_changed)
+    while queue:
+        for dependent in dependents.get(queue.pop(), ()):
+            if dependent not in rebuild:
+                rebuild.add(dependent)
+                queue.append(dependent)
+
+    import_times = dict(discovery.import_times)
+    build_times = {path: seconds for path, seconds in discovery.build_times.items() if path not in rebuild}
+    services: dict[Path, ServiceEntry] = {}
+    for path, record in records.items():
+        if "_service.py" not in mtimes[path]:
             continue
-        api_index = parts.index("api")
-        route_parts = list(parts[api_index + 1 :])
-        pattern, param_names, static_count, segment_count = build_pattern(route_parts, prefix="api")
-        targets.append((root_path, route_parts, param_names, pattern, static_count, segment_count))
+        aliases = _route_aliases(record.route_parts)
+        if path in service_changed:
+            module = _timed_load(import_times, path / "_service.py", "service", consumers_dir, fresh=True)
+            services[path] = ServiceEntry(module=module, aliases=aliases)
+        elif path in rebuild:
+            services[path] = ServiceEntry(module=discovery.services[path].module, aliases=aliases)
+        else:
+            services[path] = discovery.services[path]
 
-        route_key = "_".join(route_parts)
-        aliases = [route_key, _service_alias(route_parts)]
-        if route_parts:
-            aliases.append(route_parts[-1])
-        service_aliases[root_path] = [alias for alias in aliases if alias]
+    server_modules: dict[Path, ModuleType] = {}
+    for path in records:
+        if path in server_changed:
+            server_modules[path] = _timed_load(import_times, path / "_server.py", "server", consumers_dir, fresh=True)
+        else:
+            server_modules[path] = discovery.server_modules[path]
 
-        if "_service.py" in files:
-            service_modules[root_path] = _load_module(root_path / "_service.py", "service", consumers_dir)
-        server_modules[root_path] = _load_module(root_path / "_server.py", "server", consumers_dir)
+    middleware_modules: dict[Path, ModuleType] = {}
+    for path in middleware_dirs:
+        if "_middleware.py" not in mtimes[path]:
+            continue
+        if changed(path, "_middleware.py"):
+            middleware_modules[path] = _timed_load(
+                import_times, path / "_middleware.py", "middleware", consumers_dir, fresh=True
+            )
+        else:
+            middleware_modules[path] = discovery.middleware_modules[path]
 
+    live = set(records) | set(middleware_modules)
+    import_times = {path: seconds for path, seconds in import_times.items() if path.parent in live}
+    build_times = {path: seconds for path, seconds in build_times.items() if path in services}
     registry = ServiceRegistry(by_type={}, by_alias={})
+    pending = [path for path in services if path in rebuild]
+    for path, entry in services.items():
+        if path not in rebuild and entry.instance is not None:
+            registry.register(entry.instance, aliases=entry.aliases)
+    _construct_services(services, pending, registry, discovery.max_workers, build_times)
+
+    refreshed = Discovery(
+        consumers_dir=consumers_dir,
+        routes=[],
+        registry=registry,
+        services=services,
+        server_modules=server_modules,
+        middleware_modules=middleware_modules,
+        mtimes=mtimes,
+        manifest=manifest,
+        max_workers=discovery.max_workers,
+        import_times=import_times,
+        build_times=build_times,
+        stale=[
+            entry.instance
+            for path, entry in discovery.services.items()
+            if path in rebuild or path not in services
+        ],
+    )
+    previous = {id(route.server_module): route for route in discovery.routes}
+    refreshed.routes = _build_routes(refreshed, server_changed | rebuild, previous)
+    return refreshed
+
+
+def _construct_services(
+    services: dict[Path, ServiceEntry],
+    pending: list[Path],
+    registry: ServiceRegistry,
+    max_workers: int | None = None,
+    build_times: dict[Path, float] | None = None,
+) -> None:
+    """Build and register services for ``pending`` paths in dependency order.
+
+    Services that are not pending must already be built and registered. The
+    graph comes from factory signatures, so each constructor runs exactly once,
+    and constructor errors propagate instead of being retried. Services with
+    async factories, and the services that depend on them, are left unbuilt
+    for ``start_services``. Request-scoped and transient services are
+    registered as ``ScopedProvider`` objects instead of instances.
+    Construction times are recorded in ``build_times`` when given.
+    """
+    graph = _service_graph(services, pending)
     resolver = DependencyResolver(registry)
+    deferred: set[Path] = set()
+    for level in _topological_levels(graph):
+        for path in level:
+            module = services[path].module
+            if graph[path] & deferred or (
+                _service_lifetime(module) == SINGLETON and inspect.iscoroutinefunction(_service_factory(module))
+            ):
+                deferred.add(path)
+        level = [path for path in level if path not in deferred]
+        instances = _parallel_map(
+            lambda path: _timed_build(build_times, path, services[path].module, resolver), level, max_workers
+        )
+        for path, instance in zip(level, instances):
+            if instance is None:
+                raise RuntimeError(f"{path / '_service.py'} does not expose a service")
+            services[path].instance = instance
+            registry.register(instance, aliases=services[path].aliases)
 
-    service_instances: dict[Path, Any] = {}
-    unresolved = list(service_modules.items())
-    while unresolved:
-        progress = False
-        remaining: list[tuple[Path, ModuleType]] = []
-        for path, module in unresolved:
-            try:
-                instance = _collect_services(module, resolver)
-            except TypeError:
-                instance = None
+
+async def start_services(discovery: Discovery) -> bool:
+    """Build deferred services and open every service that is not started yet.
+
+    Each service starts as soon as the services it depends on have started, so
+    independent slow startups overlap. Starting awaits async factories and
+    ``__aenter__``. If any service fails, the ones already started are closed
+    and the error is raised. Returns whether new instances were registered.
+    """
+    services = discovery.services
+    pending = [path for path, entry in services.items() if not entry.started]
+    if not pending:
+        return False
+    resolver = DependencyResolver(discovery.registry)
+    tasks: dict[Path, asyncio.Task[bool]] = {}
+
+    async def start(path: Path) -> bool:
+        entry = services[path]
+        dependencies = [tasks[dependency] for dependency in entry.dependencies if dependency in tasks]
+        if dependencies:
+            await asyncio.gather(*dependencies)
+        built = False
+        if entry.instance is None:
+            started = time.perf_counter()
+            instance = _build_service(entry.module, resolver)
+            if inspect.isawaitable(instance):
+                instance = await instance
+            discovery.build_times[path] = time.perf_counter() - started
             if instance is None:
-                remaining.append((path, module))
-                continue
-            service_instances[path] = instance
-            registry.register(instance, aliases=service_aliases.get(path, []))
-            progress = True
-        if not progress:
-            missing = [str(path) for path, _ in remaining]
-            raise RuntimeError(f"Unresolved service dependencies in: {', '.join(missing)}")
-        unresolved = remaining
+                raise RuntimeError(f"{path / '_service.py'} does not expose a service")
+            entry.instance = instance
+            discovery.registry.register(instance, aliases=entry.aliases)
+            built = True
+        enter = getattr(entry.instance, "__aenter__", None)
+        if enter is not None:
+            await enter()
+        entry.started = True
+        return built
+
+    for path in pending:
+        tasks[path] = asyncio.ensure_future(start(path))
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await stop_services(discovery, [path for path in pending if services[path].started])
+        raise errors[0]
+    return any(results)
+
+
+async def stop_services(discovery: Discovery, paths: list[Path] | None = None) -> None:
+    """Close started services in reverse dependency order.
+
+    Services are closed with ``__aexit__`` when they are async context managers,
+    otherwise with ``aclose`` when they define it. Services that do not depend
+    on each other close concurrently. Every service is closed even if one fails;
+    the first error is raised afterwards.
+    """
+    services = discovery.services
+    selected = {path for path in (services if paths is None else paths) if services[path].started}
+    graph = {path: services[path].dependencies & selected for path in selected}
+    errors: list[BaseException] = []
+    for level in reversed(_topological_levels(graph)):
+        results = await asyncio.gather(*(_close_service(services[path]) for path in level), return_exceptions=True)
+        errors.extend(result for result in results if isinstance(result, BaseException))
+    if errors:
+        raise errors[0]
+
+
+async def _close_service(entry: ServiceEntry) -> None:
+    entry.started = False
+    instance = entry.instance
+    if hasattr(instance, "__aexit__"):
+        await instance.__aexit__(None, None, None)
+    elif callable(getattr(instance, "aclose", None)):
+        await instance.aclose()
+
+
+def _service_graph(services: dict[Path, ServiceEntry], pending: list[Path]) -> dict[Path, set[Path]]:
+    """Map each pending service to the pending services its factory injects.
+
+    Providers are matched the way ``ServiceRegistry.resolve`` matches instances:
+    alias strings, then exact type, subclass, and finally the type's name. An
+    annotation no known type matches, on a parameter without a default, is
+    ordered after every service whose type cannot be known before it is
+    built. All dependencies (pending or not) are recorded on the entries for
+    reloads. Request-scoped and transient factories may also take request
+    context values such as ``request``.
+    """
+    by_alias: dict[str, Path] = {}
+    by_type: dict[type, Path] = {}
+    untyped: set[Path] = set()
+    for path, entry in services.items():
+        if isinstance(entry.instance, ScopedProvider):
+            service_type = entry.instance.service_type
+        elif entry.instance is not None:
+            service_type = type(entry.instance)
+        else:
+            service_type = _service_type(entry.module)
+        if service_type is not None:
+            by_type[service_type] = path
+            by_alias[service_type.__name__] = path
+        else:
+            untyped.add(path)
+        for alias in entry.aliases:
+            by_alias[alias] = path
+
+    def provider(annotation: Any) -> Path | None:
+        if annotation is None:
+            return None
+        if isinstance(annotation, str):
+            return by_alias.get(annotation)
+        if annotation in by_type:
+            return by_type[annotation]
+        for service_type, path in by_type.items():
+            try:
+                if issubclass(service_type, annotation):
+                    return path
+            except (TypeError, AttributeError):
+                pass
+        return by_alias.get(getattr(annotation, "__name__", ""))
+
+    pending_set = set(pending)
+    graph: dict[Path, set[Path]] = {}
+    for path in pending:
+        factory = _service_factory(services[path].module)
+        scoped = _service_lifetime(services[path].module) != SINGLETON
+        dependencies: set[Path] = set()
+        if factory is not None:
+            for name, param in inspect.signature(factory).parameters.items():
+                annotation = None if param.annotation is inspect.Parameter.empty else param.annotation
+                found = provider(annotation)
+                if found is not None:
+                    dependencies.add(found)
+                elif param.default is not inspect.Parameter.empty:
+                    continue
+                elif annotation is not None and untyped - {path}:
+                    dependencies.update(untyped - {path})
+                elif not scoped:
+                    raise RuntimeError(f"Cannot resolve dependency '{name}' for {path / '_service.py'}")
+        services[path].dependencies = dependencies
+        graph[path] = dependencies & pending_set
+    return graph
+
+
+def _topological_levels(graph: dict[Path, set[Path]]) -> list[list[Path]]:
+    """Group nodes into levels whose dependencies all sit in earlier levels."""
+    remaining = {path: set(dependencies) for path, dependencies in graph.items()}
+    levels: list[list[Path]] = []
+    while remaining:
+        level = [path for path, dependencies in remaining.items() if not dependencies]
+        if not level:
+            cycle = _find_cycle(remaining)
+            raise RuntimeError("Service dependency cycle: " + " -> ".join(str(path) for path in cycle))
+        levels.append(level)
+        for path in level:
+            del remaining[path]
+        for dependencies in remaining.values():
+            dependencies.difference_update(level)
+    return levels
+
+
+def _find_cycle(graph: dict[Path, set[Path]]) -> list[Path]:
+    """Follow dependency edges from any node until one repeats."""
+    path = next(iter(graph))
+    seen: list[Path] = []
+    while path not in seen:
+        seen.append(path)
+        path = min(graph[path], key=str)
+    return seen[seen.index(path) :] + [path]
 
+
+def _service_type(module: ModuleType) -> type | None:
+    """Return the type a service module will produce, when it is known before building."""
+    instance = getattr(module, "service", None)
+    if instance is not None:
+        if isinstance(instance, type):
+            return instance
+        if not callable(instance):
+            return type(instance)
+        return _return_type(instance)
+    get_service = getattr(module, "get_service", None)
+    if callable(get_service):
+        return _return_type(get_service)
+    service_cls = getattr(module, "Service", None)
+    return service_cls if isinstance(service_cls, type) else None
+
+
+def _return_type(factory: Callable[..., Any]) -> type | None:
+    returned = inspect.signature(factory).return_annotation
+    if returned is inspect.Signature.empty or not isinstance(returned, type):
+        return None
+    return returned
+
+
+def _parallel_map(func: Callable[[T], R], items: list[T], max_workers: int | None) -> list[R]:
+    """Map ``func`` over ``items`` in a thread pool, preserving order."""
+    if max_workers == 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(func, items))
+
+
+def _build_routes(
+    discovery: Discovery,
+    rebuild: set[Path],
+    previous: dict[int, RouteTarget],
+) -> list[RouteTarget]:
+    """Create route targets in precedence order, reusing unchanged ones from ``previous``."""
+    base = Path(discovery.consumers_dir)
     routes: list[RouteTarget] = []
-    for root_path, route_parts, param_names, pattern, static_count, segment_count in targets:
-        server_module = server_modules[root_path]
+    for record in discovery.manifest.routes if discovery.manifest else []:
+        root_path = _route_path(base, record.directory)
+        server_module = discovery.server_modules[root_path]
+        middleware = _route_middleware(discovery, record.directory)
+        old = previous.get(id(server_module))
+        if old is not None and root_path not in rebuild:
+            routes.append(replace(old, services=discovery.registry, middleware=middleware, pipeline=None))
+            continue
+
+        pattern, param_names, static_count, segment_count = build_pattern(record.route_parts, prefix="api")
         handlers: dict[str, Handler] = {}
         for method in ("GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"):
             func = getattr(server_module, method.lower(), None)
             if callable(func):
                 handlers[method] = func
-        compiled = re.compile(pattern)
-        service_instance = service_instances.get(root_path)
+        default_executor = getattr(server_module, "executor", THREAD)
+        if default_executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {default_executor!r} in {root_path / '_server.py'}")
+        entry = discovery.services.get(root_path)
         routes.append(
             RouteTarget(
-                pattern=compiled,
-                route_parts=route_parts,
+                pattern=re.compile(pattern),
+                route_parts=list(record.route_parts),
                 param_names=param_names,
                 handlers=handlers,
-        services=registry,
-        service=service_instance,
-        static_count=static_count,
-        segment_count=segment_count,
-    )
+                services=discovery.registry,
+                service=entry.instance if entry is not None else None,
+                static_count=static_count,
+                segment_count=segment_count,
+                server_module=server_module,
+                cache=CachePolicy.from_value(getattr(server_module, "cache", None)),
+                middleware=middleware,
+                etag=getattr(server_module, "etag", None),
+                executors={method: handler_executor(func, default_executor) for method, func in handlers.items()},
+                body_methods=frozenset(method for method, func in handlers.items() if reads_body_first(func)),
+                limiter=ConcurrencyLimiter.from_value(getattr(server_module, "concurrency", None)),
+                rate_limiter=RateLimiter.from_value(
+                    getattr(server_module, "rate_limit", None),
+                    scope=route_label(record.route_parts),
+                ),
+                timeout=_route_timeout(server_module),
+            )
         )
 
     routes.sort(key=lambda route: (route.static_count, route.segment_count), reverse=True)
+    return routes
 
-    static_routes = [route for route in routes if not route.param_names]
-    dynamic_routes = [route for route in routes if route.param_names]
-    for dyn in dynamic_routes:
-        for stat in static_routes:
-            if dyn.segment_count != stat.segment_count:
-                continue
-            candidate = "/api/" + "/".join(stat.route_parts)
-            if dyn.pattern.match(candidate):
-                print(
-                    f"Warning: dynamic route /api/{'/'.join(dyn.route_parts)} matches "
-                    f"static route /api/{'/'.join(stat.route_parts)}"
-                )
-                break
-    return routes, registry
+
+def _route_middleware(discovery: Discovery, directory: str) -> tuple[Middleware, ...]:
+    """Collect ``_middleware.py`` middleware from the consumers root down to ``directory``."""
+    if not discovery.middleware_modules:
+        return ()
+    path = Path(discovery.consumers_dir)
+    ancestors = [path]
+    for part in Path(directory).parts if directory != "." else ():
+        path = path / part
+        ancestors.append(path)
+    middleware: list[Middleware] = []
+    for ancestor in ancestors:
+        module = discovery.middleware_modules.get(ancestor)
+        if module is not None:
+            middleware.extend(middleware_from_module(module))
+    return tuple(middleware)
+
+
+def _route_timeout(server_module: ModuleType) -> float | None:
+    timeout = getattr(server_module, "timeout", None)
+    if timeout is None:
+        return None
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError(f"Handler timeout must be a positive number of seconds, got {timeout!r}")
+    return float(timeout)
+
+
+def _route_path(base: Path, directory: str) -> Path:
+    return base if directory == "." else base / directory
+
+
+def _route_aliases(route_parts: list[str]) -> list[str]:
+    aliases = ["_".join(route_parts), _service_alias(route_parts)]
+    if route_parts:
+        aliases.append(route_parts[-1])
+    return [alias for alias in aliases if alias]
+
+
+def _file_mtimes(root_path: Path) -> dict[str, int]:
+    mtimes: dict[str, int] = {}
+    for name in ("_server.py", "_service.py", "_middleware.py"):
+        try:
+            mtimes[name] = (root_path / name).stat().st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
 
 
 def build_pattern(route_parts: list[str], prefix: str) -> tuple[str, list[str], int, int]:
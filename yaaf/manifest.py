@@ -0,0 +1,167 @@
+"""Persistent discovery manifest for the consumers tree.
+
+The manifest records every directory under the consumers root with its
+mtime, its subdirectories and the ``_*.py`` files it contains, plus the
+route directories found in it. Later scans only list directories whose
+mtime changed; every other directory costs a single ``stat``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class DirectoryRecord:
+    """A scanned directory: mtime, child directories and framework files."""
+    mtime_ns: int
+    dirs: list[str]
+    files: list[str]
+
+
+@dataclass
+class RouteRecord:
+    """A route directory (one containing ``_server.py``) under an ``api`` directory."""
+    directory: str
+    route_parts: list[str]
+    param_names: list[str]
+    files: dict[str, int]
+
+
+@dataclass
+class Manifest:
+    """The scanned state of a consumers tree."""
+    root: str
+    directories: dict[str, DirectoryRecord] = field(default_factory=dict)
+    routes: list[RouteRecord] = field(default_factory=list)
+    warnings: list[str] | None = None
+    changed: bool = True
+
+    def to_json(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return {
+            "version": MANIFEST_VERSION,
+            "root": self.root,
+            "directories": {key: asdict(value) for key, value in self.directories.items()},
+            "routes": [asdict(route) for route in self.routes],
+            "warnings": self.warnings,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Manifest":
+        """Rebuild a manifest from its JSON representation."""
+        return cls(
+            root=data["root"],
+            directories={key: DirectoryRecord(**value) for key, value in data["directories"].items()},
+            routes=[RouteRecord(**route) for route in data["routes"]],
+            warnings=data.get("warnings"),
+            changed=False,
+        )
+
+    def directories_with(self, name: str) -> list[str]:
+        """Return root-relative directories containing a file called ``name``."""
+        return [key for key, record in self.directories.items() if name in record.files]
+
+
+def load_manifest(path: str | os.PathLike[str], consumers_dir: str) -> Manifest | None:
+    """Load a manifest for ``consumers_dir``, or None if missing, stale or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    if data.get("root") != str(Path(consumers_dir).resolve()):
+        return None
+    try:
+        return Manifest.from_json(data)
+    except (KeyError, TypeError):
+        return None
+
+
+def write_manifest(manifest: Manifest, path: str | os.PathLike[str]) -> None:
+    """Atomically write a manifest to ``path``."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    temp.write_text(json.dumps(manifest.to_json()), encoding="utf-8")
+    os.replace(temp, target)
+
+
+def scan_tree(consumers_dir: str, previous: Manifest | None = None) -> Manifest:
+    """Scan ``consumers_dir``, reusing listings from ``previous`` for unchanged directories.
+
+    Directories are visited parent-first with children in sorted order, so
+    route order is deterministic across scans.
+    """
+    base = Path(consumers_dir)
+    manifest = Manifest(root=str(base.resolve()), changed=previous is None)
+    old_dirs = previous.directories if previous is not None else {}
+    old_routes = {route.directory: route for route in previous.routes} if previous is not None else {}
+
+    stack = ["."]
+    while stack:
+        key = stack.pop()
+        directory = base if key == "." else base / key
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            manifest.changed = True
+            continue
+
+        record = old_dirs.get(key)
+        reused = True
+        if record is None or record.mtime_ns != mtime_ns:
+            record = _list_directory(directory, mtime_ns)
+            reused = False
+            manifest.changed = True
+        manifest.directories[key] = record
+
+        if "_server.py" in record.files:
+            route = old_routes.get(key) if reused else None
+            if route is None:
+                route = _route_record(directory, key, record.files)
+            if route is not None:
+                manifest.routes.append(route)
+
+        for name in reversed(record.dirs):
+            stack.append(name if key == "." else f"{key}/{name}")
+
+    if previous is not None and set(old_dirs) != set(manifest.directories):
+        manifest.changed = True
+    if not manifest.changed and previous is not None:
+        manifest.warnings = previous.warnings
+    return manifest
+
+
+def _list_directory(directory: Path, mtime_ns: int) -> DirectoryRecord:
+    dirs: list[str] = []
+    files: list[str] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name != "__pycache__":
+                    dirs.append(entry.name)
+            elif entry.name.startswith("_") and entry.name.endswith(".py"):
+                files.append(entry.name)
+    return DirectoryRecord(mtime_ns=mtime_ns, dirs=sorted(dirs), files=sorted(files))
+
+
+def _route_record(directory: Path, key: str, files: list[str]) -> RouteRecord | None:
+    parts = directory.parts
+    if "api" not in parts:
+        return None
+    route_parts = list(parts[parts.index("api") + 1 :])
+    param_names = [part[1:-1] for part in route_parts if part.startswith("[") and part.endswith("]")]
+    mtimes = {}
+    for name in ("_server.py", "_service.py"):
+        if name in files:
+            mtimes[name] = os.stat(directory / name).st_mtime_ns
+    return RouteRecord(directory=key, route_parts=route_parts, param_names=param_names, files=mtimes)
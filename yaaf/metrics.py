@@ -0,0 +1,310 @@
+"""Request metrics: latency histograms, counters and Prometheus exposition.
+
+Metrics are off unless the app is created with ``metrics=True``. When they
+are off, the request path does not read a clock or touch any counter.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .responses import Response
+
+# Request phases, as indexes into ``PHASES``.
+ROUTE, MIDDLEWARE, BODY, INJECT, HANDLER, SERIALIZE, SEND = range(7)
+PHASES = ("route", "middleware", "body", "inject", "handler", "serialize", "send")
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Methods kept as ``method`` labels for unmatched requests; anything else is "other".
+METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"})
+
+
+class Histogram:
+    """A fixed-memory latency histogram with HDR-style log-linear buckets.
+
+    Values are recorded in whole microseconds. Each power of two is split into
+    ``2 ** (precision - 1)`` buckets, so a reported quantile is within about
+    ``2 ** -(precision - 1)`` of the true value. Values above ``max_seconds``
+    land in the last bucket. Memory does not grow with the number of samples.
+    """
+
+    __slots__ = ("_precision", "_limit", "_counts", "count", "total", "max")
+
+    def __init__(self, precision: int = 5, max_seconds: float = 3600.0) -> None:
+        """Allocate every bucket up front."""
+        self._precision = precision
+        self._limit = max(int(max_seconds * 1_000_000), 1 << precision)
+        self._counts = [0] * (self._index(self._limit) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, micros: int) -> int:
+        shift = max(micros.bit_length() - self._precision, 0)
+        return (shift << (self._precision - 1)) + (micros >> shift)
+
+    def _upper(self, index: int) -> int:
+        if index < 1 << self._precision:
+            return index
+        shift = (index >> (self._precision - 1)) - 1
+        return ((index - (shift << (self._precision - 1)) + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        """Add one observation."""
+        micros = int(seconds * 1_000_000)
+        if micros > self._limit:
+            micros = self._limit
+        elif micros < 0:
+            micros = 0
+        shift = micros.bit_length() - self._precision
+        if shift < 0:
+            shift = 0
+        self._counts[(shift << (self._precision - 1)) + (micros >> shift)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Return the value below which a fraction ``q`` of observations fall, in seconds."""
+        if not self.count:
+            return 0.0
+        target = max(q * self.count, 1)
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= target:
+                return min(self._upper(index) / 1_000_000, self.max)
+        return self.max
+
+    def reset(self) -> None:
+        """Forget every observation."""
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class RequestTimer:
+    """Splits one request's wall time into phases.
+
+    ``mark(phase)`` charges the time since the previous mark to ``phase``.
+    ``add`` charges time measured elsewhere, such as waiting for body chunks,
+    and removes it from whatever phase is marked next.
+    """
+
+    __slots__ = ("clock", "_last", "times")
+
+    def __init__(self, clock: Callable[[], float], started: float) -> None:
+        """Start timing at ``started``."""
+        self.clock = clock
+        self._last = started
+        self.times = [0.0] * len(PHASES)
+
+    def mark(self, phase: int) -> None:
+        """Charge the time since the last mark to ``phase``."""
+        now = self.clock()
+        self.times[phase] += now - self._last
+        self._last = now
+
+    def add(self, phase: int, elapsed: float) -> None:
+        """Charge ``elapsed`` seconds to ``phase`` out of the current interval."""
+        self.times[phase] += elapsed
+        self._last += elapsed
+
+
+@dataclass
+class RouteStats:
+    """Latency, per-phase time, status counts and in-flight requests for one route and method.
+
+    Phase time is kept as a running total per phase; the latency histogram
+    covers the whole request.
+    """
+    route: str
+    method: str
+    latency: Histogram = field(default_factory=Histogram)
+    phase_seconds: list[float] = field(default_factory=lambda: [0.0] * len(PHASES))
+    statuses: dict[int, int] = field(default_factory=dict)
+    in_flight: int = 0
+
+    def observe(self, status: int, elapsed: float, times: list[float] | None = None) -> None:
+        """Record one finished request."""
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.latency.record(elapsed)
+        if times is not None:
+            totals = self.phase_seconds
+            for phase, seconds in enumerate(times):
+                totals[phase] += seconds
+
+
+class Metrics:
+    """Per-route request metrics plus discovery timings.
+
+    ``render()`` returns the Prometheus text exposition format. Requests that
+    match no route are counted under the route label ``<unmatched>``, with
+    non-standard methods folded into ``other`` so clients cannot create new
+    series at will.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Create an empty registry; ``clock`` returns seconds."""
+        self.clock = clock
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.import_times: dict[str, float] = {}
+        self.build_times: dict[str, float] = {}
+        self._by_route: dict[tuple[int, str], tuple[Any, RouteStats]] = {}
+
+    @classmethod
+    def from_value(cls, value: Any) -> "Metrics | None":
+        """Build metrics from an ``App(metrics=...)`` flag or return an existing instance."""
+        if isinstance(value, Metrics):
+            return value
+        return cls() if value else None
+
+    def route(self, route: str, method: str) -> RouteStats:
+        """Return the stats for ``route`` and ``method``, creating them on first use."""
+        stats = self.routes.get((route, method))
+        if stats is None:
+            stats = self.routes[(route, method)] = RouteStats(route, method)
+        return stats
+
+    def for_route(self, route: Any, method: str) -> RouteStats:
+        """Return the stats for a ``RouteTarget``, caching the label lookup per route object."""
+        cached = self._by_route.get((id(route), method))
+        if cached is not None and cached[0] is route:
+            return cached[1]
+        stats = self.route(route_label(route.route_parts), method)
+        self._by_route[(id(route), method)] = (route, stats)
+        return stats
+
+    def record_discovery(
+        self,
+        consumers_dir: str,
+        import_times: dict[Path, float],
+        build_times: dict[Path, float],
+    ) -> None:
+        """Keep per-module import and per-service construction times, keyed by relative path.
+
+        Called whenever the app installs routes, so cached route lookups are dropped too.
+        """
+        self._by_route.clear()
+        base = Path(consumers_dir)
+        self.import_times = {_relative(path, base): seconds for path, seconds in import_times.items()}
+        self.build_times = {_relative(path, base): seconds for path, seconds in build_times.items()}
+
+    def response(self, limits: dict[str, dict[str, int]] | None = None) -> Response:
+        """Return the current metrics as a Prometheus text response."""
+        return Response._with_type(self.render(limits).encode(), CONTENT_TYPE, 200, None)
+
+    def render(self, limits: dict[str, dict[str, int]] | None = None) -> str:
+        """Render every metric in the Prometheus text exposition format.
+
+        ``limits`` are concurrency-limit, rate-limit and timeout counters by route, as
+        returned by ``App.limit_stats()``.
+        """
+        lines: list[str] = []
+        stats = sorted(self.routes.values(), key=lambda item: (item.route, item.method))
+
+        lines += _header("yaaf_requests_total", "counter", "Finished requests by route, method and status.")
+        for item in stats:
+            for status, count in sorted(item.statuses.items()):
+                labels = _labels(route=item.route, method=item.method, status=str(status))
+                lines.append(f"yaaf_requests_total{labels} {count}")
+
+        lines += _header("yaaf_requests_in_flight", "gauge", "Requests currently being handled.")
+        for item in stats:
+            labels = _labels(route=item.route, method=item.method)
+            lines.append(f"yaaf_requests_in_flight{labels} {item.in_flight}")
+
+        lines += _header("yaaf_request_duration_seconds", "summary", "Request latency up to the last byte sent.")
+        for item in stats:
+            lines += _summary("yaaf_request_duration_seconds", item.latency, route=item.route, method=item.method)
+
+        lines += _header("yaaf_request_phase_seconds_total", "counter", "Time spent in each phase of a request.")
+        for item in stats:
+            for phase, seconds in zip(PHASES, item.phase_seconds):
+                labels = _labels(route=item.route, method=item.method, phase=phase)
+                lines.append(f"yaaf_request_phase_seconds_total{labels} {_number(seconds)}")
+
+        lines += _header("yaaf_discovery_import_seconds", "gauge", "Time to import each discovered module.")
+        for module, seconds in sorted(self.import_times.items()):
+            lines.append(f"yaaf_discovery_import_seconds{_labels(module=module)} {_number(seconds)}")
+
+        lines += _header("yaaf_service_construction_seconds", "gauge", "Time to construct each service.")
+        for service, seconds in sorted(self.build_times.items()):
+            lines.append(f"yaaf_service_construction_seconds{_labels(service=service)} {_number(seconds)}")
+
+        if limits:
+            lines += _limit_lines(limits)
+        return "\n".join(lines) + "\n"
+
+
+def route_label(route_parts: Iterable[str]) -> str:
+    """Return the ``route`` label for a route: its URL template, such as ``/api/users/[id]``."""
+    path = "/".join(route_parts)
+    return "/api/" + path if path else "/api"
+
+
+def method_label(method: str) -> str:
+    """Return ``method`` if it is a standard HTTP method, else ``other``."""
+    return method if method in METHODS else "other"
+
+
+# (metric, counter key, type, help) for each value of ``App.limit_stats()``.
+_LIMIT_METRICS = (
+    ("yaaf_requests_shed_total", "shed", "counter", "Requests rejected with 503 by a concurrency limit."),
+    ("yaaf_requests_queue_timeouts_total", "queue_timeouts", "counter", "Requests shed after waiting in the queue."),
+    ("yaaf_requests_rate_limited_total", "rate_limited", "counter", "Requests rejected with 429 by a rate limit."),
+    ("yaaf_requests_timed_out_total", "timed_out", "counter", "Handlers cancelled by a timeout."),
+    ("yaaf_concurrency_limit", "limit", "gauge", "Current concurrency limit."),
+    ("yaaf_requests_queued", "queued", "gauge", "Requests waiting for a concurrency slot."),
+)
+
+
+def _limit_lines(limits: dict[str, dict[str, int]]) -> list[str]:
+    lines: list[str] = []
+    for name, key, kind, help_text in _LIMIT_METRICS:
+        values = [(route, counters[key]) for route, counters in sorted(limits.items()) if key in counters]
+        if values:
+            lines += _header(name, kind, help_text)
+            lines += [f"{name}{_labels(route=route)} {value}" for route, value in values]
+    return lines
+
+
+def _header(name: str, kind: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _summary(name: str, histogram: Histogram, **labels: str) -> list[str]:
+    lines = [
+        f"{name}{_labels(**labels, quantile=str(q))} {_number(histogram.quantile(q))}"
+        for q in QUANTILES
+    ]
+    lines.append(f"{name}_sum{_labels(**labels)} {_number(histogram.total)}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _relative(path: Path, base: Path) -> str:
+    try:
+        return path.relative_to(base).as_posix()
+    except ValueError:
+        return path.as_posix()
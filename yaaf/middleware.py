@@ -0,0 +1,37 @@
+"""Composing request middleware into per-route call chains.
+
+A middleware is ``async def middleware(request, call_next) -> Response``. It may
+return early or call ``await call_next(request)`` to run the rest of the chain.
+"""
+
+from __future__ import annotations
+
+from types import ModuleType
+from typing import Iterable
+
+from .types import CallNext, Middleware
+
+
+def compose(middleware: Iterable[Middleware], endpoint: CallNext) -> CallNext:
+    """Wrap ``endpoint`` so the first middleware runs outermost."""
+    chain = endpoint
+    for layer in reversed(tuple(middleware)):
+        chain = _link(layer, chain)
+    return chain
+
+
+def _link(layer: Middleware, call_next: CallNext) -> CallNext:
+    return lambda request: layer(request, call_next)
+
+
+def middleware_from_module(module: ModuleType) -> tuple[Middleware, ...]:
+    """Return the middleware a ``_middleware.py`` module declares in ``middleware``.
+
+    ``middleware`` may be a single callable or a list of callables, outermost first.
+    """
+    declared = getattr(module, "middleware", None)
+    if callable(declared):
+        return (declared,)
+    if isinstance(declared, (list, tuple)) and all(callable(layer) for layer in declared):
+        return tuple(declared)
+    raise RuntimeError(f"{module.__file__} must define 'middleware' as a callable or a list of callables")
@@ -0,0 +1,291 @@
+"""An asyncio resource pool for services that hold connections or clients."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolTimeout(Exception):
+    """Raised when no resource becomes available within the acquire timeout."""
+
+
+class PoolClosed(RuntimeError):
+    """Raised when acquiring from a pool that is closed or not yet opened."""
+
+
+async def _maybe_await(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+class Pool(Generic[T]):
+    """A bounded pool of reusable resources such as database connections.
+
+    ``create`` makes a new resource and ``close`` disposes of one; either may
+    be sync or async. Without ``close``, a resource's ``aclose`` or ``close``
+    method is used if it has one. ``check`` runs on every checkout and
+    resources it rejects (or that make it raise) are replaced.
+
+    The pool keeps at least ``min_size`` resources open and never more than
+    ``max_size``. Idle resources beyond ``min_size`` are closed after
+    ``max_idle`` seconds. Callers wait at most ``acquire_timeout`` seconds for
+    a resource. When they do wait, freed resources go to them in FIFO order.
+
+    A pool is an async context manager. When a ``_service.py`` exposes one as
+    its service, the app opens it at startup and drains it at shutdown.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[], T | Awaitable[T]],
+        *,
+        close: Callable[[T], Any] | None = None,
+        check: Callable[[T], bool | Awaitable[bool]] | None = None,
+        min_size: int = 0,
+        max_size: int = 10,
+        acquire_timeout: float | None = 30.0,
+        max_idle: float | None = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a closed pool; call ``open`` (or enter it) before acquiring."""
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self._create = create
+        self._close = close
+        self._check = check
+        self._clock = clock
+        self._idle: deque[tuple[T, float]] = deque()
+        self._waiters: deque[asyncio.Future[T | None]] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._open = False
+        self._drained: asyncio.Event | None = None
+        self._reaper: asyncio.Task[None] | None = None
+        self.acquired = 0
+        self.timeouts = 0
+        self.created = 0
+        self.closed = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return counters, current sizes, wait times and utilisation."""
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "waiting": len(self._waiters),
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "created": self.created,
+            "closed": self.closed,
+            "wait_time": self.wait_time,
+            "max_wait": self.max_wait,
+            "utilisation": self._in_use / self.max_size,
+        }
+
+    async def open(self) -> None:
+        """Create ``min_size`` resources concurrently and start idle eviction."""
+        if self._open:
+            return
+        self._open = True
+        results = await asyncio.gather(*(self._new() for _ in range(self.min_size)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        resources = [result for result in results if not isinstance(result, BaseException)]
+        if errors:
+            self._open = False
+            for resource in resources:
+                await self._discard(resource)
+            raise errors[0]
+        now = self._clock()
+        self._idle.extend((resource, now) for resource in resources)
+        if self.max_idle is not None:
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def close(self, timeout: float | None = None) -> None:
+        """Stop handing out resources, wait up to ``timeout`` for checked-out ones, then close all.
+
+        Resources still checked out after the timeout are closed when released.
+        """
+        if not self._open:
+            return
+        self._open = False
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolClosed("Pool is closed"))
+        if self._in_use:
+            self._drained = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout)
+            except TimeoutError:
+                pass
+        while self._idle:
+            resource, _last_used = self._idle.popleft()
+            await self._discard(resource)
+
+    async def __aenter__(self) -> "Pool[T]":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[T]:
+        """Check out a resource for the duration of an ``async with`` block."""
+        resource = await self.get()
+        try:
+            yield resource
+        finally:
+            await self.put(resource)
+
+    async def get(self) -> T:
+        """Check out a resource, waiting for one to be freed if the pool is full.
+
+        Prefer ``acquire``; every ``get`` must be paired with ``put``.
+        """
+        started = self._clock()
+        deadline = None if self.acquire_timeout is None else started + self.acquire_timeout
+        while True:
+            if not self._open:
+                raise PoolClosed("Pool is not open")
+            resource = await self._checkout()
+            if resource is None:
+                resource = await self._wait(deadline)
+                if resource is not None and not await self._healthy(resource):
+                    await self._discard(resource)
+                    resource = None
+            if resource is not None:
+                waited = self._clock() - started
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+                self.acquired += 1
+                self._in_use += 1
+                return resource
+
+    async def put(self, resource: T, discard: bool = False) -> None:
+        """Return a checked-out resource, closing it if ``discard`` or the pool is closed."""
+        self._in_use -= 1
+        if discard or not self._open:
+            await self._discard(resource)
+        else:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(resource)
+                    break
+            else:
+                self._idle.append((resource, self._clock()))
+        if self._drained is not None and self._in_use == 0:
+            self._drained.set()
+
+    async def evict_idle(self) -> int:
+        """Close resources idle for longer than ``max_idle``, keeping ``min_size``; return how many."""
+        if self.max_idle is None:
+            return 0
+        cutoff = self._clock() - self.max_idle
+        evicted = 0
+        while self._idle and self._size > self.min_size and self._idle[0][1] <= cutoff:
+            resource, _last_used = self._idle.popleft()
+            await self._discard(resource)
+            evicted += 1
+        return evicted
+
+    async def _checkout(self) -> T | None:
+        """Take a healthy idle resource or create one if there is room; None means wait."""
+        while self._idle:
+            resource, _last_used = self._idle.pop()
+            if await self._healthy(resource):
+                return resource
+            await self._discard(resource)
+        if self._size < self.max_size:
+            return await self._new()
+        return None
+
+    async def _wait(self, deadline: float | None) -> T | None:
+        """Wait for a released resource (or a freed slot, returned as None)."""
+        waiter: asyncio.Future[T | None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        timeout = None if deadline is None else max(deadline - self._clock(), 0)
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                return waiter.result()
+            waiter.cancel()
+            self.timeouts += 1
+            raise PoolTimeout(f"No resource available within {self.acquire_timeout} seconds") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                resource = waiter.result()
+                if resource is not None:
+                    self._in_use += 1
+                    await self.put(resource)
+                else:
+                    self._wake()
+            waiter.cancel()
+            raise
+
+    async def _new(self) -> T:
+        """Create a resource in a new slot; the slot is taken before the first await."""
+        self._size += 1
+        try:
+            resource = await _maybe_await(self._create())
+        except BaseException:
+            self._size -= 1
+            self._wake()
+            raise
+        self.created += 1
+        return resource
+
+    async def _healthy(self, resource: T) -> bool:
+        if self._check is None:
+            return True
+        try:
+            return bool(await _maybe_await(self._check(resource)))
+        except Exception:
+            return False
+
+    async def _discard(self, resource: T) -> None:
+        self._size -= 1
+        self.closed += 1
+        self._wake()
+        try:
+            if self._close is not None:
+                await _maybe_await(self._close(resource))
+            elif callable(getattr(resource, "aclose", None)):
+                await resource.aclose()
+            elif callable(getattr(resource, "close", None)):
+                await _maybe_await(resource.close())
+        except Exception as exc:
+            print(f"Warning: closing pooled resource {resource!r} failed: {exc!r}")
+
+    def _wake(self) -> None:
+        """Tell the first waiter that a slot is free so it can create a resource."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _reap(self) -> None:
+        interval = max(self.max_idle / 2, 0.01)
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
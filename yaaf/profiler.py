@@ -0,0 +1,223 @@
+"""A low-overhead sampling profiler that attributes stacks to routes.
+
+A background thread wakes ``hz`` times a second and records the Python stack
+of every busy thread. A stack that passes through a route's handler (or its
+ETag version-token function) is filed under that route's URL template.
+Everything else goes under ``<other>``. Threads parked in the event loop's
+selector, or idle pool workers, are skipped, so the counts show where busy
+time goes. Handlers running in the process pool are not sampled.
+
+Output is in the collapsed-stack format read by ``flamegraph.pl``,
+speedscope and similar tools. Each line is the route, then the frames from
+outermost to innermost, then a sample count.
+"""
+
+from __future__ import annotations
+
+import inspect
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Iterable
+
+ENV_VAR = "YAAF_PROFILE"
+DIR_ENV_VAR = "YAAF_PROFILE_DIR"
+TOKEN_ENV_VAR = "YAAF_PROFILE_TOKEN"
+DEFAULT_HZ = 100.0
+OTHER = "<other>"
+TRUNCATED = "<truncated>"
+
+# (file name ending, function) pairs for frames where a thread waits for work.
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    (os.path.join("concurrent", "futures", "thread.py"), "_worker"),
+}
+
+
+class SamplingProfiler:
+    """Sample thread stacks ``hz`` times a second and count them per route.
+
+    At most ``max_stacks`` distinct stacks are kept; later new stacks are
+    counted as ``<truncated>`` under their route. Only the innermost
+    ``max_depth`` frames of each stack are kept. ``stats()`` reports the time
+    spent sampling, which is the profiler's whole overhead.
+    """
+
+    def __init__(self, hz: float = DEFAULT_HZ, max_stacks: int = 10_000, max_depth: int = 64) -> None:
+        """Configure the sampling rate and memory bounds; call ``start`` to begin."""
+        if hz <= 0:
+            raise ValueError("Sampling rate must be positive")
+        self.hz = hz
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self._routes: dict[CodeType, str] = {}
+        self._counts: dict[tuple[str, tuple[CodeType, ...]], int] = {}
+        self._truncated: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._signal: tuple[int, Any] | None = None
+        self.samples = 0
+        self.sample_time = 0.0
+        self.started_at: float | None = None
+
+    @classmethod
+    def from_value(cls, value: Any) -> "SamplingProfiler | None":
+        """Build a profiler from an ``App(profile=...)`` value or ``YAAF_PROFILE`` string.
+
+        ``True``, ``"on"`` and ``"true"`` sample at the default rate. A number
+        is the rate in Hz. Falsy values, ``"off"`` and ``"false"`` disable profiling.
+        """
+        if isinstance(value, SamplingProfiler):
+            return value
+        if isinstance(value, str):
+            text = value.strip().lower()
+            if text in ("", "0", "off", "false", "no"):
+                return None
+            if text in ("on", "true", "yes"):
+                return cls()
+            return cls(hz=float(text))
+        if value is True:
+            return cls()
+        return cls(hz=float(value)) if value else None
+
+    def set_routes(self, handlers: Iterable[tuple[str, Any]]) -> None:
+        """Map each ``(route label, function)`` so samples inside it are filed under the route."""
+        routes: dict[CodeType, str] = {}
+        for label, func in handlers:
+            code = getattr(inspect.unwrap(func), "__code__", None)
+            if code is not None:
+                routes[code] = label
+        self._routes = routes
+
+    def start(self) -> None:
+        """Start the sampling thread, if it is not running."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="yaaf-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread and restore the dump signal's handler; samples are kept."""
+        if self._signal is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(*self._signal)
+            self._signal = None
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def reset(self) -> None:
+        """Drop every collected sample."""
+        with self._lock:
+            self._counts.clear()
+            self._truncated.clear()
+            self.samples = 0
+            self.sample_time = 0.0
+            self.started_at = time.perf_counter()
+
+    def stats(self) -> dict[str, float]:
+        """Return the sample count, time spent sampling, and that time as a fraction of wall time."""
+        elapsed = time.perf_counter() - self.started_at if self.started_at is not None else 0.0
+        return {
+            "hz": self.hz,
+            "samples": self.samples,
+            "stacks": len(self._counts),
+            "sample_time": self.sample_time,
+            "overhead": self.sample_time / elapsed if elapsed else 0.0,
+        }
+
+    def routes(self) -> list[str]:
+        """Return the routes that have samples."""
+        with self._lock:
+            return sorted({route for route, _stack in self._counts} | set(self._truncated))
+
+    def collapsed(self, route: str | None = None) -> str:
+        """Return samples in collapsed-stack format, optionally only those of one route."""
+        with self._lock:
+            counts = list(self._counts.items())
+            truncated = list(self._truncated.items())
+        lines = [
+            ";".join([label, *map(_frame_label, stack)]) + f" {count}"
+            for (label, stack), count in counts
+            if route is None or label == route
+        ]
+        lines += [f"{label};{TRUNCATED} {count}" for label, count in truncated if route is None or label == route]
+        lines.sort()
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def dump(self, directory: str | os.PathLike[str] | None = None) -> Path:
+        """Write every sample to ``yaaf-profile-<pid>.folded`` and return its path.
+
+        The directory defaults to ``YAAF_PROFILE_DIR`` or the system temp directory.
+        """
+        target = Path(directory or os.environ.get(DIR_ENV_VAR) or tempfile.gettempdir())
+        path = target / f"yaaf-profile-{os.getpid()}.folded"
+        path.write_text(self.collapsed())
+        return path
+
+    def install_signal_handler(self, signum: int | None = None) -> bool:
+        """Dump samples with ``dump()`` whenever the process receives ``signum`` (SIGUSR2 by default).
+
+        Returns False when signals cannot be installed here: off the main thread,
+        or on platforms without the signal.
+        """
+        signum = signum if signum is not None else getattr(signal, "SIGUSR2", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        previous = signal.signal(signum, lambda _signum, _frame: print(f"Wrote profile to {self.dump()}"))
+        if self._signal is None:
+            self._signal = (signum, previous)
+        return True
+
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        while not self._stopping.wait(interval):
+            self._sample(sys._current_frames())
+
+    def _sample(self, frames: dict[int, FrameType]) -> None:
+        started = time.perf_counter()
+        own = threading.get_ident()
+        routes = self._routes
+        with self._lock:
+            for ident, leaf in frames.items():
+                if ident == own or _idle(leaf):
+                    continue
+                stack: list[CodeType] = []
+                label = OTHER
+                frame: FrameType | None = leaf
+                while frame is not None:
+                    code = frame.f_code
+                    label = routes.get(code, label)
+                    if len(stack) < self.max_depth:
+                        stack.append(code)
+                    frame = frame.f_back
+                stack.reverse()
+                key = (label, tuple(stack))
+                if key in self._counts:
+                    self._counts[key] += 1
+                elif len(self._counts) < self.max_stacks:
+                    self._counts[key] = 1
+                else:
+                    self._truncated[label] = self._truncated.get(label, 0) + 1
+            self.samples += 1
+            self.sample_time += time.perf_counter() - started
+
+
+def _idle(frame: FrameType) -> bool:
+    code = frame.f_code
+    return any(code.co_name == name and code.co_filename.endswith(ending) for ending, name in _IDLE_FRAMES)
+
+
+def _frame_label(code: CodeType) -> str:
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ":")
@@ -0,0 +1,263 @@
+"""Rate limiting keyed on client address, a header or a path parameter.
+
+A ``RateLimiter`` is middleware. It derives a key from each request, asks a
+backend to charge one unit to that key under a ``TokenBucket`` or
+``SlidingWindow`` rule, and answers ``429 Too Many Requests`` with a
+``retry-after`` header when the key is out of quota.
+
+Each algorithm keeps a few numbers of state per key, as a tuple. The default
+``MemoryBackend`` holds that state in a bounded LRU table local to the
+process. Limits shared across workers need a backend over a shared store,
+such as Redis, that implements ``RateLimitBackend.hit`` atomically. Wall-clock
+time is used so that every worker agrees on the time.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, NamedTuple, Protocol
+
+from .responses import Response
+from .types import CallNext
+
+State = tuple[float, ...]
+
+_PERIODS = {"s": 1.0, "sec": 1.0, "second": 1.0, "m": 60.0, "min": 60.0, "minute": 60.0, "h": 3600.0, "hour": 3600.0}
+_RATE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*/\s*([a-z]+)\s*$")
+
+
+class Decision(NamedTuple):
+    """The outcome of charging a key: whether it was allowed, quota left, and when to retry."""
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class RateAlgorithm(Protocol):
+    """A rate rule whose per-key state is a tuple of floats."""
+
+    def apply(self, state: State | None, now: float, cost: int = 1) -> tuple[State, Decision]:
+        """Charge ``cost`` against ``state`` at time ``now``; return the new state and the decision."""
+        ...
+
+
+@dataclass(frozen=True)
+class TokenBucket:
+    """Refill ``rate`` tokens a second up to ``burst``; each request takes one token."""
+    rate: float
+    burst: int
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError(f"Token bucket needs a positive rate and a burst of at least 1, got {self!r}")
+
+    def apply(self, state: State | None, now: float, cost: int = 1) -> tuple[State, Decision]:
+        """Refill for the time since the last request, then try to take ``cost`` tokens."""
+        if state is None:
+            tokens = float(self.burst)
+        else:
+            tokens = min(float(self.burst), state[0] + max(now - state[1], 0.0) * self.rate)
+        if tokens >= cost:
+            return (tokens - cost, now), Decision(True, int(tokens - cost), 0.0)
+        return (tokens, now), Decision(False, 0, (cost - tokens) / self.rate)
+
+
+@dataclass(frozen=True)
+class SlidingWindow:
+    """Allow ``limit`` requests in any ``window`` seconds.
+
+    Uses the sliding-window counter approximation: the previous fixed
+    window's count is weighted by how much of it still overlaps the sliding
+    window. State is three numbers per key however many requests arrive.
+    """
+    limit: int
+    window: float
+
+    def __post_init__(self) -> None:
+        if self.limit < 1 or self.window <= 0:
+            raise ValueError(f"Sliding window needs a limit of at least 1 and a positive window, got {self!r}")
+
+    def apply(self, state: State | None, now: float, cost: int = 1) -> tuple[State, Decision]:
+        """Count ``cost`` in the current window if the weighted total stays within the limit."""
+        start = now - now % self.window
+        if state is None or state[0] < start - self.window:
+            current, previous = 0.0, 0.0
+        elif state[0] < start:
+            current, previous = 0.0, state[1]
+        else:
+            current, previous = state[1], state[2]
+        weight = 1.0 - (now - start) / self.window
+        used = previous * weight + current
+        if used + cost <= self.limit:
+            return (start, current + cost, previous), Decision(True, int(self.limit - used - cost), 0.0)
+        if previous and current + cost <= self.limit:
+            # Wait until the previous window's share has decayed enough.
+            allowed_weight = (self.limit - current - cost) / previous
+            retry_after = start + self.window * (1.0 - allowed_weight) - now
+        else:
+            retry_after = start + self.window - now
+        return (start, current, previous), Decision(False, 0, max(retry_after, 0.0))
+
+
+class RateLimitBackend(Protocol):
+    """Stores per-key state; ``hit`` must read, apply and write a key atomically."""
+
+    async def hit(self, key: str, algorithm: RateAlgorithm, now: float, cost: int = 1) -> Decision:
+        """Charge ``cost`` to ``key`` under ``algorithm`` and return the decision."""
+        ...
+
+
+class MemoryBackend:
+    """Per-process state in an LRU table of at most ``max_keys`` keys.
+
+    When the table is full the least recently seen key is evicted, which
+    forgets its usage. Keep ``max_keys`` above the number of clients active
+    within one window so evictions only drop idle keys.
+    """
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        """Create an empty table."""
+        if max_keys < 1:
+            raise ValueError("max_keys must be at least 1")
+        self.max_keys = max_keys
+        self._states: OrderedDict[str, State] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def hit(self, key: str, algorithm: RateAlgorithm, now: float, cost: int = 1) -> Decision:
+        """Charge ``key``; runs without awaiting, so it is atomic on the event loop."""
+        states = self._states
+        state = states.get(key)
+        if state is None and len(states) >= self.max_keys:
+            states.popitem(last=False)
+            self.evictions += 1
+        states[key], decision = algorithm.apply(state, now, cost)
+        if state is not None:
+            states.move_to_end(key)
+        return decision
+
+
+class RateLimiter:
+    """Answer 429 to requests whose key is out of quota under ``limit``.
+
+    ``limit`` is a rate string such as ``"10/s"``, ``"100/minute"`` or
+    ``"1000/hour"`` (a token bucket whose burst equals the count), or a
+    ``TokenBucket`` / ``SlidingWindow``. ``key`` picks what is limited:
+
+    - ``"client"``: the client address (the default)
+    - ``"header:<name>"``: a request header, such as an API key
+    - ``"param:<name>"``: a path parameter
+    - a callable taking the request and returning a string
+
+    Requests without the header or parameter are keyed by client address.
+    ``scope`` prefixes every key so limiters sharing a backend stay apart.
+    State lives in ``backend``, or in a private ``MemoryBackend`` of
+    ``max_keys`` keys when none is given.
+    """
+
+    def __init__(
+        self,
+        limit: str | RateAlgorithm,
+        key: str | Callable[[Any], str | None] = "client",
+        backend: RateLimitBackend | None = None,
+        max_keys: int = 10_000,
+        scope: str = "",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Parse ``limit`` and ``key``."""
+        self.algorithm = parse_rate(limit) if isinstance(limit, str) else limit
+        self.key = key
+        self._key_func = _key_function(key)
+        self.backend = backend
+        self._local = MemoryBackend(max_keys)
+        self.scope = scope
+        self._clock = clock
+        self.allowed = 0
+        self.limited = 0
+
+    @classmethod
+    def from_value(cls, value: Any, scope: str = "") -> "RateLimiter | None":
+        """Build a limiter from a ``rate_limit`` declaration.
+
+        Accepts a rate string, an algorithm, a mapping of constructor
+        arguments, or an existing limiter, which takes ``scope`` if it has none.
+        """
+        if value is None or value is False:
+            return None
+        if isinstance(value, RateLimiter):
+            if not value.scope:
+                value.scope = scope
+            return value
+        if isinstance(value, dict):
+            return cls(**{"scope": scope, **value})
+        if isinstance(value, str) or hasattr(value, "apply"):
+            return cls(value, scope=scope)
+        raise TypeError(f"Unsupported rate limit: {value!r}")
+
+    def stats(self) -> dict[str, int]:
+        """Return allowed and rate-limited request counts."""
+        return {"allowed": self.allowed, "rate_limited": self.limited}
+
+    async def __call__(self, request: Any, call_next: CallNext) -> Response:
+        """Charge the request's key and continue, or return 429."""
+        backend = self.backend if self.backend is not None else self._local
+        key = f"{self.scope}|{self._key_func(request)}"
+        decision = await backend.hit(key, self.algorithm, self._clock())
+        if decision.allowed:
+            self.allowed += 1
+            return await call_next(request)
+        self.limited += 1
+        return Response.text(
+            "Too Many Requests",
+            status=429,
+            headers=[("retry-after", str(max(math.ceil(decision.retry_after), 1)))],
+        )
+
+
+def parse_rate(text: str) -> TokenBucket:
+    """Parse ``"<count>/<period>"`` into a token bucket refilling ``count`` per period, burst ``count``."""
+    match = _RATE.match(text.lower())
+    period = _period(match.group(2)) if match else None
+    if match is None or period is None:
+        raise ValueError(f"Invalid rate {text!r}; expected e.g. '10/s', '100/minute' or '1000/hour'")
+    count = float(match.group(1))
+    if count <= 0:
+        raise ValueError(f"Invalid rate {text!r}; the count must be positive")
+    return TokenBucket(rate=count / period, burst=max(int(count), 1))
+
+
+def _period(unit: str) -> float | None:
+    """Return the seconds in ``unit``, accepting one plural ``s`` on a known word.
+
+    Single-letter units take no plural, so ``"ms"`` is rejected rather than
+    read as minutes.
+    """
+    if unit in _PERIODS:
+        return _PERIODS[unit]
+    singular = unit[:-1]
+    return _PERIODS.get(singular) if unit.endswith("s") and len(singular) > 1 else None
+
+
+def _key_function(key: str | Callable[[Any], str | None]) -> Callable[[Any], str]:
+    if callable(key):
+        return lambda request: key(request) or _client(request)
+    kind, _, name = key.partition(":")
+    if kind == "client" and not name:
+        return _client
+    if kind == "header" and name:
+        header = name.lower()
+        return lambda request: request.headers.get(header) or _client(request)
+    if kind == "param" and name:
+        return lambda request: request.path_params.get(name) or _client(request)
+    raise ValueError(f"Invalid rate limit key {key!r}; expected 'client', 'header:<name>' or 'param:<name>'")
+
+
+def _client(request: Any) -> str:
+    client = request.scope.get("client")
+    return client[0] if client else "-"
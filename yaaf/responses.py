@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import copy
+import inspect
+import mimetypes
+import os
 from dataclasses import dataclass
-from typing import Any, Iterable, Tuple
+from typing import Any, AsyncIterable, Callable, Iterable, Iterator, Tuple
 
-from .types import ASGISend
+from . import encoders
+from .encoders import JSONEncoder
+from .types import ASGIScope, ASGISend
 
 
 @dataclass
@@ -22,9 +28,15 @@ class Response:
         return cls._with_type(content.encode(), "text/plain; charset=utf-8", status, headers)
 
     @classmethod
-    def json(cls, content: Any, status: int = 200, headers: Iterable[Tuple[str, str]] | None = None) -> "Response":
-        """Create an application/json response."""
-        payload = json.dumps(content, ensure_ascii=True).encode()
+    def json(
+        cls,
+        content: Any,
+        status: int = 200,
+        headers: Iterable[Tuple[str, str]] | None = None,
+        encoder: JSONEncoder | None = None,
+    ) -> "Response":
+        """Create an application/json response, encoding straight to bytes."""
+        payload = (encoder or encoders.default_json_encoder)(content)
         return cls._with_type(payload, "application/json", status, headers)
 
     @classmethod
@@ -36,14 +48,17 @@ class Response:
         headers: Iterable[Tuple[str, str]] | None,
     ) -> "Response":
         """Create a response and attach content-type + length headers."""
-        base_headers = [("content-type", media_type)]
-        if headers:
-            base_headers.extend(headers)
-        encoded = [(k.encode(), v.encode()) for k, v in base_headers]
+        if not headers:
+            return cls(
+                body=body,
+                status=status,
+                headers=[(b"content-type", media_type.encode()), (b"content-length", str(len(body)).encode())],
+            )
+        encoded = [(k.encode(), v.encode()) for k, v in [("content-type", media_type), *headers]]
         encoded.append((b"content-length", str(len(body)).encode()))
         return cls(body=body, status=status, headers=encoded)
 
-    async def send(self, send: ASGISend) -> None:
+    async def send(self, send: ASGISend, scope: ASGIScope | None = None) -> None:
         """Send the response through an ASGI send callable."""
         await send({"type": "http.response.start", "status": self.status, "headers": self.headers or []})
         await send({"type": "http.response.body", "body": self.body})
@@ -52,8 +67,191 @@ class Response:
         """Return a new response with a different status code."""
         return Response(body=self.body, status=status, headers=self.headers)
 
+    def with_headers(self, headers: Iterable[Tuple[str, str]]) -> "Response":
+        """Return a copy with extra headers appended, leaving this response untouched.
+
+        Middleware should use this rather than mutating ``headers``, because
+        cached responses are shared between requests.
+        """
+        clone = copy.copy(self)
+        clone.headers = [*(self.headers or []), *((k.encode(), v.encode()) for k, v in headers)]
+        return clone
+
+    def freeze(self) -> "FrozenResponse":
+        """Return an immutable copy whose ASGI messages are built once and reused.
+
+        Declare constant responses (health checks, fixed payloads) frozen at
+        module level and return the same object from the handler.
+        """
+        return FrozenResponse(self.body, self.status, self.headers)
+
+
+class FrozenResponse(Response):
+    """A constant response with pre-encoded headers and prebuilt ASGI messages.
+
+    ``send`` passes the same start and body message dicts to the server on
+    every request, so sending allocates nothing. ``with_status`` and
+    ``with_headers`` return ordinary responses; the frozen one never changes.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        status: int = 200,
+        headers: Iterable[tuple[bytes, bytes]] | None = None,
+    ) -> None:
+        """Freeze ``body``, ``status`` and already-encoded ``headers``."""
+        fixed = tuple(headers or ())
+        setattr_ = object.__setattr__
+        setattr_(self, "body", body)
+        setattr_(self, "status", status)
+        setattr_(self, "headers", fixed)
+        setattr_(self, "_start", {"type": "http.response.start", "status": status, "headers": fixed})
+        setattr_(self, "_body", {"type": "http.response.body", "body": body})
+        setattr_(self, "_tagged", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FrozenResponse is immutable; use with_headers() or with_status()")
+
+    async def send(self, send: ASGISend, scope: ASGIScope | None = None) -> None:
+        """Send the prebuilt start and body messages."""
+        await send(self._start)
+        await send(self._body)
+
+    def with_status(self, status: int) -> Response:
+        """Return an ordinary response with a different status code."""
+        return Response(body=self.body, status=status, headers=list(self.headers))
+
+    def with_headers(self, headers: Iterable[Tuple[str, str]]) -> Response:
+        """Return an ordinary response with extra headers appended."""
+        return Response(
+            body=self.body,
+            status=self.status,
+            headers=[*self.headers, *((k.encode(), v.encode()) for k, v in headers)],
+        )
+
+    def freeze(self) -> "FrozenResponse":
+        """Return this response; it is already frozen."""
+        return self
+
+    def tagged(self, etag: Callable[[bytes], bytes]) -> "FrozenResponse":
+        """Return a frozen copy carrying an ``etag`` header computed from the body.
+
+        The tag is computed on the first call and the tagged copy is reused
+        afterwards. A response that already has an ``etag`` is returned as is.
+        """
+        if self._tagged is None:
+            if any(name.lower() == b"etag" for name, _value in self.headers):
+                tagged = self
+            else:
+                tagged = FrozenResponse(self.body, self.status, [*self.headers, (b"etag", etag(self.body))])
+            object.__setattr__(self, "_tagged", tagged)
+        return self._tagged
+
+
+class StreamingResponse(Response):
+    """A response whose body is sent in chunks from a sync or async iterator.
+
+    Sync iterators are advanced in a worker thread so blocking producers do not
+    stall the event loop. ``str`` chunks are encoded as UTF-8.
+    """
+
+    def __init__(
+        self,
+        content: Iterable[bytes | str] | AsyncIterable[bytes | str],
+        status: int = 200,
+        headers: Iterable[Tuple[str, str]] | None = None,
+        media_type: str = "application/octet-stream",
+    ) -> None:
+        """Create a streaming response from an iterable of chunks."""
+        base_headers = [("content-type", media_type)]
+        if headers:
+            base_headers.extend(headers)
+        encoded = [(k.encode(), v.encode()) for k, v in base_headers]
+        super().__init__(body=b"", status=status, headers=encoded)
+        self.content = content
+
+    async def send(self, send: ASGISend, scope: ASGIScope | None = None) -> None:
+        """Send the response start, then one body message per chunk."""
+        await send({"type": "http.response.start", "status": self.status, "headers": self.headers or []})
+        async for chunk in self._iterate():
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _iterate(self) -> AsyncIterable[bytes | str]:
+        if isinstance(self.content, AsyncIterable):
+            async for chunk in self.content:
+                yield chunk
+            return
+        iterator = iter(self.content)
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+
+    def freeze(self) -> "FrozenResponse":
+        """Streaming bodies cannot be frozen."""
+        raise TypeError("Only buffered responses can be frozen")
+
+    def with_status(self, status: int) -> "StreamingResponse":
+        """Return a new response with a different status code."""
+        clone = copy.copy(self)
+        clone.status = status
+        return clone
+
+
+class FileResponse(StreamingResponse):
+    """Stream a file from disk in fixed-size chunks.
+
+    When the server advertises the ``http.response.zerocopysend`` extension the
+    open file is handed to the server, which can use ``os.sendfile``.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        status: int = 200,
+        headers: Iterable[Tuple[str, str]] | None = None,
+        media_type: str | None = None,
+        filename: str | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """Create a response for the file at ``path``."""
+        self.path = os.fspath(path)
+        self.chunk_size = chunk_size
+        if media_type is None:
+            media_type = mimetypes.guess_type(filename or self.path)[0] or "application/octet-stream"
+        extra = [("content-length", str(os.stat(self.path).st_size))]
+        if filename is not None:
+            extra.append(("content-disposition", f'attachment; filename="{filename}"'))
+        if headers:
+            extra.extend(headers)
+        super().__init__(self._read_chunks(), status=status, headers=extra, media_type=media_type)
+
+    def _read_chunks(self) -> Iterator[bytes]:
+        with open(self.path, "rb") as handle:
+            while chunk := handle.read(self.chunk_size):
+                yield chunk
+
+    async def send(self, send: ASGISend, scope: ASGIScope | None = None) -> None:
+        """Send the file, using zero-copy send when the server supports it."""
+        extensions = (scope or {}).get("extensions") or {}
+        if "http.response.zerocopysend" not in extensions:
+            await super().send(send, scope)
+            return
+        await send({"type": "http.response.start", "status": self.status, "headers": self.headers or []})
+        with open(self.path, "rb") as handle:
+            await send({"type": "http.response.zerocopysend", "file": handle, "more_body": False})
+
+
+_DONE = object()
+
 
-def as_response(value: Any) -> Response:
+def as_response(value: Any, json_encoder: JSONEncoder | None = None) -> Response:
     """Normalize handler return values into a Response."""
     if isinstance(value, Response):
         return value
@@ -63,7 +261,9 @@ def as_response(value: Any) -> Response:
         return Response.text(value)
     if isinstance(value, tuple) and len(value) == 2:
         body, status = value
-        return as_response(body).with_status(int(status))
+        return as_response(body, json_encoder).with_status(int(status))
     if isinstance(value, (dict, list)):
-        return Response.json(value)
+        return Response.json(value, encoder=json_encoder)
+    if inspect.isgenerator(value) or inspect.isasyncgen(value):
+        return StreamingResponse(value)
     return Response.text(str(value))
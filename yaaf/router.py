@@ -0,0 +1,109 @@
+"""Segment-trie router for discovered filesystem routes."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .loader import RouteTarget
+from .types import Params
+
+
+@dataclass
+class _Node:
+    """One path segment in the routing trie."""
+    static: dict[str, "_Node"] = field(default_factory=dict)
+    param: "_Node | None" = None
+    handlers: dict[str, tuple[int, RouteTarget]] = field(default_factory=dict)
+
+
+class Router:
+    """Match request paths against routes in O(path depth).
+
+    Routes must be passed in precedence order (as returned by ``discover_routes``).
+    The position of each route in that order is its rank, and a lookup returns the
+    matching route with the lowest rank, so static-over-dynamic precedence is the
+    same as a linear scan over the sorted route list. Fully static paths are also
+    indexed in a flat dict since they always win over any dynamic match.
+    """
+
+    def __init__(self, routes: Iterable[RouteTarget], prefix: str = "api") -> None:
+        """Build the trie from routes sorted by precedence."""
+        self._root = _Node()
+        self._static: dict[str, dict[str, RouteTarget]] = {}
+        self._prefix = f"/{prefix}"
+        for rank, route in enumerate(routes):
+            self._insert(rank, route)
+
+    def _insert(self, rank: int, route: RouteTarget) -> None:
+        node = self._root
+        for part in route.route_parts:
+            if part.startswith("[") and part.endswith("]"):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(part, _Node())
+        for method in route.handlers:
+            if method not in node.handlers:
+                node.handlers[method] = (rank, route)
+        if not route.param_names:
+            path = "/".join([self._prefix, *route.route_parts])
+            methods = self._static.setdefault(path, {})
+            for method in route.handlers:
+                methods.setdefault(method, route)
+
+    def match(self, method: str, path: str) -> tuple[RouteTarget, Params] | None:
+        """Return the route handling ``method`` at ``path`` and its path params."""
+        static = self._static.get(path)
+        if static is not None and method in static:
+            return static[method], {}
+        if path == self._prefix:
+            segments: list[str] = []
+        elif path.startswith(self._prefix + "/"):
+            segments = path[len(self._prefix) + 1 :].split("/")
+            if "" in segments:
+                return None
+        else:
+            return None
+
+        found = _search(self._root, segments, 0, 0, method, [], None)
+        if found is None:
+            return None
+        _rank, route, values = found
+        return route, dict(zip(route.param_names, values))
+
+
+def _search(
+    node: _Node,
+    segments: list[str],
+    index: int,
+    statics: int,
+    method: str,
+    values: list[str],
+    best: tuple[int, RouteTarget, list[str]] | None,
+) -> tuple[int, RouteTarget, list[str]] | None:
+    """Depth-first search preferring static children, keeping the lowest-rank match.
+
+    A parameter branch is skipped once the best match so far has more static
+    segments than the branch could still reach, which keeps typical lookups to a
+    single walk down the trie.
+    """
+    if index == len(segments):
+        entry = node.handlers.get(method)
+        if entry is not None and (best is None or entry[0] < best[0]):
+            return entry[0], entry[1], list(values)
+        return best
+
+    segment = segments[index]
+    child = node.static.get(segment)
+    if child is not None:
+        best = _search(child, segments, index + 1, statics + 1, method, values, best)
+    if node.param is not None:
+        reachable = statics + len(segments) - index - 1
+        if best is not None and best[1].static_count > reachable:
+            return best
+        values.append(segment)
+        best = _search(node.param, segments, index + 1, statics, method, values, best)
+        values.pop()
+    return best
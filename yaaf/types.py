@@ -15,6 +15,8 @@ ASGISend: TypeAlias = Callable[[dict[str, Any]], Awaitable[None]]
 Params: TypeAlias = dict[str, str]
 ResponseLike: TypeAlias = "Response | str | bytes | dict[str, Any] | list[Any] | tuple[Any, int]"
 Handler: TypeAlias = Callable[..., ResponseLike | Awaitable[ResponseLike]]
+CallNext: TypeAlias = "Callable[[Request], Awaitable[Response]]"
+Middleware: TypeAlias = "Callable[[Request, CallNext], Awaitable[Response]]"
 
 
 class ServiceProtocol(Protocol):
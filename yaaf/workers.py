@@ -0,0 +1,113 @@
+"""Pre-fork multi-worker serving for yaaf apps."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import Any, Callable
+
+import uvicorn
+
+from .types import ASGIReceive, ASGIScope, ASGISend
+
+ASGIApp = Callable[[ASGIScope, ASGIReceive, ASGISend], Any]
+
+
+class Supervisor:
+    """Keep a fixed number of forked worker processes alive.
+
+    Workers that exit while the supervisor is running are replaced. SIGINT and
+    SIGTERM stop the supervisor and terminate all workers when ``run`` is called
+    from the main thread.
+    """
+
+    def __init__(self, target: Callable[[], None], workers: int, poll_interval: float = 0.5) -> None:
+        """Create a supervisor that runs ``target`` in ``workers`` processes."""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Multiple workers require the 'fork' start method")
+        self._context = multiprocessing.get_context("fork")
+        self._target = target
+        self._workers = workers
+        self._poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._processes: list[Any] = []
+        self.restarts = 0
+
+    def _spawn(self) -> Any:
+        process = self._context.Process(target=self._target, daemon=False)
+        process.start()
+        return process
+
+    def stop(self, *_args: Any) -> None:
+        """Ask the supervisor loop to exit."""
+        self._stopping.set()
+
+    def run(self) -> None:
+        """Start the workers and restart any that die until stopped."""
+        previous: dict[int, Any] = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous[signum] = signal.signal(signum, self.stop)
+
+        self._processes = [self._spawn() for _ in range(self._workers)]
+        try:
+            while not self._stopping.wait(self._poll_interval):
+                for index, process in enumerate(self._processes):
+                    if process.is_alive():
+                        continue
+                    print(f"Worker {process.pid} exited with code {process.exitcode}; restarting")
+                    self._processes[index] = self._spawn()
+                    self.restarts += 1
+        finally:
+            for process in self._processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in self._processes:
+                process.join()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+
+def _run_worker(app: ASGIApp, sock: socket.socket, config: dict[str, Any]) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, **config))
+    server.run(sockets=[sock])
+
+
+def serve_workers(
+    app: ASGIApp,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 2,
+    preload: bool = False,
+    **config: Any,
+) -> None:
+    """Serve ``app`` from ``workers`` forked processes sharing one listening socket.
+
+    With ``preload`` the consumers tree is discovered in the parent before
+    forking, so workers share the imported modules and services copy-on-write.
+    Extra keyword arguments are passed to ``uvicorn.Config``.
+    """
+    if preload:
+        from .app import App
+
+        if isinstance(app, App):
+            app._ensure_routes()
+
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    config = {"host": host, "port": port, **config}
+    print(f"Serving on {host}:{port} with {workers} workers (parent pid {os.getpid()})")
+    try:
+        Supervisor(lambda: _run_worker(app, sock, config), workers).run()
+    finally:
+        sock.close()